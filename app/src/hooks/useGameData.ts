@@ -11,6 +11,8 @@ import type {
   StartingEquipment,
   DefeatedEncounters,
 } from "../types";
+import { assetUrl } from "../utils/assets";
+import { loadGameData } from "../utils/gameData";
 
 // Type for detailed mystery data from ancient_ones_detailed.json
 interface MysteryDetailData {
@@ -118,6 +120,20 @@ interface InvestigatorDetailed {
   defeatedEncounters: DefeatedEncounters;
 }
 
+// Shards this hook reads when the grimoire is published as shards. World Map
+// pages (mapLocations) carry no dedicated wiki category, so the catch-all
+// shards they are filed under come along too.
+const GAME_DATA_SHARDS = [
+  "investigators",
+  "ancientOnes",
+  "monsters",
+  "epicMonsters",
+  "encounters",
+  "gameBoards",
+  "gameSets",
+  "other",
+];
+
 export function useGameData() {
   const [data, setData] = useState<GameData | null>(null);
   const [ancientOneMeta, setAncientOneMeta] = useState<
@@ -209,31 +225,28 @@ export function useGameData() {
     }
 
     Promise.all([
-      fetch("/eldritch_horror_data.json").then((res) => {
-        if (!res.ok) throw new Error("Failed to load grimoire");
-        return res.json();
-      }),
-      fetch("/ancient_ones_meta.json").then((res) => {
+      loadGameData(GAME_DATA_SHARDS),
+      fetch(assetUrl("/ancient_ones_meta.json")).then((res) => {
         if (!res.ok) throw new Error("Failed to load ancient one table");
         return res.json();
       }),
-      fetch("/ancient_ones_detailed.json?v=4").then((res) => {
+      fetch(assetUrl("/ancient_ones_detailed.json")).then((res) => {
         if (!res.ok) throw new Error("Failed to load ancient one details");
         return res.json();
       }),
-      fetch("/investigators_detailed.json?v=2").then((res) => {
+      fetch(assetUrl("/investigators_detailed.json")).then((res) => {
         if (!res.ok) throw new Error("Failed to load investigator details");
         return res.json();
       }),
-      fetch("/research-encounters.json").then((res) => {
+      fetch(assetUrl("/research-encounters.json")).then((res) => {
         if (!res.ok) throw new Error("Failed to load research encounters");
         return res.json();
       }),
     ])
-      .then(([json, metaJson, detailedJson, invDetailedJson, researchJson]) => {
+      .then(([gameData, metaJson, detailedJson, invDetailedJson, researchJson]) => {
         console.log(`[GameData] Loaded ${invDetailedJson.length} detailed investigators`);
         // @ts-ignore
-        window.__ELDRITCH_DATA__ = json;
+        window.__ELDRITCH_DATA__ = gameData;
         // @ts-ignore
         window.__ELDRITCH_META__ = metaJson;
         // @ts-ignore
@@ -243,7 +256,7 @@ export function useGameData() {
         // @ts-ignore
         window.__ELDRITCH_RESEARCH_ENCOUNTERS__ = researchJson;
 
-        setData(json as GameData);
+        setData(gameData);
 
         const metaMap = new Map<string, AncientOneSetupMeta>();
         for (const entry of metaJson as Array<
@@ -349,7 +362,8 @@ export function useGameData() {
     const match = page.rawWikitext?.match(re);
     if (match?.[1]) return stripWikiMarkup(match[1]);
 
-    // Sometimes the scraped fullText starts with template params too.
+    // Legacy scrapes only: the old parse_wikitext leaked template params into
+    // fullText. The tokenizer no longer does, so this never matches new data.
     const match2 = page.fullText?.match(re);
     if (match2?.[1]) return stripWikiMarkup(match2[1]);
 
@@ -880,27 +894,20 @@ export function useGameData() {
       const quoteMatch = flavorSection.match(/["']([^"']{10,})["']/);
       const quote = quoteMatch ? quoteMatch[1] : "";
 
-      // Extract stats from fullText
-      const fullText = inv.fullText || "";
-      const extractStat = (key: string): number => {
-        const match = fullText.match(new RegExp(`\\|${key}\\s*=\\s*(\\d+)`, "i"));
-        return match ? parseInt(match[1], 10) : 0;
-      };
-
       return {
         name: inv.title,
         profession: stripWikiMarkup(profession),
         role: stripWikiMarkup(role),
         set: stripWikiMarkup(getField(inv, "set") || ""),
         skills: {
-          lore: extractStat("lore"),
-          influence: extractStat("influence"),
-          observation: extractStat("observation"),
-          strength: extractStat("strength"),
-          will: extractStat("will"),
+          lore: getStat(inv, "lore"),
+          influence: getStat(inv, "influence"),
+          observation: getStat(inv, "observation"),
+          strength: getStat(inv, "strength"),
+          will: getStat(inv, "will"),
         },
-        health: extractStat("health"),
-        sanity: extractStat("sanity"),
+        health: getStat(inv, "health"),
+        sanity: getStat(inv, "sanity"),
         startingLocation: stripWikiMarkup(startingLocation),
         startingEquipment: [], // Cannot reliably extract from wiki format in fallback
         personalStory: stripWikiMarkup(personalStory),
@@ -3,6 +3,8 @@
  * Loads encounter JSON files and selects random cards based on encounter type and context
  */
 
+import { assetUrl } from '../../utils/assets';
+
 interface EncounterCard {
   "ID #"?: string;
   Set?: any;
@@ -65,7 +67,7 @@ async function loadEncounterData(encounterType: string): Promise<any> {
     ? `/${fileName}`
     : `/encounters/${fileName}`;
   
-  const response = await fetch(filePath);
+  const response = await fetch(assetUrl(filePath));
   
   if (!response.ok) {
     throw new Error(`Failed to load encounter data: ${response.statusText}`);
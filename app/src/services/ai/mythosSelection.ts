@@ -6,6 +6,7 @@
  */
 
 import type { MythosCard, MythosColor } from '../../../types';
+import { assetUrl } from '../../utils/assets';
 
 interface MythosCardData {
   metadata: {
@@ -19,9 +20,10 @@ interface MythosCardData {
     categories: string[];
     infobox: Record<string, string>;
     cardData: Record<string, string>;
-    sections: Record<string, string>;
-    links: string[];
-    templates: string[];
+    // Only written with `extract_mythos_cards.py --profile full`
+    sections?: Record<string, string>;
+    links?: string[];
+    templates?: string[];
     fullText: string;
     rawWikitext: string;
   }>;
@@ -29,6 +31,24 @@ interface MythosCardData {
 
 let mythosCardsCache: MythosCard[] | null = null;
 
+/**
+ * The card template's params as `|Key = value` lines for the parsers below.
+ * Older scrapes left them in fullText; newer ones parse them into the
+ * infobox (lowercased keys), so rebuild the lines from there when present.
+ */
+function templateParamText(card: MythosCardData['mythosCards'][number]): string {
+  const entries = Object.entries(card.infobox || {});
+  if (!entries.some(([key]) => key === 'color')) {
+    return card.fullText;
+  }
+  return entries
+    .map(([key, value]) => {
+      const name = key.charAt(0).toUpperCase() + key.slice(1);
+      return `|${name} = ${value.replace(/\{\{[^{}]*\}\}|<[^>]+>/g, '')}`;
+    })
+    .join('\n');
+}
+
 /**
  * Parse a mythos card's color from its fullText
  */
@@ -203,7 +223,7 @@ async function loadMythosCards(): Promise<MythosCard[]> {
   }
 
   try {
-    const response = await fetch('/mythos_cards.json');
+    const response = await fetch(assetUrl('/mythos_cards.json'));
     if (!response.ok) {
       throw new Error(`Failed to load mythos cards: ${response.statusText}`);
     }
@@ -212,19 +232,20 @@ async function loadMythosCards(): Promise<MythosCard[]> {
     
     // Parse each card
     mythosCardsCache = data.mythosCards.map(card => {
-      const color = parseMythosColor(card.fullText);
-      const effect = parseEffect(card.fullText);
+      const params = templateParamText(card);
+      const color = parseMythosColor(params);
+      const effect = parseEffect(params);
       const testSkill = parseTestSkill(card.rawWikitext || '', effect || '');
       const icons = parseMythosIcons(color, effect || '', card.rawWikitext || '');
       
       return {
         ...card,
         color,
-        difficulty: parseMythosDifficulty(card.fullText),
-        trait: parseMythosTrait(card.fullText),
-        flavor: parseFlavor(card.fullText),
+        difficulty: parseMythosDifficulty(params),
+        trait: parseMythosTrait(params),
+        flavor: parseFlavor(params),
         effect: effect,
-        reckoning: parseReckoning(card.fullText),
+        reckoning: parseReckoning(params),
         testSkill: testSkill, // Add parsed test skill
         icons: icons, // Add parsed icons
       };
@@ -111,6 +111,20 @@ export interface GameData {
   allPages: Record<string, WikiPage>;
 }
 
+// Normalized layout (scrape_eldritch.py --layout normalized): every page is
+// stored once under pages[pageId]; category lists and allPages hold page ids.
+// denormalizeGameData turns it back into GameData.
+type CategoryIds<T> = {
+  [K in keyof T]: T[K] extends WikiPage[] ? number[] : CategoryIds<T[K]>;
+};
+
+export interface NormalizedGameData {
+  metadata: GameData["metadata"] & { layout: "normalized" };
+  categories: CategoryIds<GameData["categories"]>;
+  allPages: Record<string, number>;
+  pages: Record<string, WikiPage>;
+}
+
 export type AncientOneDifficulty = "Low" | "Medium" | "High";
 
 export interface AncientOneSetupMeta {
@@ -0,0 +1,36 @@
+/**
+ * Published URLs for the JSON files in public/.
+ *
+ * scripts/publish_assets.py writes minified, content-hashed copies (with
+ * .gz/.br siblings) to public/data/ and maps each original path to its copy
+ * in src/generated/asset-manifest.json. A hashed URL changes whenever the
+ * file does, so it can be cached forever. Without a published manifest
+ * (fresh checkout, dev server) every path resolves to the plain file.
+ */
+
+interface PublishedAsset {
+  url: string;
+  sha256: string;
+}
+
+interface AssetManifest {
+  generatedAt: string;
+  assets: Record<string, PublishedAsset>;
+}
+
+// A glob rather than an import, so the build works before anything is published
+const manifests = import.meta.glob<AssetManifest>("../generated/asset-manifest.json", {
+  eager: true,
+  import: "default",
+});
+const manifest: AssetManifest | undefined = Object.values(manifests)[0];
+
+/** The published copy of a public/ path such as "/investigators_detailed.json", if there is one. */
+export function publishedAsset(path: string): PublishedAsset | undefined {
+  return manifest?.assets[path];
+}
+
+/** URL to fetch a public/ path from: its hashed copy when published, otherwise the path itself. */
+export function assetUrl(path: string): string {
+  return publishedAsset(path)?.url ?? path;
+}
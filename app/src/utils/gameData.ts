@@ -0,0 +1,108 @@
+import type { GameData, NormalizedGameData, WikiPage } from "../types";
+import { assetUrl, publishedAsset } from "./assets";
+
+/**
+ * Accept eldritch_horror_data.json in either layout and return the nested
+ * GameData shape the app works with. Category lists and allPages end up
+ * pointing at the same page objects, so nothing is copied.
+ */
+export function denormalizeGameData(json: GameData | NormalizedGameData): GameData {
+  if (!("pages" in json)) return json;
+
+  const page = (id: number): WikiPage => json.pages[String(id)];
+  const categories: Record<string, WikiPage[] | Record<string, WikiPage[]>> = {};
+  for (const [name, value] of Object.entries(json.categories)) {
+    categories[name] = Array.isArray(value)
+      ? value.map(page)
+      : Object.fromEntries(
+          Object.entries(value as Record<string, number[]>).map(([child, ids]) => [child, ids.map(page)])
+        );
+  }
+
+  const allPages: Record<string, WikiPage> = {};
+  for (const [title, id] of Object.entries(json.allPages)) {
+    allPages[title] = page(id);
+  }
+
+  // eslint-disable-next-line @typescript-eslint/no-unused-vars
+  const { layout, ...metadata } = json.metadata;
+  return { metadata, categories: categories as unknown as GameData["categories"], allPages };
+}
+
+// Written by scrape_eldritch.py --format shards (see scripts/shards.py)
+export const SHARDS_URL = "/eldritch_horror_data.shards";
+
+export interface ShardInfo {
+  file: string;
+  count: number;
+  bytes: number;
+  sha256: string;
+}
+
+export interface ShardManifest {
+  metadata: GameData["metadata"];
+  shards: Record<string, ShardInfo>;
+}
+
+/** The shard manifest, or null when the dataset is not published as shards. */
+export async function fetchShardManifest(): Promise<ShardManifest | null> {
+  const res = await fetch(assetUrl(`${SHARDS_URL}/manifest.json`));
+  // The dev server answers unknown paths with index.html, so check the type too
+  if (!res.ok || !res.headers.get("content-type")?.includes("json")) return null;
+  return res.json();
+}
+
+/**
+ * Fetch only the named shards ("mythos", "encounters.research", or
+ * "encounters" for every encounter shard) and assemble them as GameData.
+ * Categories that were not requested are empty, and allPages holds just
+ * the fetched pages.
+ */
+export async function loadGameDataShards(manifest: ShardManifest, names: string[]): Promise<GameData> {
+  const wanted = Object.keys(manifest.shards).filter((name) =>
+    names.some((n) => name === n || name.startsWith(`${n}.`))
+  );
+  const loaded = new Map(
+    await Promise.all(
+      wanted.map(async (name) => {
+        const shard = manifest.shards[name];
+        // Published shards have hashed names; otherwise the hash in the query string busts caches
+        const path = `${SHARDS_URL}/${shard.file}`;
+        const res = await fetch(publishedAsset(path)?.url ?? `${path}?v=${shard.sha256.slice(0, 12)}`);
+        if (!res.ok) throw new Error(`Failed to load the ${name} shard`);
+        return [name, (await res.json()) as WikiPage[]] as const;
+      })
+    )
+  );
+
+  const categories: Record<string, WikiPage[] | Record<string, WikiPage[]>> = {};
+  for (const name of Object.keys(manifest.shards)) {
+    const pages = loaded.get(name) ?? [];
+    const [parent, child] = name.split(".");
+    if (child) {
+      ((categories[parent] ??= {}) as Record<string, WikiPage[]>)[child] = pages;
+    } else {
+      categories[parent] = pages;
+    }
+  }
+
+  const allPages: Record<string, WikiPage> = {};
+  for (const pages of loaded.values()) {
+    for (const page of pages) allPages[page.title] = page;
+  }
+
+  return { metadata: manifest.metadata, categories: categories as unknown as GameData["categories"], allPages };
+}
+
+/**
+ * The grimoire: just the shards in `names` when the dataset is published
+ * as shards, otherwise the whole eldritch_horror_data.json.
+ */
+export async function loadGameData(names: string[]): Promise<GameData> {
+  const manifest = await fetchShardManifest();
+  if (manifest) return loadGameDataShards(manifest, names);
+
+  const res = await fetch(assetUrl("/eldritch_horror_data.json"));
+  if (!res.ok) throw new Error("Failed to load grimoire");
+  return denormalizeGameData(await res.json());
+}
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled category rule table against the old if-chain.
+Reads the wiki categories of every page found in the given dataset files
+(the scraper output, its NDJSON records, ...) and reports pages classified
+per second for both implementations, how often each rule fired, and any page
+the two classify differently.
+
+    python bench_categorize.py eldritch_horror_data.json --repeat 20
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from category_rules import RULES_FILE, CategoryRules
+
+DEFAULT_INPUTS = [
+    Path(__file__).parent / "eldritch_horror_data.json",
+    Path(__file__).parent.parent / "app" / "public" / "eldritch_horror_data.json",
+]
+
+
+def legacy_categorize_page(categories: list[str], title: str) -> str:
+    """The if-chain category_rules.json replaced, kept as the baseline."""
+    lower_cats = [c.lower() for c in categories]
+    
+    # Check in order of specificity
+    if any("investigator" in c for c in lower_cats):
+        return "investigators"
+    if any("ancient one" in c for c in lower_cats):
+        return "ancientOnes"
+    if any("epic monster" in c for c in lower_cats):
+        return "epicMonsters"
+    if any("monster" in c for c in lower_cats):
+        return "monsters"
+    if any("unique asset" in c for c in lower_cats):
+        return "uniqueAssets"
+    if any("artifact" in c for c in lower_cats):
+        return "artifacts"
+    if any("spell" in c for c in lower_cats):
+        return "spells"
+    if any("condition" in c for c in lower_cats):
+        return "conditions"
+    if any("asset" in c for c in lower_cats):
+        return "assets"
+    if any("myster" in c for c in lower_cats):
+        return "mysteries"
+    if any("prelude" in c for c in lower_cats):
+        return "preludes"
+    if any("adventure" in c for c in lower_cats):
+        return "adventures"
+    if any("personal stor" in c for c in lower_cats):
+        return "personalStories"
+    if any("mythos" in c for c in lower_cats):
+        return "mythos"
+    
+    # Encounter types
+    if any("general encounter" in c for c in lower_cats):
+        return "encounters.general"
+    if any("location encounter" in c for c in lower_cats):
+        return "encounters.location"
+    if any("research encounter" in c for c in lower_cats):
+        return "encounters.research"
+    if any("other world" in c for c in lower_cats):
+        return "encounters.otherWorld"
+    if any("expedition" in c for c in lower_cats):
+        return "encounters.expedition"
+    if any("mystic ruins" in c for c in lower_cats):
+        return "encounters.mysticRuins"
+    if any("dream-quest" in c or "dreamquest" in c for c in lower_cats):
+        return "encounters.dreamQuest"
+    if any("devastation" in c for c in lower_cats):
+        return "encounters.devastation"
+    if any("special encounter" in c for c in lower_cats):
+        return "encounters.special"
+    if any("combat" in c for c in lower_cats):
+        return "encounters.combat"
+    if any("encounter" in c for c in lower_cats):
+        return "encounters.other"
+    
+    # Game components
+    if any("expansion" in c or "game set" in c for c in lower_cats):
+        return "gameSets"
+    if any("board" in c or "location" in c or "space" in c for c in lower_cats):
+        return "gameBoards"
+    if any("mechanic" in c or "rule" in c or "action" in c or "phase" in c for c in lower_cats):
+        return "mechanics"
+    
+    return "other"
+
+
+def collect_pages(node, pages: list) -> None:
+    """Find every (title, categories) pair anywhere in a dataset file."""
+    if isinstance(node, dict):
+        if isinstance(node.get("categories"), list) and "title" in node:
+            pages.append((node["title"], node["categories"]))
+            return
+        for value in node.values():
+            collect_pages(value, pages)
+    elif isinstance(node, list):
+        for value in node:
+            collect_pages(value, pages)
+
+
+def read_pages(path: Path) -> list:
+    pages = []
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".ndjson":
+            for line in f:
+                collect_pages(json.loads(line), pages)
+        else:
+            collect_pages(json.load(f), pages)
+    return pages
+
+
+def time_categorizer(categorize, pages: list, repeat: int) -> float:
+    """Best wall time over `repeat` passes of every page."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for title, categories in pages:
+            categorize(categories, title)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page categorization.")
+    parser.add_argument("inputs", nargs="*", type=Path, help="dataset JSON or NDJSON files")
+    parser.add_argument("--rules", type=Path, default=RULES_FILE, help="rule table to benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="passes per categorizer; the best one is reported")
+    args = parser.parse_args()
+
+    inputs = args.inputs or [p for p in DEFAULT_INPUTS if p.exists()][:1]
+    pages = []
+    for path in inputs:
+        pages.extend(read_pages(path))
+    if not pages:
+        print("[-] No pages with categories found in the inputs")
+        sys.exit(1)
+
+    # allPages and the category lists hold the same entries; count each page once
+    pages = list(dict(pages).items())
+    rules = CategoryRules.load(args.rules)
+    print(f"[*] {len(pages)} pages, {sum(len(c) for _, c in pages)} wiki categories "
+          f"from {', '.join(str(p) for p in inputs)}")
+
+    results = {}
+    for name, categorize in (
+        ("if-chain", legacy_categorize_page),
+        ("rule table", lambda categories, title: rules.classify(categories)),
+    ):
+        seconds = time_categorizer(categorize, pages, args.repeat)
+        results[name] = seconds
+        print(f"    {name:<11} {seconds * 1000:8.2f} ms  {len(pages) / seconds:12,.0f} pages/s")
+    print(f"    speedup     {results['if-chain'] / results['rule table']:8.2f}x")
+
+    fired = Counter()
+    differing = []
+    for title, categories in pages:
+        category, index, needle = rules.explain(categories)
+        fired[(category, needle)] += 1
+        if category != legacy_categorize_page(categories, title):
+            differing.append(title)
+
+    print("[*] Rules fired:")
+    for (category, needle), count in fired.most_common():
+        print(f"    {count:6}  {category:<24} {needle!r}" if needle else f"    {count:6}  {category:<24} (default)")
+    print(f"[*] Pages classified differently: {len(differing)}")
+    for title in differing[:20]:
+        print(f"    {title}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "httpx",
+#     "beautifulsoup4",
+#     "lxml",
+# ]
+# ///
+"""
+Benchmark the scraper and extractor hot paths against a frozen fixture
+corpus, keep a history of the results and fail when one regresses.
+
+Benchmarks, each timed best-of-N passes over the whole fixture corpus:
+    wikitext.parse_wikitext                           every frozen page
+    scrape_eldritch.categorize_page                   every frozen page's categories
+    wiki_markup.<profile> (each strip_wiki_markup)    every parsed section and infobox value
+    extract_mysteries_research.parse_research_encounters_simple
+                                                      the research encounter pages' fullText
+    extract_investigators.map_defeated_encounters     the investigators against the Defeated table
+    scrape_*.extract_table_data (all three scrapers)  every table in the saved HTML
+
+The fixtures live in bench_fixtures/ and only change when refrozen:
+    pages.json         wikitext pages: the real rawWikitext of the mythos cards (or of a
+                       scrape given with --dataset), plus research encounter and Defeated
+                       pages rebuilt as wikitext from the scraped tables when the
+                       source has none
+    html/<scraper>/    wiki HTML per scraper: saved from the wiki with --capture-html,
+                       otherwise rebuilt from the tables in scraped_encounters_filtered/
+
+Every run appends its timings to bench_history.jsonl, keyed by machine
+and fixture hash. --compare checks each benchmark against the median of the
+last few matching runs, retimes any that look slower, and exits 1 when one
+stays slower by more than --threshold (a regressed run is not recorded, so it
+can't become the baseline).
+
+    python bench_hot_paths.py                         # run and record
+    python bench_hot_paths.py --compare               # run, compare, fail on a regression
+    python bench_hot_paths.py --freeze-fixtures       # rebuild bench_fixtures/ from the repo's data
+    python bench_hot_paths.py --freeze-fixtures --dataset eldritch_horror_data.json --capture-html
+"""
+
+import argparse
+import gc
+import hashlib
+import html
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+import extract_investigators
+import extract_mysteries_research
+import scrape_encounters
+import scrape_other_world_encounters
+import scrape_research_encounters
+import wiki_markup
+from scrape_eldritch import categorize_page
+from wiki_http import WikiClient
+from wikitext import parse_wikitext
+
+SCRIPT_DIR = Path(__file__).parent
+PUBLIC_DIR = SCRIPT_DIR.parent / "app" / "public"
+FIXTURE_DIR = SCRIPT_DIR / "bench_fixtures"
+PAGES_FIXTURE = FIXTURE_DIR / "pages.json"
+HTML_FIXTURE_DIR = FIXTURE_DIR / "html"
+HISTORY_FILE = SCRIPT_DIR / "bench_history.jsonl"
+
+DEFAULT_THRESHOLD = 0.10  # Allowed slowdown against the baseline before --compare fails
+BASELINE_RUNS = 5  # Matching history runs whose median is the baseline
+MIN_SAMPLE_SECONDS = 0.2
+CONFIRM_RUNS = 2  # Extra timings of a benchmark --compare finds slower, before calling it a regression
+
+# Where --freeze-fixtures takes its data from
+WIKITEXT_SOURCES = [SCRIPT_DIR.parent / "mythos_cards.json"]
+SCRAPED_DIR = SCRIPT_DIR / "scraped_encounters_filtered"
+INVESTIGATORS_FILE = PUBLIC_DIR / "investigators_detailed.json"
+DEFEATED_TITLE = extract_investigators.PAGES[0]
+DEFEATED_SECTION = "Defeated Investigator Encounters"
+
+# html/<scraper>/ -> the scraper module, the scraped output it is rebuilt from, and its pages
+HTML_SCRAPERS = {
+    "encounters": (scrape_encounters, None, scrape_encounters.URLS),
+    "other_world": (
+        scrape_other_world_encounters,
+        "other-world-encounters.json",
+        scrape_other_world_encounters.OTHER_WORLD_URLS,
+    ),
+    "research": (
+        scrape_research_encounters,
+        "research-encounter.json",
+        list(scrape_research_encounters.RESEARCH_ENCOUNTER_URLS.values()),
+    ),
+}
+
+
+# Freezing the fixtures
+
+
+def collect_pages(node, pages: dict) -> None:
+    """Find every page with rawWikitext anywhere in a dataset file, by title."""
+    if isinstance(node, dict):
+        if isinstance(node.get("rawWikitext"), str) and "title" in node:
+            pages.setdefault(node["title"], {
+                "title": node["title"],
+                "categories": node.get("categories", []),
+                "rawWikitext": node["rawWikitext"],
+            })
+            return
+        for value in node.values():
+            collect_pages(value, pages)
+    elif isinstance(node, list):
+        for value in node:
+            collect_pages(value, pages)
+
+
+def cell_text(cell) -> str:
+    """A scraped table cell's text, whether stored as a string or {"text": ...}."""
+    return cell.get("text", "") if isinstance(cell, dict) else cell or ""
+
+
+def research_wikitext(ancient_one: str, encounters: dict) -> str:
+    """A research encounter page rebuilt as wikitext from its scraped tables."""
+    lines = [f"Research encounters for [[{ancient_one}]].", ""]
+    for section, rows in encounters.items():
+        lines += [f"== {section} Encounters ==", '{| class="wikitable"',
+                  '! scope="col" | ID #', '! scope="col" | Set', '! scope="col" | Encounter']
+        for row in rows:
+            links = row["Set"].get("links", []) if isinstance(row["Set"], dict) else []
+            expansion = links[0]["text"] if links else cell_text(row["Set"])
+            lines += ["|-", f"|{row['ID #']}", f"|[[{expansion}]]", f"|{cell_text(row['Encounter'])}"]
+        lines += ["|}", ""]
+    lines.append("[[Category:Research Encounters]]")
+    return "\n".join(lines)
+
+
+def defeated_wikitext(investigators: list) -> str:
+    """The Defeated page rebuilt as wikitext from each investigator's defeated encounters."""
+    lines = [f"== {DEFEATED_SECTION} ==", '{| class="wikitable"',
+             "! Investigator !! Loss of Health !! Loss of Sanity"]
+    for investigator in investigators:
+        encounters = investigator.get("defeatedEncounters") or {}
+        if encounters.get("lossOfHealth") and encounters.get("lossOfSanity"):
+            lines += ["|-", f"|[[{investigator['name']}]]",
+                      f"|{encounters['lossOfHealth']}", f"|{encounters['lossOfSanity']}"]
+    lines += ["|}", "[[Category:Rules]]"]
+    return "\n".join(lines)
+
+
+def freeze_pages(sources: list[Path], per_category: int) -> dict:
+    """The wikitext fixture: real pages from `sources`, topped up with rebuilt ones."""
+    found = {}
+    for path in sources:
+        print(f"[*] Reading wikitext from {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            collect_pages(json.load(f), found)
+
+    # A full scrape has thousands of pages; keep the first few of each category
+    taken = {}
+    pages = []
+    for page in found.values():
+        category = categorize_page(page["categories"], page["title"])
+        if taken.get(category, 0) < per_category:
+            taken[category] = taken.get(category, 0) + 1
+            pages.append({**page, "source": "wiki"})
+
+    if not taken.get("encounters.research"):
+        with open(SCRAPED_DIR / "research-encounter.json", "r", encoding="utf-8") as f:
+            ancient_ones = json.load(f)["ancient_ones"]
+        for ancient_one, scraped in ancient_ones.items():
+            pages.append({
+                "title": f"{ancient_one} Research Encounters",
+                "categories": ["Research Encounters"],
+                "rawWikitext": research_wikitext(ancient_one, scraped["encounters"]),
+                "source": "rebuilt from scraped_encounters_filtered/research-encounter.json",
+            })
+    if DEFEATED_TITLE not in found:
+        with open(INVESTIGATORS_FILE, "r", encoding="utf-8") as f:
+            investigators = json.load(f)
+        pages.append({
+            "title": DEFEATED_TITLE,
+            "categories": ["Rules"],
+            "rawWikitext": defeated_wikitext(investigators),
+            "source": f"rebuilt from {INVESTIGATORS_FILE.name}",
+            "investigators": [investigator["name"] for investigator in investigators],
+        })
+
+    return {
+        "frozenAt": datetime.now().isoformat(),
+        "sources": [str(path) for path in sources],
+        "pages": pages,
+    }
+
+
+def html_cell(cell, tag: str = "td") -> str:
+    """One scraped cell back as HTML: its images, then its text with the links put back."""
+    text = html.escape(cell_text(cell))
+    if isinstance(cell, dict):
+        # Links are in reading order: wrap each one's text after the previous link
+        position = 0
+        for link in cell.get("links", []):
+            escaped = html.escape(link["text"])
+            anchor = f'<a href="{html.escape(link["href"])}">{escaped}</a>'
+            start = text.find(escaped, position)
+            if start < 0:
+                start = position = len(text)
+                anchor = " " + anchor
+            text = text[:start] + anchor + text[start + len(escaped):]
+            position = start + len(anchor)
+        images = "".join(
+            f'<img alt="{html.escape(image["alt"])}" src="{html.escape(image["src"])}"/>'
+            for image in cell.get("images", [])
+        )
+        text = images + text
+    return f"<{tag}>{text}</{tag}>"
+
+
+def html_table(rows: list[dict]) -> str:
+    headers = [key for key in rows[0] if not key.startswith("_")]
+    lines = ['<table class="wikitable">', "<tbody>",
+             "<tr>" + "".join(f"<th>{html.escape(header)}</th>" for header in headers) + "</tr>"]
+    for row in rows:
+        lines.append("<tr>" + "".join(html_cell(row.get(header, "")) for header in headers) + "</tr>")
+    lines += ["</tbody>", "</table>"]
+    return "\n".join(lines)
+
+
+def html_page(title: str, sections: dict[str, list[list[dict]]]) -> str:
+    """A wiki article with one <h2> and its tables per section."""
+    body = []
+    for heading, tables in sections.items():
+        body.append(f'<h2><span class="mw-headline">{html.escape(heading)}</span></h2>')
+        body.extend(html_table(rows) for rows in tables if rows)
+    return (f"<!DOCTYPE html>\n<html><head><title>{html.escape(title)}</title></head><body>\n"
+            f'<h1 id="firstHeading">{html.escape(title)}</h1>\n'
+            '<div class="mw-parser-output">\n' + "\n".join(body) + "\n</div>\n</body></html>\n")
+
+
+def rebuilt_html_pages(scraper: str, output_name: str | None) -> dict[str, str]:
+    """{file stem: HTML} for one scraper, rebuilt from its scraped tables."""
+    pages = {}
+    if scraper == "research":
+        with open(SCRAPED_DIR / output_name, "r", encoding="utf-8") as f:
+            for ancient_one, scraped in json.load(f)["ancient_ones"].items():
+                sections = {f"{section} Encounters": [rows] for section, rows in scraped["encounters"].items()}
+                pages[f"{ancient_one}_Research_Encounters"] = html_page(f"{ancient_one} Research Encounters", sections)
+    elif scraper == "other_world":
+        with open(SCRAPED_DIR / output_name, "r", encoding="utf-8") as f:
+            for location, scraped in json.load(f)["encounters"].items():
+                pages[location.replace(" ", "_")] = html_page(location, {"Encounter Details": [scraped["tables"]]})
+    else:
+        for path in sorted(SCRAPED_DIR.glob("*.json")):
+            if path.name.startswith("_") or path.name in ("other-world-encounters.json", "research-encounter.json"):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                scraped = json.load(f)
+            sections = {
+                section: [content["tables"]]
+                for section, content in (scraped.get("encounters") or {}).items()
+                if isinstance(content, dict) and content.get("tables") and "ID #" in content["tables"][0]
+            }
+            if sections:
+                pages[path.stem] = html_page(scraped.get("title") or path.stem, sections)
+    return pages
+
+
+def captured_html_pages(urls: list[str], client: WikiClient) -> dict[str, str]:
+    """{file stem: HTML} for each page as the wiki serves it now."""
+    pages = {}
+    for url in urls:
+        print(f"  [>] Fetching {url}...")
+        response = client.get(url)
+        response.raise_for_status()
+        pages[url.split("/wiki/")[-1]] = response.text
+    return pages
+
+
+def freeze_fixtures(sources: list[Path], per_category: int, capture_html: bool) -> None:
+    fixture = freeze_pages(sources, per_category)
+    FIXTURE_DIR.mkdir(exist_ok=True)
+    with open(PAGES_FIXTURE, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, indent=2, ensure_ascii=False)
+    print(f"[+] {len(fixture['pages'])} pages -> {PAGES_FIXTURE}")
+
+    client = WikiClient(rate=1.0, follow_redirects=True) if capture_html else None
+    try:
+        for scraper, (_, output_name, urls) in HTML_SCRAPERS.items():
+            pages = captured_html_pages(urls, client) if client else rebuilt_html_pages(scraper, output_name)
+            directory = HTML_FIXTURE_DIR / scraper
+            directory.mkdir(parents=True, exist_ok=True)
+            for stale in directory.glob("*.html"):
+                stale.unlink()
+            for stem, text in pages.items():
+                (directory / f"{stem}.html").write_text(text, encoding="utf-8")
+            print(f"[+] {len(pages)} {'captured' if client else 'rebuilt'} HTML pages -> {directory}")
+    finally:
+        if client:
+            client.close()
+
+
+# Running the benchmarks
+
+
+def fixture_hash() -> str:
+    """Hash of every fixture file, so timings are only compared over the same corpus."""
+    digest = hashlib.sha256()
+    for path in sorted(FIXTURE_DIR.rglob("*")):
+        if path.is_file():
+            digest.update(path.relative_to(FIXTURE_DIR).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def machine_fingerprint() -> str:
+    """What makes timings comparable: CPU, core count and interpreter."""
+    cpu = platform.processor() or platform.machine()
+    return (f"{platform.system()} {platform.machine()} {cpu} x{os.cpu_count()} "
+            f"{platform.python_implementation()} {platform.python_version()}")
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def table_calls(scraper: str, path: Path) -> list[tuple]:
+    """Arguments of each extract_table_data call the scraper makes on a saved page."""
+    soup = BeautifulSoup(path.read_text(encoding="utf-8"), "lxml")
+    content = soup.find("div", class_="mw-parser-output") or soup
+    calls = []
+    section = ""
+    for elem in content.find_all(["h2", "h3", "h4", "table"]):
+        if elem.name != "table":
+            section = elem.get_text(" ", strip=True).replace("[edit]", "").strip()
+        elif scraper == "research":
+            # scrape_research_page files each table under City, Wilderness or Sea
+            kind = next((kind for kind in ("City", "Wilderness", "Sea") if kind.lower() in section.lower()), None)
+            if kind:
+                calls.append((elem, kind, path.stem.replace("_Research_Encounters", "")))
+        elif scraper == "other_world":
+            calls.append((elem, path.stem.replace("_", " ")))
+        else:
+            calls.append((elem, section))
+    return calls
+
+
+def load_benchmarks() -> dict[str, tuple]:
+    """{name: (function, argument tuples, bytes of input)} over the fixtures."""
+    if not PAGES_FIXTURE.exists():
+        print(f"[-] No fixtures in {FIXTURE_DIR}; run with --freeze-fixtures first")
+        sys.exit(1)
+    with open(PAGES_FIXTURE, "r", encoding="utf-8") as f:
+        pages = json.load(f)["pages"]
+
+    parsed = [parse_wikitext(page["rawWikitext"], page["title"]) for page in pages]
+    fragments = [text for page in parsed for text in (*page["sections"].values(), *page["infobox"].values()) if text]
+    research = [
+        page["fullText"] for page, source in zip(parsed, pages)
+        if categorize_page(source["categories"], source["title"]) == "encounters.research"
+    ]
+    defeated = next((page for page in pages if page["title"] == DEFEATED_TITLE), None)
+    defeated_rows = extract_investigators.parse_defeated_table(
+        parsed[pages.index(defeated)] if defeated else None
+    )
+    investigators = (defeated or {}).get("investigators") or [
+        source["title"] for source in pages
+        if categorize_page(source["categories"], source["title"]) == "investigators"
+    ]
+
+    def size(texts) -> int:
+        return sum(len(text.encode("utf-8")) for text in texts)
+
+    wikitext = [page["rawWikitext"] for page in pages]
+    benchmarks = {
+        "wikitext.parse_wikitext": (
+            parse_wikitext, [(page["rawWikitext"], page["title"]) for page in pages], size(wikitext)),
+        "scrape_eldritch.categorize_page": (
+            categorize_page, [(page["categories"], page["title"]) for page in pages], 0),
+    }
+    # The profiles themselves: through clean_wiki_markup's memo every pass after the first is a lookup
+    for profile, cleaner in wiki_markup.COMPILED.items():
+        benchmarks[f"wiki_markup.{profile}"] = (cleaner.clean, [(text,) for text in fragments], size(fragments))
+    benchmarks["extract_mysteries_research.parse_research_encounters_simple"] = (
+        extract_mysteries_research.parse_research_encounters_simple, [(text,) for text in research], size(research))
+    if defeated_rows and investigators:
+        benchmarks["extract_investigators.map_defeated_encounters"] = (
+            extract_investigators.map_defeated_encounters, [(investigators, defeated_rows)], 0)
+    else:
+        print(f"[!] No {DEFEATED_SECTION} table or investigators in the fixtures; "
+              "skipping map_defeated_encounters")
+
+    for scraper, (module, _, _) in HTML_SCRAPERS.items():
+        paths = sorted((HTML_FIXTURE_DIR / scraper).glob("*.html"))
+        calls = [call for path in paths for call in table_calls(scraper, path)]
+        if calls:
+            benchmarks[f"{module.__name__}.extract_table_data"] = (
+                module.extract_table_data, calls, sum(len(str(call[0]).encode("utf-8")) for call in calls))
+    return benchmarks
+
+
+def time_pass(function, calls: list[tuple], loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        for args in calls:
+            function(*args)
+    return time.perf_counter() - started
+
+
+def time_benchmark(function, calls: list[tuple], repeat: int) -> float:
+    """Best time per pass over every call, out of `repeat` samples.
+
+    Like timeit, a sample loops over the calls until it lasts MIN_SAMPLE_SECONDS,
+    and the garbage collector is off while timing; millisecond passes are
+    otherwise mostly scheduler noise.
+    """
+    loops = 1
+    while (elapsed := time_pass(function, calls, loops)) < MIN_SAMPLE_SECONDS:
+        loops = max(loops * 2, int(loops * MIN_SAMPLE_SECONDS / max(elapsed, 1e-9)))
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return min(time_pass(function, calls, loops) for _ in range(repeat)) / loops
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def read_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baselines(history: list[dict], machine: str, fixtures: str) -> tuple[dict[str, float], int]:
+    """Median best time per benchmark over the last BASELINE_RUNS comparable runs."""
+    runs = [run for run in history if run["machine"] == machine and run["fixtures"] == fixtures][-BASELINE_RUNS:]
+    times = {}
+    for run in runs:
+        for name, result in run["results"].items():
+            times.setdefault(name, []).append(result["seconds"])
+    return {name: statistics.median(values) for name, values in times.items()}, len(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper and extractor hot paths.")
+    parser.add_argument("--repeat", type=int, default=5, help="timed samples per benchmark; the best one is reported")
+    parser.add_argument("--only", nargs="+", metavar="NAME",
+                        help="run only benchmarks whose name contains one of these")
+    parser.add_argument("--compare", action="store_true",
+                        help="compare against earlier runs on this machine and exit 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"slowdown --compare tolerates, as a fraction (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE, help="JSONL file results are appended to")
+    parser.add_argument("--no-record", action="store_true", help="don't append this run to the history")
+    parser.add_argument("--freeze-fixtures", action="store_true", help=f"rebuild {FIXTURE_DIR.name}/ and exit")
+    parser.add_argument("--dataset", type=Path, nargs="+", default=WIKITEXT_SOURCES,
+                        help="with --freeze-fixtures: files to take rawWikitext pages from")
+    parser.add_argument("--per-category", type=int, default=100,
+                        help="with --freeze-fixtures: most pages kept per scraper category")
+    parser.add_argument("--capture-html", action="store_true",
+                        help="with --freeze-fixtures: save the scrapers' pages from the wiki instead of "
+                             "rebuilding them from scraped_encounters_filtered/")
+    args = parser.parse_args()
+
+    if args.freeze_fixtures:
+        freeze_fixtures(args.dataset, args.per_category, args.capture_html)
+        return
+
+    benchmarks = load_benchmarks()
+    if args.only:
+        benchmarks = {name: b for name, b in benchmarks.items() if any(part in name for part in args.only)}
+    machine, fixtures = machine_fingerprint(), fixture_hash()
+    history = read_history(args.history)
+    baseline, baseline_runs = baselines(history, machine, fixtures)
+    print(f"[*] {len(benchmarks)} benchmarks, fixtures {fixtures}, best of {args.repeat}")
+    if args.compare:
+        print(f"[*] Baseline: median of {baseline_runs} earlier runs on {machine}")
+
+    results = {}
+    regressions = []
+    for name, (function, calls, size) in benchmarks.items():
+        seconds = time_benchmark(function, calls, args.repeat)
+        if args.compare and name in baseline:
+            # A slow sample is often a noisy neighbour; only a repeatable slowdown counts
+            for _ in range(CONFIRM_RUNS):
+                if seconds <= baseline[name] * (1 + args.threshold):
+                    break
+                seconds = min(seconds, time_benchmark(function, calls, args.repeat))
+        results[name] = {"seconds": seconds, "calls": len(calls), "bytes": size}
+        line = f"    {name:<60} {seconds * 1000:9.2f} ms  {len(calls) / seconds:11,.0f} calls/s"
+        if size:
+            line += f"  {size / 1e6 / seconds:7.2f} MB/s"
+        if args.compare and name in baseline:
+            change = seconds / baseline[name] - 1
+            regressed = change > args.threshold
+            line += f"  {change:+7.1%}{'  REGRESSED' if regressed else ''}"
+            if regressed:
+                regressions.append(name)
+        print(line)
+
+    if args.compare and not baseline_runs:
+        print("[!] No earlier runs on this machine with these fixtures; nothing to compare against")
+    if not args.no_record and not regressions:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now().isoformat(),
+                "commit": git_commit(),
+                "machine": machine,
+                "fixtures": fixtures,
+                "repeat": args.repeat,
+                "results": results,
+            }) + "\n")
+        print(f"[+] Recorded in {args.history}")
+    if regressions:
+        print(f"[-] {len(regressions)} benchmarks regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
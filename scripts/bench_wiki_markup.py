@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared wiki markup cleaner against the three strip_wiki_markup
+copies it replaced. Cleans every section and infobox value of the pages found
+in the given dataset files (the hot-path fixtures, the scraper output, ...)
+with each profile and its old copy, and reports throughput for both, the
+memo's hit rate over one extraction-like pass, and any text a profile
+cleans differently from its copy.
+
+    python bench_wiki_markup.py bench_fixtures/pages.json --repeat 5
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from wikitext import parse_wikitext
+from wiki_markup import COMPILED, clean_cached, clean_wiki_markup
+
+DEFAULT_INPUTS = [
+    Path(__file__).parent / "bench_fixtures" / "pages.json",
+    Path(__file__).parent.parent / "mythos_cards.json",
+]
+
+
+def legacy_investigators(text: str) -> str:
+    """The strip_wiki_markup copy extract_investigators.py had, kept as the baseline."""
+    if not text:
+        return ""
+    # Remove wiki links [[text]] or [[link|text]]
+    text = re.sub(r'\[\[(?:[^|\]]*\|)?([^\]]+)\]\]', r'\1', text)
+    # Remove templates {{...}} but try to extract meaningful names
+    text = re.sub(r'\{\{([A-Za-z]+)\s+imagelink[^}]*\}\}', r'\1', text)  # Handle imagelink templates
+    text = re.sub(r'\{\{([A-Za-z ]+)\}\}', r'\1', text)  # Simple templates become their name
+    text = re.sub(r'\{\{[^}]*\}\}', '', text)  # Remove remaining templates
+    # Remove file references
+    text = re.sub(r'\[\[File:[^\]]+\]\]', '', text)
+    # Remove heading markers
+    text = re.sub(r'={2,}([^=]+)={2,}', r'\1', text)
+    # Remove bold/italic markers
+    text = re.sub(r"'{2,}", '', text)
+    # Remove Category markers
+    text = re.sub(r'Category:[^\n]+', '', text)
+    # Clean up extra whitespace
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r' {2,}', ' ', text)
+    return text.strip()
+
+
+def legacy_ancient_ones(text: str) -> str:
+    """The strip_wiki_markup copy extract_ancient_ones.py had, kept as the baseline."""
+    if not text:
+        return ""
+    
+    # Remove file/image references
+    text = re.sub(r'\[\[File:[^\]]+\]\]', '', text)
+    text = re.sub(r'\[\[file:[^\]]+\]\]', '', text)
+    
+    # Convert wiki links [[Link|Display]] to Display
+    text = re.sub(r'\[\[([^|\]]+)\|([^\]]+)\]\]', r'\2', text)
+    # Convert wiki links [[Link]] to Link
+    text = re.sub(r'\[\[([^\]]+)\]\]', r'\1', text)
+    
+    # Remove templates {{...}}
+    text = re.sub(r'\{\{[^}]+\}\}', '', text)
+    
+    # Remove bold/italic markers
+    text = re.sub(r"'''+", '', text)
+    text = re.sub(r"''", '', text)
+    
+    # Remove table markup
+    text = re.sub(r'\{\|[^}]*\|\}', '', text, flags=re.DOTALL)
+    text = re.sub(r'\|-', '', text)
+    text = re.sub(r'\|[^\n]*\n', '', text)
+    
+    # Remove section headers formatting
+    text = re.sub(r'={2,}[^=]+=+', '', text)
+    
+    # Clean up whitespace
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r' {2,}', ' ', text)
+    
+    return text.strip()
+
+
+def legacy_mysteries(text: str) -> str:
+    """The strip_wiki_markup copy extract_mysteries_research.py had, kept as the baseline."""
+    if not text:
+        return ""
+    
+    # Remove file/image references
+    text = re.sub(r'\[\[File:[^\]]+\]\]', '', text)
+    text = re.sub(r'\[\[file:[^\]]+\]\]', '', text)
+    
+    # Convert wiki links [[Link|Display]] to Display
+    text = re.sub(r'\[\[([^|\]]+)\|([^\]]+)\]\]', r'\2', text)
+    # Convert wiki links [[Link]] to Link
+    text = re.sub(r'\[\[([^\]]+)\]\]', r'\1', text)
+    
+    # Remove templates {{...}} but try to preserve some content
+    text = re.sub(r'\{\{Core Game\}\}', 'Core', text)
+    text = re.sub(r'\{\{FL imagelink\}\}', 'Forsaken Lore', text)
+    text = re.sub(r'\{\{TD imagelink\}\}', 'The Dreamlands', text)
+    text = re.sub(r'\{\{MoM imagelink\}\}', 'Mountains of Madness', text)
+    text = re.sub(r'\{\{SR imagelink\}\}', 'Strange Remnants', text)
+    text = re.sub(r'\{\{UtP imagelink\}\}', 'Under the Pyramids', text)
+    text = re.sub(r'\{\{CiR imagelink\}\}', 'Cities in Ruin', text)
+    text = re.sub(r'\{\{SoC imagelink\}\}', 'Signs of Carcosa', text)
+    text = re.sub(r'\{\{MoN imagelink\}\}', 'Masks of Nyarlathotep', text)
+    
+    # Skill checks
+    text = re.sub(r'\{\{(Observation|Lore|Influence|Will|Strength)\}\}', r'(\1)', text)
+    text = re.sub(r'\{\{(Observation|Lore|Influence|Will|Strength)\|[^}]*\}\}', r'(\1)', text)
+    
+    # Icons
+    text = re.sub(r'\{\{Icon\|clue\}\}', 'Clue', text)
+    text = re.sub(r'\{\{Icon\|et\}\}', 'Eldritch Token', text)
+    text = re.sub(r'\{\{Icon\|sea\}\}', 'Sea', text)
+    text = re.sub(r'\{\{Icon\|city\}\}', 'City', text)
+    text = re.sub(r'\{\{Icon\|wilderness\}\}', 'Wilderness', text)
+    text = re.sub(r'\{\{Icon\|[^}]*\}\}', '', text)
+    
+    # Health/Sanity
+    text = re.sub(r'\{\{Health\|value=(\d+)\}\}', r'\1 Health', text)
+    text = re.sub(r'\{\{Sanity\|value=(\d+)\}\}', r'\1 Sanity', text)
+    text = re.sub(r'\{\{Health\}\}', 'Health', text)
+    text = re.sub(r'\{\{Sanity\}\}', 'Sanity', text)
+    
+    # Generic template removal
+    text = re.sub(r'\{\{[^}]+\}\}', '', text)
+    
+    # Remove table markup section headers
+    text = re.sub(r'\[City Encounters\s*\]', '', text)
+    text = re.sub(r'\[Wilderness Encounters\s*\]', '', text)
+    text = re.sub(r'\[Sea Encounters\s*\]', '', text)
+    text = re.sub(r'\[Special Encounters\s*\]', '', text)
+    
+    # Clean up whitespace
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r' {2,}', ' ', text)
+    
+    return text.strip()
+
+LEGACY = {
+    "investigators": legacy_investigators,
+    "ancient_ones": legacy_ancient_ones,
+    "mysteries": legacy_mysteries,
+}
+
+
+def collect_texts(node, texts: list) -> None:
+    """Every section and infobox value of every rawWikitext page in a dataset file, parsed."""
+    if isinstance(node, dict):
+        if isinstance(node.get("rawWikitext"), str):
+            parsed = parse_wikitext(node["rawWikitext"], node.get("title", ""))
+            texts.extend(text for text in (*parsed["sections"].values(), *parsed["infobox"].values()) if text)
+            texts.append(node["rawWikitext"])
+            return
+        for value in node.values():
+            collect_texts(value, texts)
+    elif isinstance(node, list):
+        for value in node:
+            collect_texts(value, texts)
+
+
+def time_cleaner(clean, texts: list, repeat: int) -> float:
+    """Best wall time over `repeat` passes of every text."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            clean(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark wiki markup cleaning.")
+    parser.add_argument("inputs", nargs="*", type=Path, help="dataset JSON files containing rawWikitext")
+    parser.add_argument("--repeat", type=int, default=5, help="passes per cleaner; the best one is reported")
+    args = parser.parse_args()
+
+    inputs = args.inputs or [p for p in DEFAULT_INPUTS if p.exists()][:1]
+    texts = []
+    for path in inputs:
+        with open(path, "r", encoding="utf-8") as f:
+            collect_texts(json.load(f), texts)
+    if not texts:
+        print("[-] No rawWikitext found in the inputs")
+        sys.exit(1)
+
+    size_mb = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+    print(f"[*] {len(texts)} texts, {size_mb:.2f} MB from {', '.join(str(p) for p in inputs)}")
+
+    differing = {}
+    for profile, legacy in LEGACY.items():
+        old = time_cleaner(legacy, texts, args.repeat)
+        new = time_cleaner(COMPILED[profile].clean, texts, args.repeat)
+        print(f"    {profile:<14} copy {old * 1000:8.1f} ms  profile {new * 1000:8.1f} ms  "
+              f"{size_mb / new:7.2f} MB/s  {old / new:5.2f}x")
+        differing[profile] = [text for text in texts if legacy(text) != COMPILED[profile].clean(text)]
+
+    # Extractors clean each page's sections several times: one extraction-like pass through the memo
+    clean_cached.cache_clear()
+    for text in texts + texts[::2]:
+        clean_wiki_markup(text, "ancient_ones")
+    info = clean_cached.cache_info()
+    print(f"[*] Memo over a pass with repeats: {info.hits} hits, {info.misses} misses")
+
+    print(f"[*] Texts cleaned differently: { {profile: len(texts) for profile, texts in differing.items()} }")
+    for profile, texts in differing.items():
+        for text in texts[:5]:
+            print(f"    {profile}: {text[:100]!r}")
+
+
+if __name__ == "__main__":
+    main()
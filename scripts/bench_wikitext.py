@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark the wikitext tokenizer against the old regex-cascade parser.
+Reads every `rawWikitext` string found in the given dataset files (the
+scraper output, mythos_cards.json, ...) and reports parse throughput in MB/s
+for both implementations, plus how many pages they parse differently.
+
+    python bench_wikitext.py ../mythos_cards.json --repeat 5
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from wikitext import parse_wikitext
+
+DEFAULT_INPUTS = [
+    Path(__file__).parent.parent / "app" / "public" / "eldritch_horror_data.json",
+    Path(__file__).parent.parent / "mythos_cards.json",
+]
+
+
+def legacy_parse_wikitext(content: str, title: str) -> dict:
+    """The regex-cascade parser wikitext.py replaced, kept as the baseline."""
+    parsed = {
+        "title": title,
+        "infobox": {},
+        "sections": {},
+        "links": [],
+        "templates": [],
+        "fullText": "",
+        "cardData": {},
+    }
+
+    for template_match in re.finditer(r"\{\{([^}]+)\}\}", content, re.DOTALL):
+        template_content = template_match.group(1)
+        for match in re.finditer(r"\|\s*([^=\n]+)\s*=\s*([^|\n][^|]*?)(?=\||\}\}|$)", template_content, re.DOTALL):
+            key = match.group(1).strip().lower()
+            value = match.group(2).strip()
+            value = re.sub(r"\[\[([^|\]]+)\|([^\]]+)\]\]", r"\2", value)
+            value = re.sub(r"\[\[([^\]]+)\]\]", r"\1", value)
+            value = re.sub(r"'''([^']+)'''", r"\1", value)
+            value = re.sub(r"''([^']+)''", r"\1", value)
+
+            if value:
+                if key in ("effect", "action", "text", "description", "flavor",
+                          "lore", "pass", "fail", "test", "initial", "reckoning",
+                          "cost", "toughness", "horror", "damage", "spawn",
+                          "trait", "type", "expansion", "set"):
+                    parsed["cardData"][key] = value
+                parsed["infobox"][key] = value
+
+    section_pattern = r"(==+)\s*([^=]+)\s*\1\s*\n(.*?)(?=\n==|\Z)"
+    for match in re.finditer(section_pattern, content, re.DOTALL):
+        section_name = match.group(2).strip()
+        section_content = match.group(3).strip()
+        section_content = re.sub(r"\[\[([^|\]]+)\|([^\]]+)\]\]", r"\2", section_content)
+        section_content = re.sub(r"\[\[([^\]]+)\]\]", r"\1", section_content)
+        section_content = re.sub(r"\{\{[^}]+\}\}", "", section_content)
+        section_content = re.sub(r"<[^>]+>", "", section_content)
+        if section_content:
+            parsed["sections"][section_name] = section_content
+
+    for match in re.finditer(r"\[\[([^\]|]+)(?:\|[^\]]*)?]]", content):
+        link = match.group(1).strip()
+        if not link.startswith(("File:", "Category:", "Image:")):
+            parsed["links"].append(link)
+
+    for match in re.finditer(r"\{\{([^}|]+)", content):
+        template = match.group(1).strip()
+        if not template.startswith("#") and len(template) < 50:
+            parsed["templates"].append(template)
+
+    clean = content
+    clean = re.sub(r"\{\{[^}]+\}\}", "", clean)
+    clean = re.sub(r"\[\[File:[^\]]+\]\]", "", clean)
+    clean = re.sub(r"\[\[Category:[^\]]+\]\]", "", clean)
+    clean = re.sub(r"\[\[([^|\]]+)\|([^\]]+)\]\]", r"\2", clean)
+    clean = re.sub(r"\[\[([^\]]+)\]\]", r"\1", clean)
+    clean = re.sub(r"'''([^']+)'''", r"\1", clean)
+    clean = re.sub(r"''([^']+)''", r"\1", clean)
+    clean = re.sub(r"==+\s*([^=]+)\s*==+", r"\n[\1]\n", clean)
+    clean = re.sub(r"<[^>]+>", "", clean)
+    clean = re.sub(r"\n{3,}", "\n\n", clean)
+    parsed["fullText"] = clean.strip()
+
+    return parsed
+
+
+def collect_pages(node, pages: list) -> None:
+    """Find every (title, rawWikitext) pair anywhere in a dataset file."""
+    if isinstance(node, dict):
+        if isinstance(node.get("rawWikitext"), str):
+            pages.append((node.get("title", ""), node["rawWikitext"]))
+            return
+        for value in node.values():
+            collect_pages(value, pages)
+    elif isinstance(node, list):
+        for value in node:
+            collect_pages(value, pages)
+
+
+def time_parser(parse, pages: list, repeat: int) -> float:
+    """Best wall time over `repeat` passes of the whole corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for title, content in pages:
+            parse(content, title)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark wikitext parsing throughput.")
+    parser.add_argument("inputs", nargs="*", type=Path, help="dataset JSON files containing rawWikitext")
+    parser.add_argument("--repeat", type=int, default=5, help="passes per parser; the best one is reported")
+    args = parser.parse_args()
+
+    inputs = args.inputs or [p for p in DEFAULT_INPUTS if p.exists()][:1]
+    pages = []
+    for path in inputs:
+        with open(path, "r", encoding="utf-8") as f:
+            collect_pages(json.load(f), pages)
+    if not pages:
+        print("[-] No rawWikitext found in the inputs")
+        sys.exit(1)
+
+    size_mb = sum(len(content.encode("utf-8")) for _, content in pages) / 1e6
+    print(f"[*] {len(pages)} pages, {size_mb:.2f} MB from {', '.join(str(p) for p in inputs)}")
+
+    results = {}
+    for name, parse in (("legacy regex", legacy_parse_wikitext), ("tokenizer", parse_wikitext)):
+        seconds = time_parser(parse, pages, args.repeat)
+        results[name] = seconds
+        print(f"    {name:<13} {seconds * 1000:8.1f} ms  {size_mb / seconds:7.2f} MB/s")
+    print(f"    speedup       {results['legacy regex'] / results['tokenizer']:8.2f}x")
+
+    fields = ("infobox", "cardData", "sections", "links", "templates", "fullText")
+    differing = {field: 0 for field in fields}
+    for title, content in pages:
+        old, new = legacy_parse_wikitext(content, title), parse_wikitext(content, title)
+        for field in fields:
+            differing[field] += old[field] != new[field]
+    print(f"[*] Pages parsed differently: {differing}")
+
+
+if __name__ == "__main__":
+    main()
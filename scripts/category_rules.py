@@ -0,0 +1,74 @@
+"""
+Rule-table page categorizer.
+category_rules.json lists which wiki-category substrings put a page in which
+dataset category, in priority order. The table is compiled once into a
+single regex with one alternative per substring, in rule order. One scan
+over a page's joined, lowercased categories finds every substring
+occurrence, including overlapping ones, and the lowest-numbered rule among
+them wins. Editing the JSON file changes the mapping without touching
+code.
+"""
+
+import json
+import re
+from pathlib import Path
+
+from dataset_io import category_names
+
+RULES_FILE = Path(__file__).parent / "category_rules.json"
+
+
+class CategoryRules:
+    """Compiled rule table: classify() maps a page's wiki categories to a dataset category."""
+
+    def __init__(self, rules: list[dict], default: str = "other"):
+        known = set(category_names())
+        for category in [rule["category"] for rule in rules] + [default]:
+            if category not in known:
+                raise ValueError(f"Unknown dataset category {category!r} in category rules")
+
+        self.rules = rules
+        self.default = default
+        self.owners = {}  # Lowercased substring -> (rule index, substring)
+        for index, rule in enumerate(rules):
+            for needle in rule["contains"]:
+                self.owners.setdefault(needle.lower(), (index, needle))
+        # Alternatives are tried in rule order, so a match is the highest-priority
+        # substring starting at its position. Plain literals (no groups) let the
+        # regex engine skip ahead to the next possible first character.
+        alternatives = "|".join(re.escape(needle) for needle in self.owners)
+        self.pattern = re.compile(alternatives) if self.owners else None
+
+    @classmethod
+    def load(cls, path: Path = RULES_FILE) -> "CategoryRules":
+        with open(path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        return cls(table["rules"], table.get("default", "other"))
+
+    def explain(self, categories: list[str]) -> tuple[str, int | None, str | None]:
+        """Return (dataset category, index of the rule that fired, substring it matched).
+
+        The rule index and substring are None when the page falls through to
+        the default category.
+        """
+        best = None
+        if self.pattern is not None:
+            # Newlines keep a substring from matching across two categories
+            text = "\n".join(categories).lower()
+            search = self.pattern.search
+            match = search(text)
+            while match:
+                owner = self.owners[match.group()]
+                if best is None or owner[0] < best[0]:
+                    best = owner
+                    if owner[0] == 0:
+                        break
+                # Resume one character on, not at the match end, so a lower-priority
+                # substring cannot swallow the start of a higher-priority one
+                match = search(text, match.start() + 1)
+        if best is None:
+            return self.default, None, None
+        return self.rules[best[0]]["category"], best[0], best[1]
+
+    def classify(self, categories: list[str]) -> str:
+        return self.explain(categories)[0]
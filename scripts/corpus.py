@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+SQLite + FTS5 store for the scraped wiki corpus.
+`scrape_eldritch.py --format sqlite` writes it directly (SqliteDatasetWriter);
+`python corpus.py build eldritch_horror_data.json` converts an existing JSON
+output. Pages, their dataset category, wiki categories, links and templates
+are indexed tables, and fullText is searchable through FTS5, so an extractor
+can read just the categories it needs instead of json.load-ing the whole
+corpus:
+
+    python corpus.py search "gate burst" --limit 5
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from dataset_io import category_names, compute_stats, load_dataset, new_metadata
+from json_stream import JsonStream, StreamedDataset
+from shards import ShardedDataset, shard_dir
+
+SCHEMA = """
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE pages (
+    page_id INTEGER PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    title TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX pages_category ON pages (category, seq);
+CREATE INDEX pages_seq ON pages (seq);
+CREATE TABLE page_categories (page_id INTEGER NOT NULL, name TEXT NOT NULL);
+CREATE INDEX page_categories_name ON page_categories (name);
+CREATE INDEX page_categories_page ON page_categories (page_id);
+CREATE TABLE links (page_id INTEGER NOT NULL, target TEXT NOT NULL);
+CREATE INDEX links_target ON links (target);
+CREATE INDEX links_page ON links (page_id);
+CREATE TABLE templates (page_id INTEGER NOT NULL, name TEXT NOT NULL);
+CREATE INDEX templates_name ON templates (name);
+CREATE INDEX templates_page ON templates (page_id);
+CREATE VIRTUAL TABLE fulltext USING fts5(title, body);
+"""
+
+# Metadata timestamps marking a write of the dataset's content (ISO strings compare in time order)
+WRITTEN_AT_KEYS = ("scrapedAt", "refreshedAt", "reparsedAt")
+
+
+def corpus_path(output_path: Path) -> Path:
+    """The corpus lives next to the JSON output: eldritch_horror_data.sqlite."""
+    return output_path.with_suffix(".sqlite")
+
+
+class SqliteDatasetWriter:
+    """Write pages into a fresh corpus database as they finish.
+
+    `pages.entry` holds the complete dataset entry as JSON; the other tables
+    index it. Same interface as the writers in dataset_io.
+    """
+
+    def __init__(self, path: Path, source: str):
+        self.path = path
+        path.unlink(missing_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.meta = new_metadata(source)
+        self.seq = 0
+
+    @property
+    def metadata(self) -> dict:
+        return self.meta
+
+    @property
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def add(self, entry: dict, category: str) -> None:
+        page_id = entry["pageId"]
+        # Like allPages[title] in the JSON output, a later page replaces an earlier one of the same title
+        stale = [row[0] for row in self.db.execute(
+            "SELECT page_id FROM pages WHERE page_id = ? OR title = ?", (page_id, entry["title"])
+        )]
+        for old_id in stale:
+            for table in ("pages", "page_categories", "links", "templates"):
+                self.db.execute(f"DELETE FROM {table} WHERE page_id = ?", (old_id,))
+            self.db.execute("DELETE FROM fulltext WHERE rowid = ?", (old_id,))
+
+        self.seq += 1
+        self.db.execute(
+            "INSERT INTO pages VALUES (?, ?, ?, ?, ?)",
+            (page_id, self.seq, entry["title"], category, json.dumps(entry, ensure_ascii=False)),
+        )
+        self.db.executemany("INSERT INTO page_categories VALUES (?, ?)", [(page_id, c) for c in entry["categories"]])
+        # Entries written under a projection profile may lack the indexed fields
+        self.db.executemany("INSERT INTO links VALUES (?, ?)", [(page_id, link) for link in entry.get("links", [])])
+        self.db.executemany("INSERT INTO templates VALUES (?, ?)",
+                            [(page_id, name) for name in entry.get("templates", [])])
+        self.db.execute("INSERT INTO fulltext (rowid, title, body) VALUES (?, ?, ?)",
+                        (page_id, entry["title"], entry.get("fullText", "")))
+
+    def close(self) -> None:
+        counts = dict(self.db.execute("SELECT category, COUNT(*) FROM pages GROUP BY category").fetchall())
+        self.meta["totalPages"] = self.count
+        self.meta["stats"] = compute_stats(counts)
+        self.db.executemany(
+            "INSERT OR REPLACE INTO metadata VALUES (?, ?)",
+            [(key, json.dumps(value, ensure_ascii=False)) for key, value in self.meta.items()],
+        )
+        self.db.commit()
+        self.db.close()
+
+
+class Corpus:
+    """Read-only queries against a corpus database."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.db.close()
+
+    @property
+    def metadata(self) -> dict:
+        return {key: json.loads(value) for key, value in self.db.execute("SELECT key, value FROM metadata")}
+
+    def iter_category(self, name: str):
+        """Entries of a dataset category ("mythos", "encounters.research"), in scrape order."""
+        for row in self.db.execute("SELECT entry FROM pages WHERE category = ? ORDER BY seq", (name,)):
+            yield json.loads(row[0])
+
+    def category(self, name: str) -> list[dict]:
+        return list(self.iter_category(name))
+
+    def page(self, title: str) -> dict | None:
+        row = self.db.execute("SELECT entry FROM pages WHERE title = ?", (title,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def with_wiki_category(self, name: str) -> list[dict]:
+        """Entries tagged with a wiki category such as "Mythos", in scrape order."""
+        rows = self.db.execute(
+            "SELECT entry FROM pages WHERE page_id IN (SELECT page_id FROM page_categories WHERE name = ?) "
+            "ORDER BY seq",
+            (name,),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def links_to(self, target: str) -> list[str]:
+        """Titles of pages linking to `target`."""
+        rows = self.db.execute(
+            "SELECT DISTINCT p.title FROM links l JOIN pages p USING (page_id) WHERE l.target = ? ORDER BY p.seq",
+            (target,),
+        )
+        return [row[0] for row in rows]
+
+    def using_template(self, name: str) -> list[str]:
+        """Titles of pages that use template `name`."""
+        rows = self.db.execute(
+            "SELECT DISTINCT p.title FROM templates t JOIN pages p USING (page_id) WHERE t.name = ? ORDER BY p.seq",
+            (name,),
+        )
+        return [row[0] for row in rows]
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[str, str]]:
+        """Full-text search over titles and fullText: (title, snippet) pairs, best match first."""
+        rows = self.db.execute(
+            "SELECT title, snippet(fulltext, 1, '[', ']', '…', 12) FROM fulltext WHERE fulltext MATCH ? "
+            "ORDER BY rank LIMIT ?",
+            (query, limit),
+        )
+        return rows.fetchall()
+
+
+def written_at(metadata: dict) -> str:
+    """When a dataset's content was last written, from its metadata ("" if unknown)."""
+    return max((metadata.get(key) or "" for key in WRITTEN_AT_KEYS), default="")
+
+
+def sibling_source(data_path: Path):
+    """An open reader for a corpus database or shard directory next to `data_path`, or None.
+
+    A sibling is only used while it is at least as fresh as the JSON file:
+    after a later JSON scrape, --incremental or --reparse, it is ignored.
+    """
+    json_written_at = ""
+    if data_path.exists():
+        with JsonStream(data_path) as stream:
+            json_written_at = written_at(stream.get("metadata", default={}))
+    if corpus_path(data_path).exists():
+        corpus = Corpus(corpus_path(data_path))
+        if written_at(corpus.metadata) >= json_written_at:
+            return corpus
+        corpus.db.close()
+        print(f"⚠️  Ignoring {corpus_path(data_path)}: older than {data_path}")
+    if shard_dir(data_path).exists():
+        shards = ShardedDataset(shard_dir(data_path))
+        if written_at(shards.metadata) >= json_written_at:
+            return shards
+        print(f"⚠️  Ignoring {shard_dir(data_path)}: older than {data_path}")
+    return None
+
+
+def open_dataset(data_path: Path):
+    """The cheapest reader for eldritch_horror_data.json and its siblings.
+
+    A corpus database next to `data_path` wins, then a shard directory, then
+    a streamed read of the JSON file itself (see sibling_source). Every
+    reader offers metadata, category(name), iter_category(name) and
+    page(title), and is a context manager.
+    """
+    data_path = Path(data_path)
+    source = sibling_source(data_path)
+    return source if source is not None else StreamedDataset(data_path)
+
+
+def load_categories(data_path: Path, categories: list[str], titles: list[str] = ()) -> dict:
+    """Read part of eldritch_horror_data.json, nested layout.
+
+    Only the given dotted categories and titled pages are read (see
+    open_dataset); the result has the usual "categories" and "allPages"
+    keys holding just those.
+    """
+    with open_dataset(data_path) as source:
+        return dataset_subset(source, categories, titles)
+
+
+class LoadedDataset:
+    """Categories and pages read once and held in memory, indexed by category, title and pageId.
+
+    Same read interface as the other readers, so one instance can be shared
+    by several extractors (extract_all.py). Only what was asked for is held:
+    category() of a category that was not read raises KeyError.
+    """
+
+    def __init__(self, metadata: dict, categories: dict[str, list[dict]], pages: list[dict] = ()):
+        self.metadata = metadata
+        self.categories = categories
+        self.titles = {}
+        self.page_ids = {}
+        for entry in [*(entry for entries in categories.values() for entry in entries), *pages]:
+            self.titles[entry["title"]] = entry
+            self.page_ids[entry["pageId"]] = entry
+
+    @classmethod
+    def read(cls, data_path: Path, categories: list[str], titles: list[str] = ()) -> "LoadedDataset":
+        """Read the given dotted categories and titled pages, from the cheapest source.
+
+        A corpus database or shard directory as fresh as the JSON is read
+        through open_dataset. Otherwise the JSON file is parsed whole:
+        holding several categories anyway, one json.load beats a streamed
+        scan per category.
+        """
+        data_path = Path(data_path)
+        source = sibling_source(data_path)
+        if source is None:
+            data = load_dataset(data_path)
+            loaded = {}
+            for name in categories:
+                parent, _, child = name.partition(".")
+                group = data["categories"].get(parent, {} if child else [])
+                loaded[name] = group.get(child, []) if child else group
+            pages = [data["allPages"][title] for title in titles if title in data["allPages"]]
+            return cls(data["metadata"], loaded, pages)
+
+        with source:
+            loaded = {name: source.category(name) for name in categories}
+            pages = [entry for entry in map(source.page, titles) if entry is not None]
+            return cls(source.metadata, loaded, pages)
+
+    def __enter__(self) -> "LoadedDataset":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+    def category(self, name: str) -> list[dict]:
+        """Entries of a dataset category ("mythos", "encounters.research"), in scrape order."""
+        if name not in self.categories:
+            raise KeyError(f"Category {name!r} was not loaded (loaded: {', '.join(self.categories)})")
+        return self.categories[name]
+
+    def iter_category(self, name: str):
+        return iter(self.category(name))
+
+    def page(self, title: str) -> dict | None:
+        return self.titles.get(title)
+
+    def page_by_id(self, page_id: int) -> dict | None:
+        return self.page_ids.get(page_id)
+
+
+def dataset_subset(source, categories: list[str], titles: list[str]) -> dict:
+    """Build a partial nested dataset from a Corpus or ShardedDataset."""
+    data = {"metadata": source.metadata, "categories": {}, "allPages": {}}
+    for name in categories:
+        entries = source.category(name)
+        parent, _, child = name.partition(".")
+        if child:
+            data["categories"].setdefault(parent, {})[child] = entries
+        else:
+            data["categories"][parent] = entries
+        data["allPages"].update((entry["title"], entry) for entry in entries)
+    for title in titles:
+        entry = source.page(title)
+        if entry is not None:
+            data["allPages"][title] = entry
+    return data
+
+
+def build_corpus(data_path: Path, output_path: Path) -> int:
+    """Convert a JSON output (either layout) into a corpus database."""
+    data = load_dataset(data_path)
+    categories = {}
+    for name in category_names():
+        parent, _, child = name.partition(".")
+        for entry in data["categories"][parent][child] if child else data["categories"][parent]:
+            categories[entry["title"]] = name
+
+    writer = SqliteDatasetWriter(output_path, data["metadata"]["source"])
+    writer.meta.update({key: value for key, value in data["metadata"].items() if key not in ("totalPages", "stats")})
+    for title, entry in data["allPages"].items():
+        writer.add(entry, categories.get(title, "other"))
+    count = writer.count
+    writer.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the SQLite wiki corpus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="convert a JSON output into a corpus database")
+    build.add_argument("input", type=Path, help="eldritch_horror_data.json (either layout)")
+    build.add_argument("--output", type=Path, help="database file (default: <input>.sqlite)")
+
+    search = commands.add_parser("search", help="full-text search (FTS5 query syntax)")
+    search.add_argument("query")
+    search.add_argument("--corpus", type=Path, default=Path("eldritch_horror_data.sqlite"))
+    search.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        output_path = args.output or corpus_path(args.input)
+        count = build_corpus(args.input, output_path)
+        print(f"✅ Wrote {count} pages to {output_path}")
+    else:
+        if not args.corpus.exists():
+            print(f"❌ No corpus at {args.corpus}")
+            sys.exit(1)
+        with Corpus(args.corpus) as corpus:
+            for title, snippet in corpus.search(args.query, args.limit):
+                print(f"{title}\n    {snippet}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Dataset writers for the Necronomicon Compiler.
+JsonDatasetWriter builds the classic eldritch_horror_data.json in memory.
+NdjsonDatasetWriter streams one page record per line as pages finish and
+keeps only a small sidecar index, so memory stays flat however large the
+wiki grows; assemble_json turns that back into the monolithic file.
+
+Both can write either layout of the monolithic file:
+  nested      every entry appears in full in its category list and again
+              under allPages[title] (the original format)
+  normalized  every entry is stored once under pages[pageId]; category
+              lists hold page ids and allPages maps title -> page id
+load_dataset reads either one back in the nested shape.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+CATEGORY_LAYOUT = {
+    "investigators": None,
+    "ancientOnes": None,
+    "monsters": None,
+    "epicMonsters": None,
+    "assets": None,
+    "uniqueAssets": None,
+    "artifacts": None,
+    "spells": None,
+    "conditions": None,
+    "encounters": [
+        "general",
+        "location",
+        "research",
+        "otherWorld",
+        "expedition",
+        "mysticRuins",
+        "dreamQuest",
+        "devastation",
+        "special",
+        "combat",
+        "other",
+    ],
+    "mythos": None,
+    "mysteries": None,
+    "preludes": None,
+    "adventures": None,
+    "personalStories": None,
+    "gameSets": None,
+    "gameBoards": None,
+    "mechanics": None,
+    "other": None,
+}
+
+# Categories reported in metadata.stats, in output order
+STATS_KEYS = [
+    "investigators",
+    "ancientOnes",
+    "monsters",
+    "epicMonsters",
+    "assets",
+    "uniqueAssets",
+    "artifacts",
+    "spells",
+    "conditions",
+    "totalEncounters",
+    "mythos",
+    "mysteries",
+    "preludes",
+    "gameSets",
+    "mechanics",
+    "other",
+]
+
+
+def category_names() -> list[str]:
+    """Every leaf category as a dotted name, e.g. "encounters.research"."""
+    names = []
+    for parent, children in CATEGORY_LAYOUT.items():
+        if children is None:
+            names.append(parent)
+        else:
+            names.extend(f"{parent}.{child}" for child in children)
+    return names
+
+
+def new_metadata(source: str) -> dict:
+    return {
+        "source": source,
+        "scrapedAt": datetime.now().isoformat(),
+        "version": "1.0",
+        "totalPages": 0,
+    }
+
+
+def new_dataset(source: str) -> dict:
+    """Create the empty output structure."""
+    return {
+        "metadata": new_metadata(source),
+        "categories": {
+            parent: [] if children is None else {child: [] for child in children}
+            for parent, children in CATEGORY_LAYOUT.items()
+        },
+        "allPages": {},
+    }
+
+
+def normalize_dataset(data: dict) -> dict:
+    """Nested dataset -> normalized layout (entries are shared, not copied)."""
+    return {
+        "metadata": {**data["metadata"], "layout": "normalized"},
+        "categories": {
+            parent: [entry["pageId"] for entry in value] if isinstance(value, list)
+            else {child: [entry["pageId"] for entry in entries] for child, entries in value.items()}
+            for parent, value in data["categories"].items()
+        },
+        "allPages": {title: entry["pageId"] for title, entry in data["allPages"].items()},
+        "pages": {str(entry["pageId"]): entry for entry in data["allPages"].values()},
+    }
+
+
+def denormalize_dataset(data: dict) -> dict:
+    """Compatibility view: rebuild the nested layout from a normalized dataset.
+
+    Category lists and allPages refer to the same entry objects, as in a
+    freshly scraped dataset. Nested datasets are returned unchanged.
+    """
+    if data["metadata"].get("layout") != "normalized":
+        return data
+    pages = data["pages"]
+    metadata = {key: value for key, value in data["metadata"].items() if key != "layout"}
+    return {
+        "metadata": metadata,
+        "categories": {
+            parent: [pages[str(page_id)] for page_id in value] if isinstance(value, list)
+            else {child: [pages[str(page_id)] for page_id in ids] for child, ids in value.items()}
+            for parent, value in data["categories"].items()
+        },
+        "allPages": {title: pages[str(page_id)] for title, page_id in data["allPages"].items()},
+    }
+
+
+def load_dataset(path: Path) -> dict:
+    """Read eldritch_horror_data.json in either layout, returned nested."""
+    with open(path, "r", encoding="utf-8") as f:
+        return denormalize_dataset(json.load(f))
+
+
+def file_entry(data: dict, entry: dict, category: str) -> None:
+    """Add an entry to its category list and the flat index."""
+    if "." in category:
+        parent, child = category.split(".")
+        data["categories"][parent][child].append(entry)
+    else:
+        data["categories"][category].append(entry)
+    
+    # Also add to flat index
+    data["allPages"][entry["title"]] = entry
+
+
+def compute_stats(counts: dict[str, int]) -> dict:
+    """Build metadata.stats from per-category page counts (dotted names)."""
+    stats = {}
+    for key in STATS_KEYS:
+        if key == "totalEncounters":
+            stats[key] = sum(count for name, count in counts.items() if name.startswith("encounters."))
+        else:
+            stats[key] = counts.get(key, 0)
+    return stats
+
+
+def category_counts(data: dict) -> dict[str, int]:
+    counts = {}
+    for parent, value in data["categories"].items():
+        if isinstance(value, dict):
+            for child, entries in value.items():
+                counts[f"{parent}.{child}"] = len(entries)
+        else:
+            counts[parent] = len(value)
+    return counts
+
+
+class JsonDatasetWriter:
+    """Collect the whole dataset in memory and write it as one JSON file."""
+
+    def __init__(self, path: Path, source: str, layout: str = "nested"):
+        self.path = path
+        self.layout = layout
+        self.data = new_dataset(source)
+
+    @classmethod
+    def load(cls, path: Path, layout: str | None = None) -> "JsonDatasetWriter":
+        """Open an existing output for patching.
+
+        It is written back in `layout`, or in the layout it was read in.
+        """
+        writer = cls.__new__(cls)
+        writer.path = path
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        writer.layout = layout or data["metadata"].get("layout", "nested")
+        writer.data = denormalize_dataset(data)
+        return writer
+
+    @property
+    def metadata(self) -> dict:
+        return self.data["metadata"]
+
+    @property
+    def count(self) -> int:
+        return len(self.data["allPages"])
+
+    def add(self, entry: dict, category: str) -> None:
+        file_entry(self.data, entry, category)
+
+    def close(self) -> None:
+        self.metadata["totalPages"] = self.count
+        self.metadata["stats"] = compute_stats(category_counts(self.data))
+        
+        data = normalize_dataset(self.data) if self.layout == "normalized" else self.data
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def index_path(records_path: Path) -> Path:
+    """Sidecar index next to the records: eldritch_horror_data.index.json."""
+    return records_path.with_suffix(".index.json")
+
+
+class NdjsonDatasetWriter:
+    """Stream page records to NDJSON as they finish.
+
+    Each line is the page entry plus its "category". The sidecar index
+    holds metadata, stats, category membership (page ids in insertion
+    order) and each record's byte offset for random access.
+    """
+
+    def __init__(self, path: Path, source: str):
+        self.path = path
+        self.file = open(path, "wb")
+        self.index = {
+            "metadata": new_metadata(source),
+            "records": path.name,
+            "categories": {name: [] for name in category_names()},
+            "offsets": {},
+        }
+
+    @property
+    def metadata(self) -> dict:
+        return self.index["metadata"]
+
+    @property
+    def count(self) -> int:
+        return len(self.index["offsets"])
+
+    def add(self, entry: dict, category: str) -> None:
+        offset = self.file.tell()
+        line = json.dumps({**entry, "category": category}, ensure_ascii=False) + "\n"
+        self.file.write(line.encode("utf-8"))
+        self.index["categories"][category].append(entry["pageId"])
+        self.index["offsets"][str(entry["pageId"])] = offset
+
+    def close(self) -> None:
+        self.file.close()
+        counts = {name: len(ids) for name, ids in self.index["categories"].items()}
+        self.metadata["totalPages"] = self.count
+        self.metadata["stats"] = compute_stats(counts)
+        
+        with open(index_path(self.path), "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, ensure_ascii=False)
+
+
+def dumps_at(value, level: int) -> str:
+    """json.dumps with indent=2, continuation lines indented for nesting depth `level`."""
+    return json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n" + "  " * level)
+
+
+def read_record(records, offset: int) -> dict:
+    records.seek(offset)
+    record = json.loads(records.readline())
+    record.pop("category")
+    return record
+
+
+def write_entry_list(out, records, offsets: dict, ids: list, level: int) -> None:
+    if not ids:
+        out.write("[]")
+        return
+    out.write("[")
+    for i, page_id in enumerate(ids):
+        out.write("," if i else "")
+        out.write("\n" + "  " * (level + 1))
+        out.write(dumps_at(read_record(records, offsets[str(page_id)]), level + 1))
+    out.write("\n" + "  " * level + "]")
+
+
+def assemble_json(records_path: Path, output_path: Path, layout: str = "nested") -> None:
+    """Assemble the monolithic JSON from NDJSON records and their index.
+
+    Reads one record at a time, so memory stays flat; the result is
+    byte-for-byte what JsonDatasetWriter writes for the same pages.
+    """
+    with open(index_path(records_path), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if layout == "normalized":
+        assemble_normalized_json(records_path, output_path, index)
+        return
+    offsets = index["offsets"]
+    
+    with open(records_path, "rb") as records, open(output_path, "w", encoding="utf-8") as out:
+        out.write("{\n  \"metadata\": " + dumps_at(index["metadata"], 1) + ",\n")
+        out.write("  \"categories\": {")
+        for i, (parent, children) in enumerate(CATEGORY_LAYOUT.items()):
+            out.write(",\n    " if i else "\n    ")
+            out.write(json.dumps(parent) + ": ")
+            if children is None:
+                write_entry_list(out, records, offsets, index["categories"][parent], 2)
+            else:
+                out.write("{")
+                for j, child in enumerate(children):
+                    out.write(",\n      " if j else "\n      ")
+                    out.write(json.dumps(child) + ": ")
+                    write_entry_list(out, records, offsets, index["categories"][f"{parent}.{child}"], 3)
+                out.write("\n    }")
+        out.write("\n  },\n")
+        
+        # allPages follows record order, which is the order pages were added
+        out.write("  \"allPages\": {")
+        records.seek(0)
+        first = True
+        for line in records:
+            record = json.loads(line)
+            record.pop("category")
+            out.write("\n    " if first else ",\n    ")
+            out.write(json.dumps(record["title"], ensure_ascii=False) + ": " + dumps_at(record, 2))
+            first = False
+        out.write("\n  }" if not first else "}")
+        out.write("\n}")
+
+
+def assemble_normalized_json(records_path: Path, output_path: Path, index: dict) -> None:
+    """assemble_json for the normalized layout: ids come from the index, pages stream in record order."""
+    categories = {
+        parent: index["categories"][parent] if children is None
+        else {child: index["categories"][f"{parent}.{child}"] for child in children}
+        for parent, children in CATEGORY_LAYOUT.items()
+    }
+    titles = {}
+    
+    with open(records_path, "rb") as records, open(output_path, "w", encoding="utf-8") as out:
+        for line in records:
+            record = json.loads(line)
+            titles[record["title"]] = record["pageId"]
+        
+        out.write("{\n  \"metadata\": " + dumps_at({**index["metadata"], "layout": "normalized"}, 1) + ",\n")
+        out.write("  \"categories\": " + dumps_at(categories, 1) + ",\n")
+        out.write("  \"allPages\": " + dumps_at(titles, 1) + ",\n")
+        out.write("  \"pages\": {")
+        records.seek(0)
+        first = True
+        for line in records:
+            record = json.loads(line)
+            record.pop("category")
+            out.write("\n    " if first else ",\n    ")
+            out.write(json.dumps(str(record["pageId"])) + ": " + dumps_at(record, 2))
+            first = False
+        out.write("\n  }" if not first else "}")
+        out.write("\n}")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Run every extract_*.py script against one in-memory load of the dataset.
+Each extractor reads eldritch_horror_data.json on its own when run by
+hand; run back to back that is four reads of the same file. This driver
+reads the union of the categories and pages the extractors declare once
+(corpus.LoadedDataset, indexed by category, title and pageId) and hands
+it to each extractor's extract(dataset, public_dir).
+
+Extractors whose files don't overlap run concurrently in forked worker
+processes, which share the loaded dataset without copying it. An
+extractor that reads or writes a file an earlier one writes waits for it:
+extract_mysteries_research.py updates ancient_ones_detailed.json after
+extract_ancient_ones.py has written it.
+
+    python extract_all.py                       # all extractors
+    python extract_all.py extract_investigators # just the ones named
+    python extract_all.py --verbose             # show each extractor's log
+    python extract_all.py --cprofile            # + cProfile stats per extractor in reports/
+    python extract_all.py --time-functions      # + calls and time of the @timed helpers
+
+An extractor module declares CATEGORIES and PAGES (what it reads from the
+dataset), READS and WRITES (files in app/public) and extract().
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import instrument
+from corpus import LoadedDataset
+
+SCRIPT_DIR = Path(__file__).parent
+PUBLIC_DIR = SCRIPT_DIR.parent / "app" / "public"
+DATA_FILE = PUBLIC_DIR / "eldritch_horror_data.json"
+
+# Declaration order is run order when extractors depend on each other
+EXTRACTORS = [
+    "extract_investigators",
+    "extract_ancient_ones",
+    "extract_mysteries_research",
+    "extract_mythos_cards",
+]
+
+# Set before the worker processes fork, so they inherit the loaded dataset
+DATASET = None
+
+
+def dependencies(modules: list) -> dict[str, set[str]]:
+    """For each extractor, the earlier extractors writing a file it reads or writes."""
+    deps = {}
+    for i, module in enumerate(modules):
+        touched = set(module.READS) | set(module.WRITES)
+        deps[module.__name__] = {
+            earlier.__name__ for earlier in modules[:i] if touched & set(earlier.WRITES)
+        }
+    return deps
+
+
+def run_extractor(name: str, public_dir: Path) -> tuple[bool, float, str]:
+    """Run one extractor against DATASET; returns (succeeded, seconds, captured output)."""
+    log = io.StringIO()
+    start = time.perf_counter()
+    ok = True
+    with contextlib.redirect_stdout(log):
+        try:
+            with instrument.stage(name, hot=True):
+                importlib.import_module(name).extract(DATASET, public_dir)
+        except (Exception, SystemExit):
+            ok = False
+            traceback.print_exc(file=log)
+    return ok, time.perf_counter() - start, log.getvalue()
+
+
+def run_forked(name: str, public_dir: Path) -> tuple[bool, float, str, list[dict]]:
+    """run_extractor in a worker process, also returning its run report stages."""
+    instrument.take_stages()  # The parent's, inherited through fork
+    result = run_extractor(name, public_dir)
+    instrument.dump_profiles()
+    return (*result, instrument.take_stages())
+
+
+def run_extractors(modules: list, public_dir: Path, workers: int, verbose: bool = False) -> bool:
+    """Run the extractors, in parallel where their files allow; False if any failed."""
+    deps = dependencies(modules)
+    pending = [module.__name__ for module in modules]
+    done, failed = set(), set()
+
+    def report(name: str, ok: bool, seconds: float, log: str) -> None:
+        if verbose or not ok:
+            print(log, end="" if log.endswith("\n") else "\n")
+        print(f"{'✅' if ok else '❌'} {name} ({seconds:.2f}s)")
+        (done if ok else failed).add(name)
+
+    def runnable() -> list[str]:
+        """Pending extractors whose dependencies finished; those depending on a failure are dropped."""
+        ready = []
+        for name in list(pending):
+            if deps[name] & failed:
+                print(f"⏭️  {name}: skipped, {', '.join(sorted(deps[name] & failed))} failed")
+                pending.remove(name)
+                failed.add(name)
+            elif deps[name] <= done:
+                pending.remove(name)
+                ready.append(name)
+        return ready
+
+    if workers <= 1:
+        while pending:
+            for name in runnable():
+                report(name, *run_extractor(name, public_dir))
+        return not failed
+
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as executor:
+        running = {}
+        while pending or running:
+            for name in runnable():
+                running[executor.submit(run_forked, name, public_dir)] = name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                ok, seconds, log, stages = future.result()
+                instrument.add_stages(stages)
+                report(running.pop(future), ok, seconds, log)
+    return not failed
+
+
+@instrument.instrumented
+def main():
+    parser = argparse.ArgumentParser(description="Run all extractors against a single load of the dataset.")
+    parser.add_argument("extractors", nargs="*", metavar="extractor",
+                        help=f"extractors to run (default: all of {', '.join(EXTRACTORS)})")
+    parser.add_argument("--data", type=Path, default=DATA_FILE, help="dataset to read (see corpus.open_dataset)")
+    parser.add_argument("--public", type=Path, default=PUBLIC_DIR, help="directory the outputs are written to")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(len(EXTRACTORS), os.cpu_count() or 1),
+        help="worker processes; 1 runs the extractors one after another in this process",
+    )
+    parser.add_argument("--verbose", action="store_true", help="print each extractor's own output")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="dump cProfile stats per extractor next to the run report (see instrument.py)")
+    parser.add_argument("--trace-memory", action="store_true", help="trace allocations with tracemalloc")
+    parser.add_argument("--time-functions", action="store_true",
+                        help="count calls and time of the @timed helpers in the run report")
+    args = parser.parse_args()
+    instrument.configure(args.cprofile, args.trace_memory, args.time_functions)
+
+    unknown = set(args.extractors) - set(EXTRACTORS)
+    if unknown:
+        parser.error(f"unknown extractors: {', '.join(sorted(unknown))}")
+    names = args.extractors or EXTRACTORS
+    modules = [importlib.import_module(name) for name in EXTRACTORS if name in names]
+    # Forked workers share memory; without fork (Windows, macOS default) run in-process
+    workers = args.workers if "fork" in multiprocessing.get_all_start_methods() else 1
+
+    global DATASET
+    start = time.perf_counter()
+    categories = list(dict.fromkeys(name for module in modules for name in module.CATEGORIES))
+    titles = list(dict.fromkeys(title for module in modules for title in module.PAGES))
+    print(f"📖 Loading {', '.join(categories)} from {args.data}...")
+    with instrument.stage("load"):
+        DATASET = LoadedDataset.read(args.data, categories, titles)
+        instrument.count(items=len(DATASET.titles))
+    print(f"   {len(DATASET.titles)} pages in {time.perf_counter() - start:.2f}s")
+
+    print(f"⚙️  Running {len(modules)} extractors ({workers} worker{'s' if workers != 1 else ''})")
+    ok = run_extractors(modules, args.public, workers, args.verbose)
+    print(f"{'✅' if ok else '❌'} Finished in {time.perf_counter() - start:.2f}s")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,41 +8,14 @@ import json
 import re
 from pathlib import Path
 
+import instrument
+from corpus import LoadedDataset
+from wiki_markup import clean_wiki_markup
+
 
 def strip_wiki_markup(text: str) -> str:
     """Remove wiki markup from text."""
-    if not text:
-        return ""
-    
-    # Remove file/image references
-    text = re.sub(r'\[\[File:[^\]]+\]\]', '', text)
-    text = re.sub(r'\[\[file:[^\]]+\]\]', '', text)
-    
-    # Convert wiki links [[Link|Display]] to Display
-    text = re.sub(r'\[\[([^|\]]+)\|([^\]]+)\]\]', r'\2', text)
-    # Convert wiki links [[Link]] to Link
-    text = re.sub(r'\[\[([^\]]+)\]\]', r'\1', text)
-    
-    # Remove templates {{...}}
-    text = re.sub(r'\{\{[^}]+\}\}', '', text)
-    
-    # Remove bold/italic markers
-    text = re.sub(r"'''+", '', text)
-    text = re.sub(r"''", '', text)
-    
-    # Remove table markup
-    text = re.sub(r'\{\|[^}]*\|\}', '', text, flags=re.DOTALL)
-    text = re.sub(r'\|-', '', text)
-    text = re.sub(r'\|[^\n]*\n', '', text)
-    
-    # Remove section headers formatting
-    text = re.sub(r'={2,}[^=]+=+', '', text)
-    
-    # Clean up whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    
-    return text.strip()
+    return clean_wiki_markup(text, "ancient_ones")
 
 
 def extract_mysteries(sections: dict, links: list) -> list:
@@ -217,18 +190,17 @@ def extract_ancient_one_detail(ao_data: dict) -> dict:
     }
 
 
-def main():
-    # Paths
-    script_dir = Path(__file__).parent
-    app_public = script_dir.parent / 'app' / 'public'
-    
-    data_file = app_public / 'eldritch_horror_data.json'
-    meta_file = app_public / 'ancient_ones_meta.json'
-    output_file = app_public / 'ancient_ones_detailed.json'
-    
-    print(f"Reading data from {data_file}...")
-    with open(data_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+# Read by extract_all.py, which loads the dataset once for all extractors
+CATEGORIES = ['ancientOnes']
+PAGES = []
+READS = ['ancient_ones_meta.json']
+WRITES = ['ancient_ones_detailed.json']
+
+
+def extract(dataset, public_dir: Path) -> None:
+    """Write ancient_ones_detailed.json from an open dataset reader (see corpus.open_dataset)."""
+    meta_file = public_dir / 'ancient_ones_meta.json'
+    output_file = public_dir / 'ancient_ones_detailed.json'
     
     print(f"Reading meta from {meta_file}...")
     with open(meta_file, 'r', encoding='utf-8') as f:
@@ -241,7 +213,7 @@ def main():
             meta_dict[title] = entry
     
     # Extract Ancient Ones from main data
-    ancient_ones = data.get('categories', {}).get('ancientOnes', [])
+    ancient_ones = dataset.category('ancientOnes')
     print(f"Found {len(ancient_ones)} Ancient Ones in data")
     
     # Build detailed entries
@@ -284,8 +256,11 @@ def main():
     
     # Write output
     print(f"\nWriting {len(detailed_entries)} entries to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(detailed_entries, f, indent=2, ensure_ascii=False)
+    instrument.count(items=len(detailed_entries))
+    with instrument.stage("write json"):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(detailed_entries, f, indent=2, ensure_ascii=False)
+        instrument.count_file(output_file)
     
     print("Done!")
     
@@ -299,6 +274,21 @@ def main():
         print(f"  Awakening: {sample['awakeningTitle']}")
 
 
+@instrument.instrumented
+def main():
+    # Paths
+    script_dir = Path(__file__).parent
+    app_public = script_dir.parent / 'app' / 'public'
+    data_file = app_public / 'eldritch_horror_data.json'
+    
+    print(f"Reading data from {data_file}...")
+    # One category and no page lookups: a whole-file read beats streaming
+    with instrument.stage("load"):
+        dataset = LoadedDataset.read(data_file, CATEGORIES, PAGES)
+    with instrument.stage("extract", hot=True):
+        extract(dataset, app_public)
+
+
 if __name__ == '__main__':
     main()
 
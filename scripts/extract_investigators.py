@@ -6,77 +6,194 @@ Creates investigators_detailed.json with full context for AI plot generation
 
 import json
 import re
+from collections import deque
 from pathlib import Path
 
+import instrument
+from corpus import open_dataset
+from wiki_markup import clean_wiki_markup
+from wikitext import parse_wikitext
+
 def strip_wiki_markup(text: str) -> str:
     """Remove wiki markup and clean text"""
-    if not text:
-        return ""
-    # Remove wiki links [[text]] or [[link|text]]
-    text = re.sub(r'\[\[(?:[^|\]]*\|)?([^\]]+)\]\]', r'\1', text)
-    # Remove templates {{...}} but try to extract meaningful names
-    text = re.sub(r'\{\{([A-Za-z]+)\s+imagelink[^}]*\}\}', r'\1', text)  # Handle imagelink templates
-    text = re.sub(r'\{\{([A-Za-z ]+)\}\}', r'\1', text)  # Simple templates become their name
-    text = re.sub(r'\{\{[^}]*\}\}', '', text)  # Remove remaining templates
-    # Remove file references
-    text = re.sub(r'\[\[File:[^\]]+\]\]', '', text)
-    # Remove heading markers
-    text = re.sub(r'={2,}([^=]+)={2,}', r'\1', text)
-    # Remove bold/italic markers
-    text = re.sub(r"'{2,}", '', text)
-    # Remove Category markers
-    text = re.sub(r'Category:[^\n]+', '', text)
-    # Clean up extra whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    return text.strip()
-
-def extract_skills_from_fulltext(fulltext: str) -> dict:
-    """Extract skill values from fullText field"""
-    skills = {
-        'lore': 0,
-        'influence': 0,
-        'observation': 0,
-        'strength': 0,
-        'will': 0
-    }
-    
-    for skill in skills.keys():
-        match = re.search(rf'\|{skill}\s*=\s*(\d+)', fulltext, re.IGNORECASE)
-        if match:
-            skills[skill] = int(match.group(1))
-    
-    return skills
+    return clean_wiki_markup(text, "investigators")
 
-def extract_health_sanity(fulltext: str) -> tuple:
-    """Extract health and sanity from fullText"""
-    health = 0
-    sanity = 0
-    
-    health_match = re.search(r'\|health\s*=\s*(\d+)', fulltext, re.IGNORECASE)
-    if health_match:
-        health = int(health_match.group(1))
-    
-    sanity_match = re.search(r'\|sanity\s*=\s*(\d+)', fulltext, re.IGNORECASE)
-    if sanity_match:
-        sanity = int(sanity_match.group(1))
-    
-    return health, sanity
+SKILLS = ('lore', 'influence', 'observation', 'strength', 'will')
+TEMPLATE_PARAMS = (*SKILLS, 'health', 'sanity', 'set', 'startloc', 'startequip', 'personal_story')
 
-def extract_starting_equipment(fulltext: str) -> list:
-    """Extract starting equipment from fullText"""
-    equipment = []
-    
-    # Look for startequip section
-    match = re.search(r'\|startequip\s*=\s*(.+?)(?=\||$)', fulltext, re.DOTALL)
-    if match:
-        equip_text = match.group(1)
-        # Parse items like "* 1 Arcane Manuscripts Asset\n* 1 Wither Spell"
-        items = re.findall(r'\*\s*(\d+)\s+(.+?)(?:\n|\|)', equip_text)
-        for count, item in items:
-            equipment.append({'count': int(count), 'item': item.strip()})
-    
-    return equipment
+# Set templates ({{Core Game}}, {{CiR imagelink}}, ...) by their first word
+SET_NAMES = {
+    'CiR': 'Cities in Ruin',
+    'MoN': 'Masks of Nyarlathotep',
+    'TD': 'The Dreamlands',
+    'SR': 'Strange Remnants',
+    'FL': 'Forsaken Lore',
+    'MoM': 'Mountains of Madness',
+    'UtP': 'Under the Pyramids',
+    'SoC': 'Signs of Carcosa',
+    'Core': 'Core Game',
+}
+
+NESTED_MARKUP = re.compile(r'\{\{[^{}]*\}\}|<[^>]+>')
+SET_TEMPLATE = re.compile(r'\{\{([A-Za-z]+)')
+LEADING_NUMBER = re.compile(r'\s*(\d+)')
+LINE_END = re.compile(r'[\n|]')
+EQUIPMENT_ITEM = re.compile(r'\*\s*(\d+)\s+(.+?)(?:\n|\|)')
+
+
+def template_params(inv: dict) -> dict:
+    """The investigator template's params, as parsed once at scrape time (`infobox`).
+
+    Scrapes from before the wikitext tokenizer lost every param after the
+    first nested template; when any is missing, the page is parsed again.
+    """
+    infobox = inv.get('infobox') or {}
+    raw = inv.get('rawWikitext', '')
+    if raw and not all(key in infobox for key in TEMPLATE_PARAMS):
+        return {**infobox, **parse_wikitext(raw, inv.get('title', ''))['infobox']}
+    return infobox
+
+
+def param_number(value: str) -> int:
+    """`5` or `5 {{Health}}` -> 5; 0 when the value doesn't start with a number."""
+    match = LEADING_NUMBER.match(NESTED_MARKUP.sub('', value))
+    return int(match.group(1)) if match else 0
+
+
+def param_line(value: str) -> str:
+    """A param value up to its first line break or `|`, with markup removed."""
+    for candidate in (NESTED_MARKUP.sub('', value), value):
+        line = LINE_END.split(candidate.lstrip(), maxsplit=1)[0].strip()
+        if line:
+            return strip_wiki_markup(line)
+    return ''
+
+
+def starting_equipment(value: str) -> list:
+    """Items like "* 1 Arcane Manuscripts Asset\n* 1 Wither Spell" as [{'count', 'item'}]."""
+    equip_text = NESTED_MARKUP.sub('', value).lstrip().split('|', 1)[0] + '\n'
+    return [
+        {'count': int(count), 'item': item.strip()}
+        for count, item in EQUIPMENT_ITEM.findall(equip_text)
+    ]
+
+
+def game_set_name(raw_set: str) -> str:
+    """{{Core Game}}, {{CiR imagelink}}, ... -> the set's full name."""
+    set_match = SET_TEMPLATE.search(raw_set)
+    if set_match:
+        return SET_NAMES.get(set_match.group(1), set_match.group(1))
+    return strip_wiki_markup(raw_set)
+
+
+class InvestigatorRecord:
+    """One investigator, as written to investigators_detailed.json.
+
+    from_page() reads every field from a single pass over the page: stats,
+    set, start location, equipment and personal story from the template
+    params, the rest from its sections.
+    """
+
+    __slots__ = (
+        "name", "page_id", "profession", "role", "game_set", "skills", "health", "sanity",
+        "starting_location", "starting_equipment", "personal_story", "quote", "biography",
+        "abilities", "team_role", "rulings", "origin", "defeated_encounters",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        page_id: int,
+        profession: str,
+        role: str,
+        game_set: str,
+        skills: dict[str, int],
+        health: int,
+        sanity: int,
+        starting_location: str,
+        starting_equipment: list[dict],
+        personal_story: str,
+        quote: str,
+        biography: str,
+        abilities: str,
+        team_role: str,
+        rulings: str,
+        origin: str,
+        defeated_encounters: dict[str, str],
+    ):
+        self.name = name
+        self.page_id = page_id
+        self.profession = profession
+        self.role = role
+        self.game_set = game_set
+        self.skills = skills
+        self.health = health
+        self.sanity = sanity
+        self.starting_location = starting_location
+        self.starting_equipment = starting_equipment
+        self.personal_story = personal_story
+        self.quote = quote
+        self.biography = biography
+        self.abilities = abilities
+        self.team_role = team_role
+        self.rulings = rulings
+        self.origin = origin
+        self.defeated_encounters = defeated_encounters
+
+    @classmethod
+    def from_page(cls, inv: dict, defeated_map: dict) -> "InvestigatorRecord":
+        title = inv.get('title', '')
+        params = template_params(inv)
+        sections = inv.get('sections', {})
+        profession = strip_wiki_markup(params.get('profession', '') or params.get('occupation', ''))
+        return cls(
+            name=title,
+            page_id=inv.get('pageId', 0),
+            profession=profession,
+            role=strip_wiki_markup(params.get('role', '')),
+            game_set=game_set_name(params.get('set', '')),
+            skills={skill: param_number(params.get(skill, '')) for skill in SKILLS},
+            health=param_number(params.get('health', '')),
+            sanity=param_number(params.get('sanity', '')),
+            starting_location=param_line(params.get('startloc', '')),
+            starting_equipment=starting_equipment(params.get('startequip', '')),
+            personal_story=param_line(params.get('personal_story', '')),
+            quote=extract_quote(sections),
+            biography=strip_wiki_markup(sections.get('Bio', '') or sections.get('Biography', '')),
+            abilities=extract_abilities(sections, profession),
+            team_role=strip_wiki_markup(sections.get('Team Role', '')),
+            rulings=strip_wiki_markup(
+                sections.get('Rulings, clarifications, and reminders', '') or
+                sections.get('Rulings, Clarifications, and Reminders', '') or
+                sections.get('Rulings', '')
+            ),
+            origin=strip_wiki_markup(sections.get('Origin', '')),
+            defeated_encounters=extract_defeated_encounters(
+                inv.get('rawWikitext', ''), sections, title, defeated_map
+            ),
+        )
+
+    def to_json(self) -> dict:
+        return {
+            'name': self.name,
+            'pageId': self.page_id,
+            'profession': self.profession,
+            'role': self.role,
+            'set': self.game_set,
+            'skills': self.skills,
+            'health': self.health,
+            'sanity': self.sanity,
+            'startingLocation': self.starting_location,
+            'startingEquipment': self.starting_equipment,
+            'personalStory': self.personal_story,
+            'quote': self.quote,
+            'biography': self.biography,
+            'abilities': self.abilities,
+            'teamRole': self.team_role,
+            'rulings': self.rulings,
+            'origin': self.origin,
+            'defeatedEncounters': self.defeated_encounters,
+        }
 
 def extract_defeated_encounters(rawwikitext: str, sections: dict, title: str, defeated_map: dict) -> dict:
     """Extract defeated encounters (loss of health/sanity text)"""
@@ -121,9 +238,8 @@ def extract_defeated_encounters(rawwikitext: str, sections: dict, title: str, de
             
     return encounters
 
-def parse_defeated_table(data):
+def parse_defeated_table(defeated_page):
     """Parse the Defeated page table to get texts for all investigators"""
-    defeated_page = data.get('allPages', {}).get('Defeated')
     if not defeated_page:
         return []
         
@@ -155,57 +271,129 @@ def parse_defeated_table(data):
             
     return parsed_rows
 
-def map_defeated_encounters(investigators, defeated_rows):
-    """Map investigators to their defeated texts based on name matching"""
+ALIAS_STOP_WORDS = {'The', 'and'}
+
+
+def investigator_aliases(title: str) -> list[str]:
+    """Names a Defeated row may call the investigator by: the title, a "Nickname", first and last name.
+
+    An alias listed twice scores twice: "Pete" is both the nickname and the
+    first name of "Ashcan" Pete, and Mateo and Mary are weighted up on purpose.
+    """
+    aliases = [title]
+    nick_match = re.search(r'"([^"]+)"', title)
+    if nick_match:
+        aliases.append(nick_match.group(1))
+    parts = title.replace('"', '').split()
+    if len(parts) > 1:
+        aliases += [parts[0], parts[-1]]
+    if "Father Mateo" in title:
+        aliases.append("Mateo")
+    if "Sister Mary" in title:
+        aliases.append("Mary")
+    return [a for a in aliases if len(a) >= 3 and a not in ALIAS_STOP_WORDS]
+
+
+class AliasIndex:
+    """Aho-Corasick automaton over every investigator's aliases.
+
+    scores() scans a text once, whatever the number of investigators, and
+    finds every alias in it, overlapping ones included ("Mary" inside
+    "Sister Mary"). Failure links are folded into the transitions, so the
+    scan never backtracks.
+    """
+
+    def __init__(self, aliases: dict[str, list[str]]):
+        self.owners = {}  # Alias -> titles of the investigators it names, once per listing
+        for title, names in aliases.items():
+            for alias in names:
+                self.owners.setdefault(alias, []).append(title)
+
+        goto = [{}]
+        output = [()]
+        for alias in self.owners:
+            state = 0
+            for ch in alias:
+                if ch not in goto[state]:
+                    goto[state][ch] = len(goto)
+                    goto.append({})
+                    output.append(())
+                state = goto[state][ch]
+            output[state] = (alias,)
+
+        # Breadth first, so a state's failure state is complete before it is
+        self.transitions = [dict(goto[0])] + [None] * (len(goto) - 1)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self.transitions[state] = {**self.transitions[fail[state]], **goto[state]}
+            output[state] += output[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = self.transitions[fail[state]].get(ch, 0) if state else 0
+                queue.append(child)
+        self.output = output
+
+    def find(self, text: str) -> set[str]:
+        """Every alias occurring in `text`."""
+        transitions, output = self.transitions, self.output
+        found = set()
+        state = 0
+        for ch in text:
+            state = transitions[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def scores(self, text: str) -> dict[str, int]:
+        """Investigator title -> summed length of its aliases found in `text`."""
+        scores = {}
+        for alias in self.find(text):
+            for title in self.owners[alias]:
+                scores[title] = scores.get(title, 0) + len(alias)
+        return scores
+
+
+def match_defeated_rows(titles, defeated_rows) -> tuple[dict, list[str]]:
+    """Map investigators to their Defeated rows; returns (mapping, conflicts).
+
+    Each row is scanned once for all aliases. An investigator takes the row
+    where its aliases score highest, the earlier row on a tie; ties and rows
+    taken by more than one investigator are reported in conflicts.
+    """
+    index = AliasIndex({title: investigator_aliases(title) for title in titles})
+    best = {}  # Title -> (score, row index)
+    tied = {}  # Title -> row indexes sharing its best score
+    for i, row in enumerate(defeated_rows):
+        for title, score in index.scores(row['health'] + " " + row['sanity']).items():
+            if title not in best or score > best[title][0]:
+                best[title] = (score, i)
+                tied.pop(title, None)
+            elif score == best[title][0]:
+                tied.setdefault(title, [best[title][1]]).append(i)
+
     mapping = {}
-    
-    for inv in investigators:
-        title = inv.get('title', '')
-        # Generate aliases to search for in the text
-        aliases = [title]
-        
-        # Handle "Nickname" format
-        nick_match = re.search(r'"([^"]+)"', title)
-        if nick_match:
-            aliases.append(nick_match.group(1))
-            
-        # First and Last names
-        parts = title.replace('"', '').split()
-        if len(parts) > 1:
-            aliases.append(parts[0]) # First name
-            aliases.append(parts[-1]) # Last name
-            
-        # Special cases
-        if "Father Mateo" in title: aliases.append("Mateo")
-        if "Sister Mary" in title: aliases.append("Mary")
-        
-        # Filter aliases
-        aliases = [a for a in aliases if len(a) >= 3 and a not in ["The", "and"]]
-        
-        best_row = None
-        best_score = 0
-        
-        for row in defeated_rows:
-            score = 0
-            combined_text = (row['health'] + " " + row['sanity'])
-            
-            for alias in aliases:
-                # Simple check: alias appears in text
-                if alias in combined_text:
-                    score += len(alias) # Weigh longer matches higher
-            
-            if score > best_score:
-                best_score = score
-                best_row = row
-        
-        if best_row:
-            mapping[title] = {
-                'lossOfHealth': best_row['health'],
-                'lossOfSanity': best_row['sanity']
-            }
-            # print(f"Matched {title} -> {best_row['health'][:30]}...")
-            
-    return mapping
+    claimed = {}
+    for title in titles:
+        if title in best:
+            row = defeated_rows[best[title][1]]
+            mapping[title] = {'lossOfHealth': row['health'], 'lossOfSanity': row['sanity']}
+            claimed.setdefault(best[title][1], []).append(title)
+
+    conflicts = [
+        f"{title}: rows {', '.join(str(i + 1) for i in rows)} match equally, took row {rows[0] + 1}"
+        for title, rows in tied.items()
+    ]
+    conflicts += [
+        f"row {i + 1} matches {', '.join(owners)}"
+        for i, owners in sorted(claimed.items()) if len(owners) > 1
+    ]
+    return mapping, conflicts
+
+
+def map_defeated_encounters(titles, defeated_rows):
+    """Map investigators to their defeated texts based on name matching"""
+    return match_defeated_rows(titles, defeated_rows)[0]
 
 def extract_quote(sections: dict) -> str:
     """Extract quote from sections"""
@@ -244,147 +432,41 @@ def extract_abilities(sections: dict, profession: str) -> str:
     
     return strip_wiki_markup(abilities)
 
-def main():
-    # Paths
-    script_dir = Path(__file__).parent
-    data_path = script_dir.parent / "app" / "public" / "eldritch_horror_data.json"
-    output_path = script_dir.parent / "app" / "public" / "investigators_detailed.json"
-    
-    print(f"Loading data from {data_path}")
-    
-    with open(data_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+# Read by extract_all.py, which loads the dataset once for all extractors
+CATEGORIES = ["investigators"]
+PAGES = ["Defeated"]
+READS = []
+WRITES = ["investigators_detailed.json"]
+
+
+def extract(dataset, public_dir: Path) -> None:
+    """Write investigators_detailed.json from an open dataset reader (see corpus.open_dataset)."""
+    output_path = public_dir / "investigators_detailed.json"
     
-    investigators = data.get('categories', {}).get('investigators', [])
-    print(f"Found {len(investigators)} investigators")
+    # One pass for the titles the Defeated table is matched against, one to extract
+    titles = [inv.get('title', '') for inv in dataset.iter_category('investigators')]
+    print(f"Found {len(titles)} investigators")
     
     # Parse defeated encounters table first
-    defeated_rows = parse_defeated_table(data)
-    defeated_map = map_defeated_encounters(investigators, defeated_rows)
+    defeated_rows = parse_defeated_table(dataset.page('Defeated'))
+    defeated_map, conflicts = match_defeated_rows(titles, defeated_rows)
     print(f"Mapped defeated texts for {len(defeated_map)} investigators")
+    for conflict in conflicts:
+        print(f"  Defeated table conflict: {conflict}")
     
     detailed_investigators = []
     
-    for inv in investigators:
-        title = inv.get('title', '')
-        infobox = inv.get('infobox', {})
-        sections = inv.get('sections', {})
-        fulltext = inv.get('fullText', '')
-        rawwikitext = inv.get('rawWikitext', '')
-        
-        # Extract profession/occupation
-        profession = strip_wiki_markup(
-            infobox.get('profession', '') or 
-            infobox.get('occupation', '')
-        )
-        
-        # Extract role
-        role = strip_wiki_markup(infobox.get('role', ''))
-        
-        # Extract set/expansion and clean up template markup
-        raw_set = infobox.get('set', '')
-        # Handle {{Core Game}}, {{CiR imagelink}}, etc.
-        set_match = re.search(r'\{\{([A-Za-z]+)', raw_set)
-        if set_match:
-            game_set = set_match.group(1)
-            # Map abbreviations to full names
-            set_map = {
-                'CiR': 'Cities in Ruin',
-                'MoN': 'Masks of Nyarlathotep',
-                'TD': 'The Dreamlands',
-                'SR': 'Strange Remnants',
-                'FL': 'Forsaken Lore',
-                'MoM': 'Mountains of Madness',
-                'UtP': 'Under the Pyramids',
-                'SoC': 'Signs of Carcosa',
-                'Core': 'Core Game',
-            }
-            game_set = set_map.get(game_set, game_set)
-        else:
-            game_set = strip_wiki_markup(raw_set)
-        
-        # Extract skills
-        skills = extract_skills_from_fulltext(fulltext)
-        
-        # Extract health/sanity
-        health, sanity = extract_health_sanity(fulltext)
-        
-        # Extract starting equipment
-        starting_equipment = extract_starting_equipment(fulltext)
-        
-        # Extract starting location - capture until newline or next |
-        startloc_match = re.search(r'\|startloc\s*=\s*([^\n|]+)', fulltext)
-        starting_location = strip_wiki_markup(startloc_match.group(1).strip()) if startloc_match else ''
-        
-        # Also try rawwikitext if fulltext didn't have it
-        if not starting_location:
-            startloc_match = re.search(r'\|startloc\s*=\s*([^\n|]+)', rawwikitext)
-            starting_location = strip_wiki_markup(startloc_match.group(1).strip()) if startloc_match else ''
-        
-        # Extract personal story
-        personal_story_match = re.search(r'\|personal_story\s*=\s*([^\n|]+)', fulltext)
-        personal_story = strip_wiki_markup(personal_story_match.group(1).strip()) if personal_story_match else ''
-        
-        # Also try rawwikitext if fulltext didn't have it
-        if not personal_story:
-            personal_story_match = re.search(r'\|personal_story\s*=\s*([^\n|]+)', rawwikitext)
-            personal_story = strip_wiki_markup(personal_story_match.group(1).strip()) if personal_story_match else ''
-        
-        # Extract quote
-        quote = extract_quote(sections)
-        
-        # Extract biography
-        biography = strip_wiki_markup(
-            sections.get('Bio', '') or 
-            sections.get('Biography', '')
-        )
-        
-        # Extract abilities
-        abilities = extract_abilities(sections, profession)
-        
-        # Extract team role
-        team_role = strip_wiki_markup(sections.get('Team Role', ''))
-        
-        # Extract rulings
-        rulings = strip_wiki_markup(
-            sections.get('Rulings, clarifications, and reminders', '') or
-            sections.get('Rulings, Clarifications, and Reminders', '') or
-            sections.get('Rulings', '')
-        )
-        
-        # Extract origin
-        origin = strip_wiki_markup(sections.get('Origin', ''))
-        
-        # Extract defeated encounters
-        defeated_encounters = extract_defeated_encounters(rawwikitext, sections, title, defeated_map)
-        
-        detailed_inv = {
-            'name': title,
-            'pageId': inv.get('pageId', 0),
-            'profession': profession,
-            'role': role,
-            'set': game_set,
-            'skills': skills,
-            'health': health,
-            'sanity': sanity,
-            'startingLocation': starting_location,
-            'startingEquipment': starting_equipment,
-            'personalStory': personal_story,
-            'quote': quote,
-            'biography': biography,
-            'abilities': abilities,
-            'teamRole': team_role,
-            'rulings': rulings,
-            'origin': origin,
-            'defeatedEncounters': defeated_encounters
-        }
-        
-        detailed_investigators.append(detailed_inv)
-        print(f"  Extracted: {title} ({profession}) - Role: {role}")
+    for inv in dataset.iter_category('investigators'):
+        record = InvestigatorRecord.from_page(inv, defeated_map)
+        detailed_investigators.append(record.to_json())
+        print(f"  Extracted: {record.name} ({record.profession}) - Role: {record.role}")
     
     # Save output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(detailed_investigators, f, indent=2, ensure_ascii=False)
+    instrument.count(items=len(detailed_investigators))
+    with instrument.stage("write json"):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(detailed_investigators, f, indent=2, ensure_ascii=False)
+        instrument.count_file(output_path)
     
     print(f"\nSaved {len(detailed_investigators)} investigators to {output_path}")
     
@@ -399,6 +481,20 @@ def main():
         print(f"  Quote: {sample['quote'][:80]}..." if sample['quote'] else "  Quote: (none)")
         print(f"  Team Role: {sample['teamRole'][:80]}..." if sample['teamRole'] else "  Team Role: (none)")
 
+
+@instrument.instrumented
+def main():
+    # Paths
+    script_dir = Path(__file__).parent
+    app_public = script_dir.parent / "app" / "public"
+    data_path = app_public / "eldritch_horror_data.json"
+    
+    print(f"Loading data from {data_path}")
+    
+    # Stream the investigators instead of loading the whole grimoire
+    with open_dataset(data_path) as dataset, instrument.stage("extract", hot=True):
+        extract(dataset, app_public)
+
 if __name__ == "__main__":
     main()
 
@@ -9,64 +9,14 @@ import re
 from pathlib import Path
 from typing import Optional
 
+import instrument
+from corpus import open_dataset
+from wiki_markup import clean_wiki_markup
+
 
 def strip_wiki_markup(text: str) -> str:
     """Remove wiki markup from text."""
-    if not text:
-        return ""
-    
-    # Remove file/image references
-    text = re.sub(r'\[\[File:[^\]]+\]\]', '', text)
-    text = re.sub(r'\[\[file:[^\]]+\]\]', '', text)
-    
-    # Convert wiki links [[Link|Display]] to Display
-    text = re.sub(r'\[\[([^|\]]+)\|([^\]]+)\]\]', r'\2', text)
-    # Convert wiki links [[Link]] to Link
-    text = re.sub(r'\[\[([^\]]+)\]\]', r'\1', text)
-    
-    # Remove templates {{...}} but try to preserve some content
-    text = re.sub(r'\{\{Core Game\}\}', 'Core', text)
-    text = re.sub(r'\{\{FL imagelink\}\}', 'Forsaken Lore', text)
-    text = re.sub(r'\{\{TD imagelink\}\}', 'The Dreamlands', text)
-    text = re.sub(r'\{\{MoM imagelink\}\}', 'Mountains of Madness', text)
-    text = re.sub(r'\{\{SR imagelink\}\}', 'Strange Remnants', text)
-    text = re.sub(r'\{\{UtP imagelink\}\}', 'Under the Pyramids', text)
-    text = re.sub(r'\{\{CiR imagelink\}\}', 'Cities in Ruin', text)
-    text = re.sub(r'\{\{SoC imagelink\}\}', 'Signs of Carcosa', text)
-    text = re.sub(r'\{\{MoN imagelink\}\}', 'Masks of Nyarlathotep', text)
-    
-    # Skill checks
-    text = re.sub(r'\{\{(Observation|Lore|Influence|Will|Strength)\}\}', r'(\1)', text)
-    text = re.sub(r'\{\{(Observation|Lore|Influence|Will|Strength)\|[^}]*\}\}', r'(\1)', text)
-    
-    # Icons
-    text = re.sub(r'\{\{Icon\|clue\}\}', 'Clue', text)
-    text = re.sub(r'\{\{Icon\|et\}\}', 'Eldritch Token', text)
-    text = re.sub(r'\{\{Icon\|sea\}\}', 'Sea', text)
-    text = re.sub(r'\{\{Icon\|city\}\}', 'City', text)
-    text = re.sub(r'\{\{Icon\|wilderness\}\}', 'Wilderness', text)
-    text = re.sub(r'\{\{Icon\|[^}]*\}\}', '', text)
-    
-    # Health/Sanity
-    text = re.sub(r'\{\{Health\|value=(\d+)\}\}', r'\1 Health', text)
-    text = re.sub(r'\{\{Sanity\|value=(\d+)\}\}', r'\1 Sanity', text)
-    text = re.sub(r'\{\{Health\}\}', 'Health', text)
-    text = re.sub(r'\{\{Sanity\}\}', 'Sanity', text)
-    
-    # Generic template removal
-    text = re.sub(r'\{\{[^}]+\}\}', '', text)
-    
-    # Remove table markup section headers
-    text = re.sub(r'\[City Encounters\s*\]', '', text)
-    text = re.sub(r'\[Wilderness Encounters\s*\]', '', text)
-    text = re.sub(r'\[Sea Encounters\s*\]', '', text)
-    text = re.sub(r'\[Special Encounters\s*\]', '', text)
-    
-    # Clean up whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    
-    return text.strip()
+    return clean_wiki_markup(text, "mysteries")
 
 
 def parse_encounter_table(raw_text: str, encounter_type: str) -> list[dict]:
@@ -252,43 +202,27 @@ def extract_mystery_details(mystery_page: dict) -> Optional[dict]:
     }
 
 
-def main():
-    # Paths
-    script_dir = Path(__file__).parent
-    app_public = script_dir.parent / 'app' / 'public'
-    
-    data_file = app_public / 'eldritch_horror_data.json'
-    detailed_file = app_public / 'ancient_ones_detailed.json'
-    output_file = app_public / 'ancient_ones_detailed.json'  # Same file, we'll update it
-    
-    print(f"Reading data from {data_file}...")
-    with open(data_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+# Read by extract_all.py, which loads the dataset once for all extractors
+CATEGORIES = ['mysteries', 'encounters.research']
+PAGES = []
+READS = ['ancient_ones_detailed.json']
+WRITES = ['ancient_ones_detailed.json']  # Updated in place, after extract_ancient_ones.py
+
+
+def extract(dataset, public_dir: Path) -> None:
+    """Add mystery and research encounter details to ancient_ones_detailed.json from an open dataset reader."""
+    detailed_file = public_dir / 'ancient_ones_detailed.json'
+    output_file = public_dir / 'ancient_ones_detailed.json'  # Same file, we'll update it
     
     print(f"Reading existing detailed data from {detailed_file}...")
     with open(detailed_file, 'r', encoding='utf-8') as f:
         detailed_list = json.load(f)
     
-    # Get all pages from categories - build title lookup
-    categories = data.get('categories', {})
-    all_pages = []
-    for cat_name, pages in categories.items():
-        if isinstance(pages, list):
-            all_pages.extend(pages)
-    
-    print(f"Total pages across all categories: {len(all_pages)}")
-    
-    # Build title lookup
-    pages_by_title = {page['title']: page for page in all_pages if page.get('title')}
-    print(f"Pages by title: {len(pages_by_title)}")
-    
-    # Get mysteries from the mysteries category
-    mystery_pages = categories.get('mysteries', [])
-    print(f"Found {len(mystery_pages)} mystery pages in mysteries category")
-    
     # Build mystery lookup by ancient one
+    mystery_count = 0
     mysteries_by_ao: dict[str, list] = {}
-    for page in mystery_pages:
+    for page in dataset.iter_category('mysteries'):
+        mystery_count += 1
         # Check for ancient one in infobox
         infobox = page.get('infobox', {})
         ancient_one = infobox.get('ancient one', '')
@@ -303,16 +237,14 @@ def main():
                 mysteries_by_ao[ao_name] = []
             mysteries_by_ao[ao_name].append(details)
     
+    print(f"Found {mystery_count} mystery pages in mysteries category")
     print(f"Mysteries by Ancient One: {list(mysteries_by_ao.keys())}")
     
-    # Get the research encounters from the categories.encounters section
-    encounters = categories.get('encounters', {})
-    research_encounter_pages = encounters.get('research', [])
-    print(f"Found {len(research_encounter_pages)} research encounter pages in categories.encounters.research")
-    
-    # Build research encounters lookup by Ancient One name
-    research_pages_by_ao = {}
-    for page in research_encounter_pages:
+    # Build research encounters text lookup by Ancient One name
+    research_count = 0
+    research_text_by_ao = {}
+    for page in dataset.iter_category('encounters.research'):
+        research_count += 1
         # Get AO name from infobox or title
         ao_name = page.get('infobox', {}).get('ao', '')
         if not ao_name:
@@ -320,9 +252,10 @@ def main():
             title = page.get('title', '')
             ao_name = title.replace(' Research Encounters', '')
         if ao_name:
-            research_pages_by_ao[ao_name] = page
+            research_text_by_ao[ao_name] = page.get('fullText', '')
     
-    print(f"Found research encounter pages for: {list(research_pages_by_ao.keys())}")
+    print(f"Found {research_count} research encounter pages in categories.encounters.research")
+    print(f"Found research encounter pages for: {list(research_text_by_ao.keys())}")
     
     # Update each Ancient One with mysteries and research encounters
     for entry in detailed_list:
@@ -330,11 +263,9 @@ def main():
         print(f"\nProcessing: {ao_name}")
         
         # Find research encounters page
-        research_page = research_pages_by_ao.get(ao_name, {})
-        
-        if research_page:
+        if ao_name in research_text_by_ao:
             print(f"  Found research encounters page")
-            full_text = research_page.get('fullText', '')
+            full_text = research_text_by_ao[ao_name]
             research_encounters = parse_research_encounters_simple(full_text)
             entry['researchEncounterDetails'] = research_encounters
             print(f"    City: {len(research_encounters['city'])} encounters")
@@ -353,8 +284,11 @@ def main():
     
     # Write updated output
     print(f"\nWriting updated data to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(detailed_list, f, indent=2, ensure_ascii=False)
+    instrument.count(items=len(detailed_list))
+    with instrument.stage("write json"):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(detailed_list, f, indent=2, ensure_ascii=False)
+        instrument.count_file(output_file)
     
     print("Done!")
     
@@ -375,6 +309,19 @@ def main():
             print(f"  Sea #1: {enc['sea'][0]['description'][:150]}...")
 
 
+@instrument.instrumented
+def main():
+    # Paths
+    script_dir = Path(__file__).parent
+    app_public = script_dir.parent / 'app' / 'public'
+    data_file = app_public / 'eldritch_horror_data.json'
+    
+    # Stream the two categories page by page, keeping only what is extracted from them
+    print(f"Reading data from {data_file}...")
+    with open_dataset(data_file) as dataset, instrument.stage("extract", hot=True):
+        extract(dataset, app_public)
+
+
 if __name__ == '__main__':
     main()
 
@@ -3,31 +3,48 @@
 Extract all Mythos card data from eldritch_horror_data.json
 
 This script reads the eldritch_horror_data.json file and extracts all
-mythos cards with their complete data including:
-- Title and pageId
-- All categories
+mythos cards. Each card keeps the fields its projection profile lists for
+the mythos category (see projection_profiles.json); the default "app"
+profile keeps what the web app's mythos selection reads:
+- Title, pageId and categories
 - Infobox data
 - Card data
-- Sections
-- Links
-- Templates
 - Full text
 - Raw wikitext
+Use --profile full to keep sections, links and templates as well.
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
 from datetime import datetime
 
+import instrument
+from corpus import LoadedDataset
+from filter_mythos_cards import is_core_or_forsaken_lore
+from projection import Projection, profile_names
 
-def extract_mythos_cards(input_file: str, output_file: str):
+DEFAULT_PROFILE = "app"
+
+
+# Read by extract_all.py, which loads the dataset once for all extractors.
+# extract() writes the app's copy, already filtered the way the pipeline's
+# filter-mythos-cards stage filters it.
+CATEGORIES = ["mythos"]
+PAGES = []
+READS = []
+WRITES = ["mythos_cards.json"]
+
+
+def extract_mythos_cards(input_file: str, output_file: str, profile: str = DEFAULT_PROFILE):
     """
     Extract all mythos cards from the input JSON file and write to output file.
     
     Args:
         input_file: Path to eldritch_horror_data.json
         output_file: Path to output JSON file
+        profile: Projection profile deciding which card fields are written
     """
     print("=" * 60)
     print("MYTHOS CARD EXTRACTOR")
@@ -38,34 +55,40 @@ def extract_mythos_cards(input_file: str, output_file: str):
     # Read input file
     print(f"Reading input file: {input_file}")
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # One category and no page lookups: a whole-file read beats streaming
+        with instrument.stage("load"):
+            dataset = LoadedDataset.read(input_file, CATEGORIES, PAGES)
+        with instrument.stage("extract", hot=True):
+            write_mythos_cards(dataset, output_file, profile)
     except FileNotFoundError:
         print(f"ERROR: File not found: {input_file}")
         sys.exit(1)
     except json.JSONDecodeError as e:
         print(f"ERROR: Invalid JSON in {input_file}: {e}")
         sys.exit(1)
-    
-    # Extract mythos cards
+
+
+def extract(dataset, public_dir: Path) -> None:
+    """Write the app's mythos_cards.json (default profile, Core Game and Forsaken Lore only) from an open dataset reader."""
+    write_mythos_cards(dataset, public_dir / "mythos_cards.json", DEFAULT_PROFILE, core_and_forsaken_lore_only=True)
+
+
+def write_mythos_cards(dataset, output_file, profile: str = DEFAULT_PROFILE, core_and_forsaken_lore_only: bool = False):
+    """
+    Write the mythos category of an open dataset reader (see corpus.open_dataset) to output_file.
+    With core_and_forsaken_lore_only, keep only the cards filter_mythos_cards.py keeps,
+    with the metadata it adds.
+    """
     print("Extracting mythos cards...")
-    mythos_cards = []
+    mythos_cards = dataset.category("mythos")
+    print(f"SUCCESS: Found {len(mythos_cards)} mythos cards in categories.mythos")
+    if core_and_forsaken_lore_only:
+        mythos_cards = [card for card in mythos_cards if is_core_or_forsaken_lore(card)]
+        print(f"Kept {len(mythos_cards)} Core Game and Forsaken Lore cards")
     
-    if "categories" in data and "mythos" in data["categories"]:
-        mythos_cards = data["categories"]["mythos"]
-        print(f"SUCCESS: Found {len(mythos_cards)} mythos cards in categories.mythos")
-    else:
-        print("WARNING: No categories.mythos found, searching allPages...")
-        # Fallback: search allPages for entries with "Mythos" in categories
-        if "allPages" in data:
-            for title, page_data in data["allPages"].items():
-                if isinstance(page_data, dict) and "categories" in page_data:
-                    if isinstance(page_data["categories"], list) and "Mythos" in page_data["categories"]:
-                        mythos_cards.append(page_data)
-            print(f"SUCCESS: Found {len(mythos_cards)} mythos cards in allPages")
-        else:
-            print("ERROR: No mythos cards found in data structure")
-            sys.exit(1)
+    # Keep only the fields the profile lists for mythos cards
+    projection = Projection.load(profile)
+    print(f"Projecting cards with the '{profile}' profile")
     
     # Create output structure
     output_data = {
@@ -73,16 +96,23 @@ def extract_mythos_cards(input_file: str, output_file: str):
             "source": "eldritch_horror_data.json",
             "extractedAt": datetime.now().isoformat(),
             "totalMythosCards": len(mythos_cards),
-            "description": "Complete mythos card data including all properties, categories, tags, and text"
+            "profile": profile,
+            "description": "Mythos card data: categories, card properties and text, projected with the given profile"
         },
-        "mythosCards": mythos_cards
+        "mythosCards": [projection.project(card, "mythos") for card in mythos_cards]
     }
+    if core_and_forsaken_lore_only:
+        output_data["metadata"]["filteredAt"] = output_data["metadata"]["extractedAt"]
+        output_data["metadata"]["filterDescription"] = "Filtered to only Core Game and Forsaken Lore expansions"
     
     # Write output file
     print(f"\nWriting output to: {output_file}")
+    instrument.count(items=len(mythos_cards))
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        with instrument.stage("write json"):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            instrument.count_file(output_file)
         print(f"SUCCESS: Successfully wrote {len(mythos_cards)} mythos cards to {output_file}")
     except Exception as e:
         print(f"ERROR: Error writing output file: {e}")
@@ -134,6 +164,7 @@ def extract_mythos_cards(input_file: str, output_file: str):
     print("=" * 60)
 
 
+@instrument.instrumented
 def main():
     """Main entry point"""
     # Get script directory
@@ -145,12 +176,18 @@ def main():
     output_file = project_root / "mythos_cards.json"
     
     # Allow command line arguments to override
-    if len(sys.argv) > 1:
-        input_file = Path(sys.argv[1])
-    if len(sys.argv) > 2:
-        output_file = Path(sys.argv[2])
+    parser = argparse.ArgumentParser(description="Extract all Mythos cards from eldritch_horror_data.json.")
+    parser.add_argument("input", nargs="?", type=Path, default=input_file)
+    parser.add_argument("output", nargs="?", type=Path, default=output_file)
+    parser.add_argument(
+        "--profile",
+        choices=profile_names(),
+        default=DEFAULT_PROFILE,
+        help=f"field projection profile for the written cards (default: {DEFAULT_PROFILE})",
+    )
+    args = parser.parse_args()
     
-    extract_mythos_cards(str(input_file), str(output_file))
+    extract_mythos_cards(str(args.input), str(args.output), args.profile)
 
 
 if __name__ == "__main__":
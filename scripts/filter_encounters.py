@@ -12,6 +12,8 @@ import json
 import re
 from pathlib import Path
 
+import instrument
+
 INPUT_DIR = Path("scraped_encounters")
 OUTPUT_DIR = Path("scraped_encounters_filtered")
 
@@ -117,6 +119,7 @@ def filter_encounters(data: dict) -> dict:
     return filtered
 
 
+@instrument.instrumented
 def main():
     # Fix Windows console encoding
     import sys
@@ -146,22 +149,28 @@ def main():
         
         print(f"[>] Processing {json_file.name}...")
         
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        # Count before (all sources)
-        before_count = count_all_encounters(data)
-        
-        # Filter
-        filtered = filter_encounters(data)
+        with instrument.stage("load"):
+            with open(json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            instrument.count_file(json_file, output=False)
         
-        # Count after (all sources)
-        after_count = count_all_encounters(filtered)
+        with instrument.stage("filter", hot=True):
+            # Count before (all sources)
+            before_count = count_all_encounters(data)
+            
+            # Filter
+            filtered = filter_encounters(data)
+            
+            # Count after (all sources)
+            after_count = count_all_encounters(filtered)
+            instrument.count(items=before_count)
         
         # Save filtered data
         output_file = OUTPUT_DIR / json_file.name
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(filtered, f, indent=2, ensure_ascii=False)
+        with instrument.stage("write json"):
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(filtered, f, indent=2, ensure_ascii=False)
+            instrument.count_file(output_file)
         
         stats[json_file.name] = {
             "before": before_count,
@@ -11,6 +11,8 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+import instrument
+
 
 def is_core_or_forsaken_lore(card):
     """
@@ -60,8 +62,9 @@ def filter_mythos_cards(input_file: str, output_file: str):
     # Read input file
     print(f"Reading input file: {input_file}")
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
+        with instrument.stage("load"), open(input_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
+            instrument.count_file(input_file, output=False)
     except FileNotFoundError:
         print(f"ERROR: File not found: {input_file}")
         sys.exit(1)
@@ -79,7 +82,9 @@ def filter_mythos_cards(input_file: str, output_file: str):
     
     # Filter cards
     print("Filtering cards...")
-    filtered_cards = [card for card in all_cards if is_core_or_forsaken_lore(card)]
+    with instrument.stage("filter", hot=True):
+        filtered_cards = [card for card in all_cards if is_core_or_forsaken_lore(card)]
+        instrument.count(items=len(all_cards))
     
     print(f"Cards after filtering: {len(filtered_cards)}")
     print(f"Removed: {len(all_cards) - len(filtered_cards)} cards")
@@ -93,8 +98,10 @@ def filter_mythos_cards(input_file: str, output_file: str):
     # Write output file
     print(f"\nWriting output to: {output_file}")
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with instrument.stage("write json"):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            instrument.count_file(output_file)
         print(f"SUCCESS: Successfully wrote {len(filtered_cards)} cards to {output_file}")
     except Exception as e:
         print(f"ERROR: Error writing output file: {e}")
@@ -132,6 +139,7 @@ def filter_mythos_cards(input_file: str, output_file: str):
     print("=" * 60)
 
 
+@instrument.instrumented
 def main():
     """Main entry point"""
     # Get script directory
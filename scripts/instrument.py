@@ -0,0 +1,403 @@
+"""
+Run instrumentation for the scrape, extract and filter scripts.
+A script whose main() is decorated with @instrumented writes a JSON report
+of every run to reports/<script>.<timestamp>.json. The report has one
+record per stage (`with stage("write json"):`), holding:
+- wall and CPU time, including the CPU time of worker processes
+- peak RSS
+- pages and bytes in/out, with their rates
+- on request, calls and time of the functions marked @timed
+  (clean_wiki_markup, parse_wikitext, ...)
+Scraper runs add a latency histogram of their wiki requests.
+
+Stages and counters cost little and are always on. Timing a function
+costs more than some of the hot, memoized helpers it would time, so @timed
+wrappers only record when PIPELINE_TIME_FUNCTIONS is set, and cost one
+check otherwise. Switches come from the environment, so pipeline.py can
+pass them to every stage alike (pipeline.py, extract_all.py and
+scrape_eldritch.py also take them as --cprofile, --trace-memory and
+--time-functions):
+
+    PIPELINE_CPROFILE=1 python extract_investigators.py   # + cProfile dump of the hot stages
+    PIPELINE_TRACEMALLOC=1 python filter_encounters.py    # + allocation peaks and top sites
+    PIPELINE_TIME_FUNCTIONS=1 python extract_all.py       # + calls and time of the @timed functions
+    PIPELINE_REPORT_DIR=/tmp/reports python scrape_eldritch.py
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+REPORT_DIR = Path(__file__).parent / "reports"
+REPORT_DIR_ENV = "PIPELINE_REPORT_DIR"
+CPROFILE_ENV = "PIPELINE_CPROFILE"
+TRACEMALLOC_ENV = "PIPELINE_TRACEMALLOC"
+TIME_FUNCTIONS_ENV = "PIPELINE_TIME_FUNCTIONS"
+
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]  # Upper bounds, seconds
+TOP_ALLOCATIONS = 10  # Allocation sites listed per stage under tracemalloc
+TOP_FUNCTIONS = 40  # Lines of the text summary next to each cProfile dump
+
+REPORT = None  # The running script's report; None outside an instrumented run
+OPEN_STAGES = []  # Records of the stages currently running, outermost first
+LATENCIES = []  # Seconds per wiki request, summarized when the report is written
+PROFILERS = {}  # cProfile.Profile per hot stage name, dumped when the report is written
+PROFILING = False  # cProfile cannot nest, so only the outermost hot stage is profiled
+TIMING = False  # Whether @timed functions record, for this run
+
+
+def enabled(env: str) -> bool:
+    return os.environ.get(env, "") not in ("", "0")
+
+
+def peak_rss_bytes() -> int | None:
+    """High-water mark of this process's resident memory so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def child_cpu_seconds() -> float:
+    """CPU time of finished child processes, e.g. a parse worker pool."""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-").lower()
+
+
+def begin(script: str) -> None:
+    """Start reporting a run of `script`; instrumented() calls this for you."""
+    global REPORT, TIMING
+    now = datetime.now()
+    REPORT = {
+        "script": script,
+        "argv": sys.argv[1:],
+        "startedAt": now.isoformat(),
+        "stamp": now.strftime("%Y%m%d-%H%M%S"),
+        "cprofile": enabled(CPROFILE_ENV),
+        "tracemalloc": enabled(TRACEMALLOC_ENV),
+        "timeFunctions": enabled(TIME_FUNCTIONS_ENV),
+        "items": 0,
+        "bytesIn": 0,
+        "bytesOut": 0,
+        "functions": {},
+        "stages": [],
+        "statuses": {},
+        "started": (time.perf_counter(), time.process_time(), child_cpu_seconds()),
+    }
+    OPEN_STAGES.clear()
+    LATENCIES.clear()
+    PROFILERS.clear()
+    TIMING = REPORT["timeFunctions"]
+    if REPORT["tracemalloc"] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def configure(cprofile: bool = False, trace_memory: bool = False, time_functions: bool = False) -> None:
+    """Turn on switches given as command-line flags, after instrumented() started the run."""
+    global TIMING
+    if REPORT is None:
+        return
+    REPORT["cprofile"] = REPORT["cprofile"] or cprofile
+    REPORT["timeFunctions"] = TIMING = REPORT["timeFunctions"] or time_functions
+    if trace_memory and not REPORT["tracemalloc"]:
+        REPORT["tracemalloc"] = True
+        tracemalloc.start()
+
+
+def report_path(suffix: str) -> Path:
+    directory = Path(os.environ.get(REPORT_DIR_ENV) or REPORT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{REPORT['script']}.{REPORT['stamp']}{suffix}"
+
+
+def add_rates(record: dict) -> None:
+    seconds = record["wallSeconds"] or 1e-9
+    record["itemsPerSecond"] = round(record["items"] / seconds, 2)
+    record["bytesInPerSecond"] = round(record["bytesIn"] / seconds)
+    record["bytesOutPerSecond"] = round(record["bytesOut"] / seconds)
+
+
+def dump_profile(profiler: cProfile.Profile, name: str) -> str:
+    """Write the .prof file (for pstats / snakeviz) and a text summary; returns the .prof path."""
+    path = report_path(f".{slug(name)}.prof")
+    profiler.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(str(path), stream=summary).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    path.with_suffix(".txt").write_text(summary.getvalue(), encoding="utf-8")
+    return str(path)
+
+
+def stage_record(name: str) -> dict:
+    """The record of stage `name` under the innermost open stage, created on first use."""
+    parent = OPEN_STAGES[-1]["name"] if OPEN_STAGES else None
+    for record in REPORT["stages"]:
+        if record["name"] == name and record.get("parent") == parent:
+            return record
+    record = {
+        "name": name,
+        "calls": 0,
+        "wallSeconds": 0.0,
+        "cpuSeconds": 0.0,
+        "childCpuSeconds": 0.0,
+        "items": 0,
+        "bytesIn": 0,
+        "bytesOut": 0,
+        "functions": {},
+    }
+    if parent is not None:
+        record["parent"] = parent
+    REPORT["stages"].append(record)
+    return record
+
+
+@contextlib.contextmanager
+def stage(name: str, hot: bool = False):
+    """Record the enclosed block as a stage of the run; yields its record (None outside a run).
+
+    Stages nest: counts and @timed calls go to every open stage. Entering
+    a stage again (once per input file, say) adds to the same record. A
+    hot stage runs under cProfile when PIPELINE_CPROFILE is set.
+    """
+    global PROFILING
+    if REPORT is None:
+        yield None
+        return
+
+    record = stage_record(name)
+    record["calls"] += 1
+
+    snapshot = None
+    if REPORT["tracemalloc"]:
+        # The peak is process-wide: credit the peak so far to the open stages before resetting it
+        peak = tracemalloc.get_traced_memory()[1]
+        for open_record in OPEN_STAGES:
+            open_record["tracePeak"] = max(open_record.get("tracePeak", 0), peak)
+        tracemalloc.reset_peak()
+        snapshot = tracemalloc.take_snapshot()
+
+    profiler = None
+    if hot and REPORT["cprofile"] and not PROFILING:
+        profiler = PROFILERS.setdefault(name, cProfile.Profile())
+        PROFILING = True
+
+    OPEN_STAGES.append(record)
+    wall, cpu, children = time.perf_counter(), time.process_time(), child_cpu_seconds()
+    if profiler:
+        profiler.enable()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = repr(e)
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+            PROFILING = False
+        OPEN_STAGES.remove(record)
+        record["wallSeconds"] = round(record["wallSeconds"] + time.perf_counter() - wall, 4)
+        record["cpuSeconds"] = round(record["cpuSeconds"] + time.process_time() - cpu, 4)
+        record["childCpuSeconds"] = round(record["childCpuSeconds"] + child_cpu_seconds() - children, 4)
+        record["peakRssBytes"] = peak_rss_bytes()
+        add_rates(record)
+        if snapshot is not None:
+            peak = max(record.pop("tracePeak", 0), tracemalloc.get_traced_memory()[1])
+            for open_record in OPEN_STAGES:
+                open_record["tracePeak"] = max(open_record.get("tracePeak", 0), peak)
+            growth = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:TOP_ALLOCATIONS]
+            record["tracemalloc"] = {
+                "peakBytes": max(peak, record.get("tracemalloc", {}).get("peakBytes", 0)),
+                # Allocation growth over the stage's latest pass
+                "top": [
+                    {"where": str(stat.traceback), "sizeDiffBytes": stat.size_diff, "countDiff": stat.count_diff}
+                    for stat in growth
+                ],
+            }
+
+
+def dump_profiles() -> None:
+    """Write the cProfile stats collected for the hot stages and note their paths in the stage records."""
+    for name, profiler in PROFILERS.items():
+        path = dump_profile(profiler, name)
+        for record in REPORT["stages"]:
+            if record["name"] == name:
+                record["cprofile"] = path
+    PROFILERS.clear()
+
+
+def take_stages() -> list[dict]:
+    """Remove and return the stage records made so far (none outside a run).
+
+    A forked worker calls it first to drop the copies of its parent's
+    records, then again to collect its own and send them back.
+    """
+    if REPORT is None:
+        return []
+    records, REPORT["stages"] = REPORT["stages"], []
+    return records
+
+
+def add_stages(records: list[dict]) -> None:
+    """File stage records made in a forked worker under this run."""
+    if REPORT is None:
+        return
+    REPORT["stages"].extend(records)
+    for record in records:
+        if "parent" in record:
+            continue  # Already counted in its outermost stage
+        for key in ("items", "bytesIn", "bytesOut"):
+            REPORT[key] += record[key]
+        for name, timing in record["functions"].items():
+            total = REPORT["functions"].setdefault(name, {"calls": 0, "seconds": 0.0})
+            total["calls"] += timing["calls"]
+            total["seconds"] += timing["seconds"]
+
+
+def count(items: int = 0, bytes_in: int = 0, bytes_out: int = 0) -> None:
+    """Add pages/entries handled and bytes read or written to the run and its open stages."""
+    if REPORT is None:
+        return
+    for record in [REPORT, *OPEN_STAGES]:
+        record["items"] += items
+        record["bytesIn"] += bytes_in
+        record["bytesOut"] += bytes_out
+
+
+def count_file(path: Path, output: bool = True) -> None:
+    """Count a file (or a directory's files) as bytes written, or read with output=False."""
+    if REPORT is None:
+        return
+    path = Path(path)
+    if path.is_dir():
+        size = sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+    else:
+        size = path.stat().st_size
+    if output:
+        count(bytes_out=size)
+    else:
+        count(bytes_in=size)
+
+
+def timed(func):
+    """Count calls and wall time of `func` in the run and in each open stage, when PIPELINE_TIME_FUNCTIONS is set."""
+    name = f"{Path(func.__code__.co_filename).stem}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not TIMING:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            for record in [REPORT, *OPEN_STAGES]:
+                timing = record["functions"].setdefault(name, {"calls": 0, "seconds": 0.0})
+                timing["calls"] += 1
+                timing["seconds"] += elapsed
+
+    return wrapper
+
+
+def observe_request(seconds: float, status: int | None, size: int = 0) -> None:
+    """Record one wiki request: its latency, status (None for a transport error) and body size."""
+    if REPORT is None:
+        return
+    LATENCIES.append(seconds)
+    key = str(status) if status is not None else "error"
+    REPORT["statuses"][key] = REPORT["statuses"].get(key, 0) + 1
+    count(bytes_in=size)
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    """Count, percentiles and a fixed-bucket histogram of request latencies."""
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 4)
+
+    histogram = [{"le": bound, "count": 0} for bound in LATENCY_BUCKETS] + [{"le": "+Inf", "count": 0}]
+    for seconds in ordered:
+        bucket = next((b for b, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        histogram[bucket]["count"] += 1
+    return {
+        "count": len(ordered),
+        "meanSeconds": round(sum(ordered) / len(ordered), 4),
+        "p50Seconds": percentile(0.5),
+        "p90Seconds": percentile(0.9),
+        "p99Seconds": percentile(0.99),
+        "maxSeconds": round(ordered[-1], 4),
+        "histogram": histogram,
+    }
+
+
+def finish(status: str = "ok") -> Path:
+    """Write the run's report and stop reporting; returns the report path."""
+    global REPORT, TIMING
+    dump_profiles()
+    wall, cpu, children = REPORT.pop("started")
+    report = {
+        **REPORT,
+        "status": status,
+        "wallSeconds": round(time.perf_counter() - wall, 4),
+        "cpuSeconds": round(time.process_time() - cpu, 4),
+        "childCpuSeconds": round(child_cpu_seconds() - children, 4),
+        "peakRssBytes": peak_rss_bytes(),
+    }
+    add_rates(report)
+    if LATENCIES:
+        report["requests"] = {**latency_summary(LATENCIES), "statuses": report["statuses"]}
+    del report["statuses"]
+    for timing in report["functions"].values():
+        timing["seconds"] = round(timing["seconds"], 4)
+    for record in report["stages"]:
+        for timing in record["functions"].values():
+            timing["seconds"] = round(timing["seconds"], 4)
+
+    path = report_path(".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    REPORT = None
+    TIMING = False
+    return path
+
+
+def instrumented(main):
+    """Decorate a script's main(): the run is reported, whether it returns, exits or raises."""
+    @functools.wraps(main)
+    def wrapper(*args, **kwargs):
+        if REPORT is not None:  # Already inside a reported run
+            return main(*args, **kwargs)
+        begin(Path(sys.argv[0]).stem or main.__module__)
+        status = "ok"
+        try:
+            return main(*args, **kwargs)
+        except SystemExit as e:
+            status = "ok" if e.code in (None, 0) else f"exit {e.code}"
+            raise
+        except BaseException as e:
+            status = f"failed: {e!r}"
+            raise
+        finally:
+            path = finish(status)
+            print(f"📈 Run report: {path}")
+
+    return wrapper
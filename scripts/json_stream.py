@@ -0,0 +1,277 @@
+"""
+Streaming reader for the monolithic eldritch_horror_data.json.
+The file is memory-mapped and walked without building the tree. Paths like
+categories.investigators or allPages.<title> are located by skipping over
+everything else. Every writer in dataset_io pretty-prints, so a container
+that opens a line ends at the first later line holding just its closing
+bracket at the same indentation (children are indented deeper, strings
+hold no raw newlines): skipping it is one bytes.find. Anything else falls
+back to a regex consuming each run of plain text and strings up to the
+next bracket. Only the records asked for are decoded, one at a time, so
+memory stays at about one page however large the file grows.
+
+    with JsonStream(path) as stream:
+        for entry in stream.values("categories", "investigators"):
+            ...
+        defeated = stream.get("allPages", "Defeated")
+"""
+
+import json
+import mmap
+import re
+from pathlib import Path
+
+WHITESPACE_RE = re.compile(rb"[ \t\r\n]*")
+STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Everything up to the next bracket; strings (which may contain brackets) are consumed whole
+FLAT_RUN_RE = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*', re.DOTALL)
+SCALAR_END_RE = re.compile(rb"[,\]}\s]")
+INDENT_RE = re.compile(rb" *")
+CLOSERS = {b"{": b"}", b"[": b"]"}
+
+
+class JsonStream:
+    """Random access into a large JSON file by path, decoding only what is read.
+
+    Path keys are object member names (str) or array indexes (int).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.buf = b""  # Empty files cannot be mapped
+
+    def __enter__(self) -> "JsonStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self.file.close()
+
+    def skip_whitespace(self, pos: int) -> int:
+        return WHITESPACE_RE.match(self.buf, pos).end()
+
+    def value_end(self, pos: int) -> int:
+        """Offset just past the JSON value starting at `pos`."""
+        first = self.buf[pos:pos + 1]
+        if first == b'"':
+            return STRING_RE.match(self.buf, pos).end()
+        if first not in (b"{", b"["):
+            match = SCALAR_END_RE.search(self.buf, pos)
+            return match.start() if match else len(self.buf)
+        end = self.indented_end(pos)
+        if end is not None:
+            return end
+
+        depth = 0
+        while True:
+            pos = FLAT_RUN_RE.match(self.buf, pos).end()
+            bracket = self.buf[pos:pos + 1]
+            if bracket in (b"{", b"["):
+                depth += 1
+            elif bracket in (b"}", b"]"):
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            else:
+                raise ValueError(f"Unterminated JSON value in {self.path}")
+            pos += 1
+
+    def line_indent(self, pos: int) -> bytes:
+        """The leading spaces of the line holding `pos`."""
+        line_start = self.buf.rfind(b"\n", 0, pos) + 1
+        return self.buf[line_start:INDENT_RE.match(self.buf, line_start).end()]
+
+    def child_indent(self, pos: int) -> bytes | None:
+        """b"\\n" plus the indentation of the members of the container at `pos`, or None if it is not pretty-printed."""
+        if self.buf[pos + 1:pos + 2] != b"\n":
+            return None
+        child_end = INDENT_RE.match(self.buf, pos + 2).end()
+        return self.buf[pos + 1:child_end] if child_end - (pos + 2) > len(self.line_indent(pos)) else None
+
+    def indented_end(self, pos: int) -> int | None:
+        """Offset past the pretty-printed container at `pos`, or None if it is not laid out on indented lines."""
+        if self.child_indent(pos) is None:
+            return None
+        closing = b"\n" + self.line_indent(pos) + CLOSERS[self.buf[pos:pos + 1]]
+        end = self.buf.find(closing, pos)
+        return end + len(closing) if end != -1 else None
+
+    def member(self, pos: int, key: str, end: int | None = None) -> tuple[int, int] | None:
+        """(start, end) of member `key` of the object at `pos` (ending at `end`, if known), or None.
+
+        Pretty-printed, a member is the only line starting with the member
+        indentation and its quoted key, so it is found without walking the
+        members before it.
+        """
+        indent = self.child_indent(pos)
+        if indent is not None and end is None:
+            end = self.indented_end(pos)
+        if indent is None or end is None:
+            return next(((s, e) for k, s, e in self.object_members(pos) if k == key), None)
+        for quoted in dict.fromkeys([json.dumps(key, ensure_ascii=False), json.dumps(key)]):
+            prefix = indent + quoted.encode("utf-8") + b":"
+            found = self.buf.find(prefix, pos, end)
+            if found != -1:
+                start = self.skip_whitespace(found + len(prefix))
+                return start, self.value_end(start)
+        return None
+
+    def object_members(self, pos: int):
+        """Yield (key, start, end) for each member of the object at `pos`."""
+        pos = self.skip_whitespace(pos + 1)
+        if self.buf[pos:pos + 1] == b"}":
+            return
+        while True:
+            key_end = STRING_RE.match(self.buf, pos).end()
+            key = json.loads(self.buf[pos:key_end])
+            start = self.skip_whitespace(self.skip_whitespace(key_end) + 1)  # Past the colon
+            end = self.value_end(start)
+            yield key, start, end
+            pos = self.skip_whitespace(end)
+            if self.buf[pos:pos + 1] != b",":
+                return
+            pos = self.skip_whitespace(pos + 1)
+
+    def array_elements(self, pos: int):
+        """Yield (start, end) for each element of the array at `pos`."""
+        pos = self.skip_whitespace(pos + 1)
+        if self.buf[pos:pos + 1] == b"]":
+            return
+        while True:
+            end = self.value_end(pos)
+            yield pos, end
+            pos = self.skip_whitespace(end)
+            if self.buf[pos:pos + 1] != b",":
+                return
+            pos = self.skip_whitespace(pos + 1)
+
+    def locate(self, *keys) -> tuple[int, int] | None:
+        """(start, end) of the value at a path, or None if the path does not exist."""
+        start = self.skip_whitespace(0)
+        end = None
+        for key in keys:
+            kind = self.buf[start:start + 1]
+            if kind == b"{" and isinstance(key, str):
+                span = self.member(start, key)
+            elif kind == b"[" and isinstance(key, int):
+                span = next((span for i, span in enumerate(self.array_elements(start)) if i == key), None)
+            else:
+                span = None
+            if span is None:
+                return None
+            start, end = span
+        return start, end if end is not None else self.value_end(start)
+
+    def decode(self, start: int, end: int):
+        return json.loads(self.buf[start:end])
+
+    def get(self, *keys, default=None):
+        """Decode the value at a path, e.g. get("allPages", "Defeated")."""
+        span = self.locate(*keys)
+        return self.decode(*span) if span else default
+
+    def values(self, *keys):
+        """Decode the elements of the array (or values of the object) at a path, one at a time."""
+        span = self.locate(*keys)
+        if span is None:
+            return
+        if self.buf[span[0]:span[0] + 1] == b"[":
+            for start, end in self.array_elements(span[0]):
+                yield self.decode(start, end)
+        else:
+            for _, start, end in self.object_members(span[0]):
+                yield self.decode(start, end)
+
+    def items(self, *keys):
+        """Yield (key, decoded value) for the object at a path, one member at a time."""
+        span = self.locate(*keys)
+        if span is None:
+            return
+        for key, start, end in self.object_members(span[0]):
+            yield key, self.decode(start, end)
+
+
+class StreamedDataset:
+    """Dataset-shaped view of eldritch_horror_data.json (either layout) over a JsonStream.
+
+    Same read interface as corpus.Corpus and shards.ShardedDataset. Offsets
+    are recorded as they are found, so a category, its entries or a page are
+    located once however many passes read them.
+    """
+
+    def __init__(self, path: Path):
+        self.stream = JsonStream(path)
+        self.metadata = self.stream.get("metadata", default={})
+        self.normalized = self.metadata.get("layout") == "normalized"
+        self.spans = {}
+        self.page_spans = None
+        self.title_spans = {}
+        self.element_spans = {}
+
+    def __enter__(self) -> "StreamedDataset":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stream.close()
+
+    def span(self, *keys) -> tuple[int, int] | None:
+        """JsonStream.locate, remembered per path."""
+        if keys not in self.spans:
+            self.spans[keys] = self.stream.locate(*keys)
+        return self.spans[keys]
+
+    def page_span(self, page_id) -> tuple[int, int] | None:
+        """Normalized layout: where pages[page_id] sits, from a one-off offset index."""
+        if self.page_spans is None:
+            pages = self.span("pages")
+            members = self.stream.object_members(pages[0]) if pages else ()
+            self.page_spans = {key: (start, end) for key, start, end in members}
+        return self.page_spans.get(str(page_id))
+
+    def title_span(self, title: str) -> tuple[int, int] | None:
+        """Where allPages[title] sits, remembered per title."""
+        if title not in self.title_spans:
+            all_pages = self.span("allPages")
+            self.title_spans[title] = self.stream.member(all_pages[0], title, all_pages[1]) if all_pages else None
+        return self.title_spans[title]
+
+    def iter_category(self, name: str):
+        """Entries of a dataset category ("mythos", "encounters.research"), one at a time."""
+        elements = self.element_spans.get(name)
+        if elements is None:
+            span = self.span("categories", *name.split("."))
+            if span is None:
+                return
+            elements = []
+            for start, end in self.stream.array_elements(span[0]):
+                elements.append((start, end))
+                yield self.entry(start, end)
+            self.element_spans[name] = elements
+            return
+        for start, end in elements:
+            yield self.entry(start, end)
+
+    def entry(self, start: int, end: int) -> dict:
+        """The page at a category or allPages span, which holds its id in the normalized layout."""
+        entry = self.stream.decode(start, end)
+        if not self.normalized:
+            return entry
+        span = self.page_span(entry)
+        if span is None:
+            raise KeyError(f"Page id {entry!r} is not in pages of {self.stream.path}")
+        return self.stream.decode(*span)
+
+    def category(self, name: str) -> list[dict]:
+        return list(self.iter_category(name))
+
+    def page(self, title: str) -> dict | None:
+        span = self.title_span(title)
+        return self.entry(*span) if span else None
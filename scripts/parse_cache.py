@@ -0,0 +1,123 @@
+"""
+On-disk cache of parse_wikitext results.
+Entries are keyed by a SHA-256 of the parser version and the page's
+wikitext, so a page whose text has not changed is never parsed twice, and
+bumping wikitext.PARSER_VERSION invalidates every entry at once. The cache
+is a single SQLite file holding at most `max_bytes` of parse results; the
+least recently used entries are evicted first.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from wikitext import PARSER_VERSION
+
+DEFAULT_MAX_MB = 256
+COMMIT_EVERY = 500  # Writes batched per transaction
+EVICT_BATCH = 64
+
+
+def parse_cache_path(output_path: Path) -> Path:
+    """The cache lives next to the output: eldritch_horror_data.parse_cache.sqlite."""
+    return output_path.with_suffix(".parse_cache.sqlite")
+
+
+def cache_key(content: str, version: int = PARSER_VERSION) -> str:
+    return hashlib.sha256(f"{version}\0{content}".encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """Size-bounded LRU map from wikitext to its parse_wikitext result.
+
+    Results are stored without their title (the only field that does not
+    come from the text), so renamed pages and duplicate texts share entries.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, version: int = PARSER_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.uncommitted = 0
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, parsed TEXT NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'parser_version'").fetchone()
+        if row is None or row[0] != str(version):
+            # Every key changes with the version; drop the old entries instead of waiting for eviction
+            self.db.execute("DELETE FROM entries")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('parser_version', ?)", (str(version),))
+            self.db.commit()
+
+        self.size, self.clock = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM entries"
+        ).fetchone()
+        self.evict()
+
+    def __enter__(self) -> "ParseCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def tick(self) -> int:
+        self.clock += 1
+        return self.clock
+
+    def get(self, content: str, title: str) -> dict | None:
+        """Return the cached parse of `content` under `title`, or None on a miss."""
+        key = cache_key(content, self.version)
+        row = self.db.execute("SELECT parsed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.db.execute("UPDATE entries SET used = ? WHERE key = ?", (self.tick(), key))
+        self.written()
+        return {"title": title, **json.loads(row[0])}
+
+    def put(self, content: str, parsed: dict) -> None:
+        """Store a parse_wikitext result for `content`."""
+        value = json.dumps({k: v for k, v in parsed.items() if k != "title"}, ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        key = cache_key(content, self.version)
+        old = self.db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (key, value, size, self.tick()))
+        self.size += size - (old[0] if old else 0)
+        self.evict()
+        self.written()
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        while self.size > self.max_bytes:
+            victims = self.db.execute(
+                "SELECT key, size FROM entries ORDER BY used LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            for key, size in victims:
+                if self.size <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.size -= size
+
+    def written(self) -> None:
+        self.uncommitted += 1
+        if self.uncommitted >= COMMIT_EVERY:
+            self.db.commit()
+            self.uncommitted = 0
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
@@ -0,0 +1,101 @@
+"""
+Parse stage of the scraper pipeline.
+Fetch loops hand raw wikitext to a ParseStage and go straight back to the
+network while a pool of worker processes parses it. Results come back to
+the caller's callbacks in submission order, so the dataset and journal are
+written in the same order as with inline parsing. At most `max_pending`
+pages are queued; past that, submitting waits for the oldest one, so a
+slow parser pushes back on the fetchers instead of buffering the wiki.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+PENDING_PER_WORKER = 16  # Queued pages per worker before fetchers wait
+
+
+class ParseStage:
+    """Ordered, bounded queue in front of a ProcessPoolExecutor.
+
+    With `workers` <= 1 there is no pool: every job runs inline as it is
+    submitted and its callback fires immediately, exactly like calling the
+    parser in the fetch loop.
+    """
+
+    def __init__(self, workers: int = 0, max_pending: int | None = None):
+        self.executor = ProcessPoolExecutor(workers) if workers > 1 else None
+        self.max_pending = max_pending or max(workers, 1) * PENDING_PER_WORKER
+        self.pending = deque()  # (future | None, on_done, on_error); None marks an after() callback
+
+    def __enter__(self) -> "ParseStage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        elif self.executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    def submit(self, fn, args: tuple, on_done, on_error) -> None:
+        """Run `fn(*args)`; `on_done(result)` or `on_error(exception)` fires in order.
+
+        `fn` runs in a worker process, so it and its arguments must be
+        picklable. Callbacks run in this process; an exception raised by
+        `on_done` is passed to `on_error` as well.
+        """
+        if self.executor is None:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self.executor.submit(fn, *args)
+        self.pending.append((future, on_done, on_error))
+        self.deliver()
+        while len(self.pending) > self.max_pending:
+            self.pending[0][0].exception()  # Backpressure: wait for the oldest job
+            self.deliver()
+
+    def resolved(self, result, on_done, on_error) -> None:
+        """Queue an already known result (e.g. a cache hit) in order with the jobs."""
+        future = Future()
+        future.set_result(result)
+        self.pending.append((future, on_done, on_error))
+        self.deliver()
+
+    def after(self, callback) -> None:
+        """Call `callback()` once every job submitted so far has been delivered."""
+        self.pending.append((None, callback, None))
+        self.deliver()
+
+    async def make_room(self, count: int) -> None:
+        """Wait, without blocking the event loop, until `count` more jobs fit."""
+        while self.pending and len(self.pending) + count > self.max_pending:
+            await asyncio.wait([asyncio.wrap_future(self.pending[0][0])])
+            self.deliver()
+
+    def deliver(self) -> None:
+        """Fire callbacks for the finished jobs at the head of the queue."""
+        while self.pending:
+            future, on_done, on_error = self.pending[0]
+            if future is not None and not future.done():
+                return
+            self.pending.popleft()
+            if future is None:
+                on_done()
+                continue
+            try:
+                on_done(future.result())
+            except Exception as e:
+                on_error(e)
+
+    def close(self) -> None:
+        """Deliver everything still queued and shut the pool down."""
+        self.deliver()
+        while self.pending:
+            self.pending[0][0].exception()
+            self.deliver()
+        if self.executor:
+            self.executor.shutdown()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Data pipeline runner.
+Every stage of the data build - scrape, filter, extract, publish - is
+declared below with the files it reads and writes. A stage's fingerprint
+covers its command, its script and the local modules that script imports,
+and the content of its inputs; a stage runs again only when that
+fingerprint changed or one of its outputs is missing or was edited by
+hand. Editing extract_investigators.py therefore rebuilds
+investigators_detailed.json (and the published assets that include it)
+and nothing else.
+
+    python pipeline.py                      # bring every stale stage up to date
+    python pipeline.py --dry-run            # show what would run and why
+    python pipeline.py extract-ancient-ones # one stage, after any stale stages it depends on
+    python pipeline.py scrape-wiki          # scrape stages only run when named or with --sources
+
+Stages run in declaration order, which is a valid topological order: a
+stage depends on every earlier stage that writes one of its inputs, or
+that wrote one of its outputs first (extract-mysteries-research updates
+ancient_ones_detailed.json in place, so it re-runs whenever
+extract-ancient-ones does). Fingerprints are kept in
+pipeline_state.json next to this script. Each stage also writes its own
+run report to reports/ (see instrument.py).
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import instrument
+
+SCRIPTS_DIR = Path(__file__).parent
+ROOT = SCRIPTS_DIR.parent
+STATE_FILE = SCRIPTS_DIR / "pipeline_state.json"
+
+DATA = "app/public/eldritch_horror_data.json"
+FILTERED = "scripts/scraped_encounters_filtered"
+ENCOUNTER_PAGES = [
+    "general-encounter",
+    "combat-encounter",
+    "location-encounter",
+    "research-encounter",
+    "other-world-encounters",
+    "expedition-encounters",
+    "special-encounters",
+    "defeated",
+]
+
+# Paths are relative to the repository root; scripts run from scripts/.
+# "source" stages fetch from the wiki, so they only run when named or with
+# --sources; otherwise a missing or overwritten scrape output is only reported.
+STAGES = [
+    {
+        "name": "scrape-wiki",
+        "script": "scrape_eldritch.py",
+        "args": ["--output", "../" + DATA],
+        "inputs": ["scripts/category_rules.json"],
+        "outputs": [DATA],
+        "source": True,
+    },
+    {
+        "name": "scrape-encounters",
+        "script": "scrape_encounters.py",
+        "outputs": ["scripts/scraped_encounters"],
+        "source": True,
+    },
+    {
+        "name": "filter-encounters",
+        "script": "filter_encounters.py",
+        "inputs": ["scripts/scraped_encounters"],
+        "outputs": [f"{FILTERED}/{page}.json" for page in ENCOUNTER_PAGES] + [f"{FILTERED}/_filter_stats.json"],
+    },
+    {
+        "name": "scrape-other-world",
+        "script": "scrape_other_world_encounters.py",
+        "outputs": [f"{FILTERED}/other-world-encounters.json"],
+        "source": True,
+    },
+    {
+        "name": "scrape-research",
+        "script": "scrape_research_encounters.py",
+        "outputs": [f"{FILTERED}/research-encounter.json"],
+        "source": True,
+    },
+    {
+        "name": "extract-investigators",
+        "script": "extract_investigators.py",
+        "inputs": [DATA],
+        "outputs": ["app/public/investigators_detailed.json"],
+    },
+    {
+        "name": "extract-ancient-ones",
+        "script": "extract_ancient_ones.py",
+        "inputs": [DATA, "app/public/ancient_ones_meta.json"],
+        "outputs": ["app/public/ancient_ones_detailed.json"],
+    },
+    {
+        "name": "extract-mysteries-research",
+        "script": "extract_mysteries_research.py",
+        "inputs": [DATA, "app/public/ancient_ones_detailed.json"],
+        "outputs": ["app/public/ancient_ones_detailed.json"],
+    },
+    {
+        "name": "extract-mythos-cards",
+        "script": "extract_mythos_cards.py",
+        "args": ["../" + DATA, "../app/public/mythos_cards.json"],
+        "inputs": [DATA, "scripts/projection_profiles.json"],
+        "outputs": ["app/public/mythos_cards.json"],
+    },
+    {
+        "name": "filter-mythos-cards",
+        "script": "filter_mythos_cards.py",
+        "args": ["../app/public/mythos_cards.json", "../app/public/mythos_cards.json"],
+        "inputs": ["app/public/mythos_cards.json"],
+        "outputs": ["app/public/mythos_cards.json"],
+    },
+    {
+        "name": "publish-assets",
+        "script": "publish_assets.py",
+        "inputs": ["app/public"],
+        "outputs": ["app/public/data", "app/src/generated/asset-manifest.json"],
+    },
+]
+
+
+def overlaps(a: Path, b: Path) -> bool:
+    """Whether two paths name the same file or one contains the other."""
+    return a == b or a in b.parents or b in a.parents
+
+
+def local_imports(script: Path, seen: set[Path] | None = None) -> set[Path]:
+    """`script` plus every module from scripts/ it imports, transitively."""
+    seen = seen if seen is not None else set()
+    if script in seen or not script.exists():
+        return seen
+    seen.add(script)
+    for node in ast.walk(ast.parse(script.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_imports(SCRIPTS_DIR / f"{name.split('.')[0]}.py", seen)
+    return seen
+
+
+class Pipeline:
+    """The declared stages with their dependencies, and the recorded state of earlier runs."""
+
+    def __init__(self, stages: list[dict], state_file: Path = STATE_FILE):
+        self.stages = stages
+        self.by_name = {stage["name"]: stage for stage in stages}
+        self.state_file = state_file
+        if state_file.exists():
+            with open(state_file, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        else:
+            self.state = {"stages": {}, "hashes": {}}
+
+        self.code = {}  # stage name -> its script and the local modules it imports
+        self.upstream = {}  # stage name -> names of the stages it depends on
+        for i, stage in enumerate(stages):
+            self.code[stage["name"]] = sorted(
+                path.relative_to(ROOT).as_posix() for path in local_imports(SCRIPTS_DIR / stage["script"])
+            )
+            deps = set()
+            for earlier in stages[:i]:
+                writes = [ROOT / path for path in earlier["outputs"]]
+                reads = [ROOT / path for path in stage.get("inputs", [])]
+                rewrites = [ROOT / path for path in stage["outputs"]]
+                if any(overlaps(w, r) for w in writes for r in reads + rewrites):
+                    deps.add(earlier["name"])
+            self.upstream[stage["name"]] = deps
+            for path in stage.get("inputs", []):
+                later = [s["name"] for s in stages[i + 1:] if any(overlaps(ROOT / o, ROOT / path) for o in s["outputs"])
+                         and not any(overlaps(ROOT / o, ROOT / path) for o in stage["outputs"])]
+                if later:
+                    raise ValueError(f"Stage {stage['name']} reads {path}, which later stage {later[0]} writes")
+
+    def save(self) -> None:
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+
+    def file_hash(self, path: Path) -> str:
+        """SHA-256 of a file, reused from the state while its size and mtime are unchanged."""
+        stat = path.stat()
+        key = path.relative_to(ROOT).as_posix()
+        cached = self.state["hashes"].get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.state["hashes"][key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path_hash(self, path: str, exclude: list[str] = ()) -> str | None:
+        """Hash of a file, or of every file in a directory (minus `exclude`); None if it does not exist."""
+        full = ROOT / path
+        if full.is_file():
+            return self.file_hash(full)
+        if not full.is_dir():
+            return None
+        skip = [ROOT / other for other in exclude]
+        digest = hashlib.sha256()
+        for file in sorted(p for p in full.rglob("*") if p.is_file()):
+            if any(overlaps(s, file) for s in skip) or file.name.endswith(".pyc"):
+                continue
+            digest.update(f"{file.relative_to(full).as_posix()}\0{self.file_hash(file)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def writers(self, path: str) -> list[str]:
+        """Stages that write `path`, in run order."""
+        return [stage["name"] for stage in self.stages if any(overlaps(ROOT / o, ROOT / path) for o in stage["outputs"])]
+
+    def input_hashes(self, stage: dict) -> dict:
+        """What the stage's fingerprint covers: command, code and inputs, each with its hash.
+
+        A file the stage updates in place is taken as the previous writer
+        left it, not as the stage itself rewrote it.
+        """
+        hashes = {"command": hashlib.sha256(json.dumps([stage["script"], *stage.get("args", [])]).encode()).hexdigest()}
+        for path in self.code[stage["name"]]:
+            hashes[path] = self.path_hash(path)
+        for path in stage.get("inputs", []):
+            if path in stage["outputs"]:
+                writers = self.writers(path)
+                previous = writers[writers.index(stage["name"]) - 1] if writers.index(stage["name"]) else None
+                record = self.state["stages"].get(previous, {})
+                hashes[path] = record.get("outputs", {}).get(path)
+            else:
+                hashes[path] = self.path_hash(path, stage["outputs"])
+        return hashes
+
+    def output_hashes(self, stage: dict) -> dict:
+        return {path: self.path_hash(path) for path in stage["outputs"]}
+
+    def stale_reasons(self, stage: dict, ran: set[str], forced: bool) -> list[str]:
+        """Why the stage needs to run now, given the stages that already ran; empty if it is up to date."""
+        name = stage["name"]
+        record = self.state["stages"].get(name)
+        missing = [path for path in stage["outputs"] if not (ROOT / path).exists()]
+        if forced:
+            return ["requested"]
+
+        reasons = [f"missing {path}" for path in missing]
+        # A stage writing after an earlier writer of the same file must follow it
+        rewritten = set()
+        for path in stage["outputs"]:
+            writers = self.writers(path)
+            for writer in writers[:writers.index(name)]:
+                if writer in ran:
+                    reasons.append(f"{writer} rewrote {path}")
+                    rewritten.add(path)
+        if stage.get("source"):
+            return reasons
+        if record is None:
+            return ["never run by the pipeline"]
+        # Hand edits: the file no longer matches what its last writer left
+        for path in stage["outputs"]:
+            if path in missing or path in rewritten:
+                continue
+            last = self.writers(path)[-1]
+            expected = self.state["stages"].get(last, {}).get("outputs", {}).get(path)
+            if expected and self.path_hash(path) != expected:
+                reasons.append(f"{path} was modified outside the pipeline")
+        previous = record.get("inputs", {})
+        for key, value in self.input_hashes(stage).items():
+            if previous.get(key) != value:
+                reasons.append("command changed" if key == "command" else f"{key} changed")
+        return reasons
+
+    def plan(self, targets: list[str]) -> list[dict]:
+        """Targets and everything upstream of them (all stages when no targets), in run order."""
+        if not targets:
+            return list(self.stages)
+        wanted = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(self.upstream[name])
+        return [stage for stage in self.stages if stage["name"] in wanted]
+
+    def missing_inputs(self, stage: dict) -> list[str]:
+        return [path for path in stage.get("inputs", []) if not (ROOT / path).exists()]
+
+    def run_stage(self, stage: dict) -> bool:
+        command = [sys.executable, stage["script"], *stage.get("args", [])]
+        start = time.monotonic()
+        result = subprocess.run(command, cwd=SCRIPTS_DIR)
+        if result.returncode != 0:
+            print(f"❌ {stage['name']} failed (exit code {result.returncode})")
+            return False
+
+        # Hashes are taken after the run, so the outputs are recorded as this stage left them
+        self.state["stages"][stage["name"]] = {
+            "inputs": self.input_hashes(stage),
+            "outputs": self.output_hashes(stage),
+            "ranAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": round(time.monotonic() - start, 2),
+        }
+        self.save()
+        return True
+
+    def run(self, targets: list[str], force: bool = False, sources: bool = False, dry_run: bool = False) -> bool:
+        """Run every stale stage of the plan in order; False if a stage failed."""
+        ran, failed = set(), set()
+        for stage in self.plan(targets):
+            name = stage["name"]
+            forced = force and (not targets or name in targets)
+            reasons = self.stale_reasons(stage, ran, forced)
+            # Scrapes hit the wiki: they run when named or with --sources, never implicitly
+            fetch = sources or name in targets
+            if stage.get("source") and fetch and not reasons:
+                reasons = ["fetching"]
+            if dry_run:
+                # Upstream stages that would run may change this stage's inputs
+                if self.upstream[name] & ran:
+                    reasons.append(f"after {', '.join(sorted(self.upstream[name] & ran))}")
+            blocked = sorted(self.upstream[name] & failed)
+
+            if blocked:
+                print(f"⏭️  {name}: skipped, {', '.join(blocked)} failed")
+                failed.add(name)
+            elif not reasons:
+                print(f"✅ {name}: up to date")
+            elif stage.get("source") and not fetch:
+                print(f"⚠️  {name}: {'; '.join(reasons)} (name it or pass --sources to fetch)")
+            elif self.missing_inputs(stage) and not dry_run:
+                # Not a failure: downstream stages can still use the outputs already on disk
+                print(f"⚠️  {name}: cannot run, missing {', '.join(self.missing_inputs(stage))}")
+            elif dry_run:
+                print(f"🔸 {name}: would run ({'; '.join(reasons)})")
+                ran.add(name)
+            else:
+                print(f"▶️  {name}: {'; '.join(reasons)}")
+                if self.run_stage(stage):
+                    ran.add(name)
+                else:
+                    failed.add(name)
+        self.save()
+        return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data pipeline, rebuilding only stale stages.")
+    parser.add_argument("stages", nargs="*", help="stages to bring up to date, with their upstream stages (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="show which stages would run and why")
+    parser.add_argument("--force", action="store_true", help="run the named stages (or all) even if up to date")
+    parser.add_argument("--sources", action="store_true", help="also re-run the scrape stages")
+    parser.add_argument("--list", action="store_true", help="list the stages with their inputs and outputs")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="have every stage dump cProfile stats of its hot stages (see instrument.py)")
+    parser.add_argument("--trace-memory", action="store_true", help="have every stage trace allocations")
+    parser.add_argument("--time-functions", action="store_true",
+                        help="have every stage count calls and time of its @timed helpers")
+    args = parser.parse_args()
+    # Stages are separate processes; the switches reach them through the environment
+    if args.cprofile:
+        os.environ[instrument.CPROFILE_ENV] = "1"
+    if args.trace_memory:
+        os.environ[instrument.TRACEMALLOC_ENV] = "1"
+    if args.time_functions:
+        os.environ[instrument.TIME_FUNCTIONS_ENV] = "1"
+
+    pipeline = Pipeline(STAGES)
+    unknown = [name for name in args.stages if name not in pipeline.by_name]
+    if unknown:
+        parser.error(f"unknown stage(s) {', '.join(unknown)}; see --list")
+
+    if args.list:
+        for stage in STAGES:
+            deps = sorted(pipeline.upstream[stage["name"]])
+            print(f"{stage['name']}{' (source)' if stage.get('source') else ''}: {stage['script']}")
+            for path in stage.get("inputs", []):
+                print(f"    < {path}")
+            for path in stage["outputs"]:
+                print(f"    > {path}")
+            if deps:
+                print(f"    after {', '.join(deps)}")
+        return
+
+    print("🛠️  Data pipeline")
+    ok = pipeline.run(args.stages, args.force, args.sources, args.dry_run)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
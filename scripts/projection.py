@@ -0,0 +1,71 @@
+"""
+Field projection profiles for dataset entries.
+Every scraped entry carries several overlapping renderings of its page
+(rawWikitext, fullText, sections, infobox, cardData, links, templates).
+projection_profiles.json names profiles - "full", "extract", "app" - that
+list, per dataset category, which of them a consumer actually reads. A
+profile is applied when entries are written, so each output carries only
+what its readers need:
+
+    python scrape_eldritch.py --profile app
+"""
+
+import json
+from pathlib import Path
+
+from dataset_io import category_names
+
+PROFILES_FILE = Path(__file__).parent / "projection_profiles.json"
+DEFAULT_PROFILE = "full"
+
+# Fields build_entry produces; the first three identify and file an entry and are always kept
+KEY_FIELDS = ["title", "pageId", "categories"]
+ENTRY_FIELDS = KEY_FIELDS + ["infobox", "cardData", "sections", "links", "templates", "fullText", "rawWikitext"]
+
+
+def profile_names(path: Path = PROFILES_FILE) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return list(json.load(f)["profiles"])
+
+
+class Projection:
+    """One profile: project(entry, category) keeps the fields that category's readers use."""
+
+    def __init__(self, name: str, default: list[str] | str = "*", categories: dict | None = None):
+        self.name = name
+        known = set(category_names())
+        for category in categories or {}:
+            if category not in known and not any(leaf.startswith(category + ".") for leaf in known):
+                raise ValueError(f"Unknown dataset category {category!r} in projection profile {name!r}")
+
+        # Resolve every leaf category up front: exact name, then its parent, then the default
+        self.fields = {}
+        for leaf in known:
+            parent = leaf.partition(".")[0]
+            fields = (categories or {}).get(leaf, (categories or {}).get(parent, default))
+            if fields != "*":
+                unknown = set(fields) - set(ENTRY_FIELDS)
+                if unknown:
+                    raise ValueError(f"Unknown entry fields {sorted(unknown)} in projection profile {name!r}")
+                fields = KEY_FIELDS + [field for field in fields if field not in KEY_FIELDS]
+            self.fields[leaf] = fields
+
+    @classmethod
+    def load(cls, name: str = DEFAULT_PROFILE, path: Path = PROFILES_FILE) -> "Projection":
+        with open(path, "r", encoding="utf-8") as f:
+            profiles = json.load(f)["profiles"]
+        if name not in profiles:
+            raise ValueError(f"Unknown projection profile {name!r} (known: {', '.join(profiles)})")
+        profile = profiles[name]
+        return cls(name, profile.get("default", "*"), profile.get("categories"))
+
+    @property
+    def is_full(self) -> bool:
+        return all(fields == "*" for fields in self.fields.values())
+
+    def project(self, entry: dict, category: str) -> dict:
+        """`entry` cut down to the fields kept for `category`; the entry passed in is never modified."""
+        fields = self.fields[category]
+        if fields == "*":
+            return entry
+        return {field: entry[field] for field in fields if field in entry}
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "brotli",
+# ]
+# ///
+"""
+Publish the app's JSON data as immutable, precompressed assets.
+Every .json file under app/public (ancient_ones_detailed.json,
+encounters/defeated.json, eldritch_horror_data.shards/mythos.json, ...)
+is minified and written to app/public/data/ under a content-hashed name,
+e.g. data/ancient_ones_detailed.3f2a9c1b7e4d.json, with .gz and .br
+siblings for servers that serve precompressed files (nginx gzip_static /
+brotli_static and most static hosts). A changed file gets a new name, so
+data/ can be cached forever and no ?v= needs bumping by hand. The
+scraper's revision manifest and NDJSON sidecar index are skipped.
+
+app/src/generated/asset-manifest.json maps each original path to its
+published URL; the app resolves fetches through it (src/utils/assets.ts)
+and falls back to the plain files when nothing has been published.
+
+    python publish_assets.py            # after running the extract_*.py scripts
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+import brotli
+
+APP_DIR = Path(__file__).parent.parent / "app"
+PUBLIC_DIR = APP_DIR / "public"
+OUTPUT_DIR_NAME = "data"  # Under public/, so it is served at /data/
+MANIFEST_FILE = APP_DIR / "src" / "generated" / "asset-manifest.json"
+HASH_LENGTH = 12
+# Written next to the scraped dataset but never fetched by the app: the
+# revision manifest (scrape_eldritch.py) and the NDJSON sidecar index (dataset_io.py)
+BOOKKEEPING_SUFFIXES = (".manifest.json", ".index.json")
+
+
+def minify_json(path: Path) -> bytes:
+    """The file's JSON re-encoded without whitespace."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def hashed_name(path: Path, digest: str) -> str:
+    """ancient_ones_detailed.json -> ancient_ones_detailed.<hash>.json"""
+    return f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}"
+
+
+def source_files(public_dir: Path, output_dir: Path) -> list[Path]:
+    """Every JSON file the app can fetch, except earlier published output and scrape bookkeeping."""
+    return sorted(
+        path for path in public_dir.rglob("*.json")
+        if output_dir not in path.parents and not path.name.endswith(BOOKKEEPING_SUFFIXES)
+    )
+
+
+def publish_file(path: Path, public_dir: Path, output_dir: Path, brotli_quality: int) -> dict:
+    """Write one file's hashed, minified copy and its compressed siblings; return its manifest entry.
+
+    Content-addressed names make an existing copy current, so unchanged
+    files are not compressed again.
+    """
+    content = minify_json(path)
+    digest = hashlib.sha256(content).hexdigest()
+    relative = path.relative_to(public_dir)
+    target = output_dir / relative.parent / hashed_name(relative, digest)
+
+    gz_path = target.with_name(target.name + ".gz")
+    br_path = target.with_name(target.name + ".br")
+    if not (target.exists() and gz_path.exists() and br_path.exists()):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        # mtime=0 keeps the .gz bytes a pure function of the content
+        gz_path.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        br_path.write_bytes(brotli.compress(content, mode=brotli.MODE_TEXT, quality=brotli_quality))
+
+    return {
+        "url": "/" + target.relative_to(public_dir).as_posix(),
+        "sha256": digest,
+        "bytes": path.stat().st_size,
+        "minifiedBytes": len(content),
+        "gzipBytes": gz_path.stat().st_size,
+        "brotliBytes": br_path.stat().st_size,
+    }
+
+
+def remove_stale(output_dir: Path, keep: set[Path]) -> int:
+    """Delete published files no longer in the manifest; returns how many went."""
+    removed = 0
+    for path in output_dir.rglob("*"):
+        if path.is_file() and path not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def publish_assets(public_dir: Path, manifest_file: Path, brotli_quality: int = 11, keep_stale: bool = False) -> dict:
+    output_dir = public_dir / OUTPUT_DIR_NAME
+    assets = {}
+    for path in source_files(public_dir, output_dir):
+        key = "/" + path.relative_to(public_dir).as_posix()
+        print(f"   {key[:60]:<60}", end="\r")
+        try:
+            assets[key] = publish_file(path, public_dir, output_dir, brotli_quality)
+        except json.JSONDecodeError as e:
+            print(f"\n⚠️  Skipping {key}: invalid JSON ({e})")
+    print(f"   {'':<60}", end="\r")
+
+    manifest = {"generatedAt": datetime.now().isoformat(), "assets": assets}
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    if not keep_stale and output_dir.exists():
+        keep = set()
+        for asset in assets.values():
+            published = public_dir / asset["url"].lstrip("/")
+            keep.update({published, published.with_name(published.name + ".gz"),
+                         published.with_name(published.name + ".br")})
+        removed = remove_stale(output_dir, keep)
+        if removed:
+            print(f"🧹 Removed {removed} stale published files")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify, hash and precompress the app's JSON data.")
+    parser.add_argument("--public", type=Path, default=PUBLIC_DIR, help="app public directory")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST_FILE, help="manifest the app imports")
+    parser.add_argument(
+        "--brotli-quality",
+        type=int,
+        default=11,
+        choices=range(0, 12),
+        metavar="0-11",
+        help="brotli quality for newly published files (default: 11, slowest and smallest)",
+    )
+    parser.add_argument(
+        "--keep-stale",
+        action="store_true",
+        help="keep previously published files, e.g. while old clients may still request them",
+    )
+    args = parser.parse_args()
+
+    print(f"📦 Publishing JSON from {args.public}...")
+    manifest = publish_assets(args.public, args.manifest, args.brotli_quality, args.keep_stale)
+    assets = manifest["assets"].values()
+
+    original = sum(asset["bytes"] for asset in assets)
+    minified = sum(asset["minifiedBytes"] for asset in assets)
+    gzipped = sum(asset["gzipBytes"] for asset in assets)
+    brotlied = sum(asset["brotliBytes"] for asset in assets)
+    print(f"✅ Published {len(manifest['assets'])} files to {args.public / OUTPUT_DIR_NAME}")
+    print(f"   original {original / 1024:.0f} KB, minified {minified / 1024:.0f} KB, "
+          f"gzip {gzipped / 1024:.0f} KB, brotli {brotlied / 1024:.0f} KB "
+          f"({original / max(brotlied, 1):.1f}x smaller)")
+    print(f"🗺️  Manifest: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
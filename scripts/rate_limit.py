@@ -0,0 +1,88 @@
+"""
+Rate limiting for the wiki scrapers.
+A token bucket keeps the overall request rate under the server's budget
+while still letting several requests be in flight at once.
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token-bucket limiter.
+
+    Tokens refill continuously at `rate` per second and up to `burst` can be
+    banked, so short bursts go out immediately while the long-run rate never
+    exceeds `rate`. Shared by every task making requests.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self.lock:
+            while True:
+                self.refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveThrottle:
+    """Request rate that follows the server's response latency.
+
+    Latency is smoothed with an EWMA and compared against the best smoothed
+    latency seen so far. While the server answers near that baseline the
+    rate creeps up (additive increase); once latency climbs well above it,
+    or the server pushes back with 429/503/maxlag, the rate is cut
+    (multiplicative decrease). The rate stays within [min_rate, max_rate].
+    """
+
+    SMOOTHING = 0.2  # EWMA weight of the newest sample
+    SLOW_FACTOR = 2.0  # Latency this many times the baseline means back off
+    FAST_FACTOR = 1.25  # Latency within this factor of the baseline means speed up
+    INCREASE = 0.05  # Fraction of max_rate added per fast response
+    DECREASE = 0.7  # Rate multiplier when latency rises
+    PENALTY = 0.5  # Rate multiplier when the server pushes back
+
+    def __init__(self, rate: float, min_rate: float | None = None, max_rate: float | None = None):
+        self.max_rate = max_rate or rate
+        self.min_rate = min(min_rate or rate / 10, rate)
+        self.rate = rate
+        self.latency = None
+        self.baseline = None
+
+    def observe(self, latency: float) -> None:
+        """Feed the duration of a successful request."""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.SMOOTHING * (latency - self.latency)
+        
+        if self.baseline is None or self.latency < self.baseline:
+            self.baseline = self.latency
+        
+        if self.latency > self.baseline * self.SLOW_FACTOR:
+            self.rate = max(self.min_rate, self.rate * self.DECREASE)
+            # Let the baseline drift up so a permanently slower server is not punished forever
+            self.baseline *= 1.05
+        elif self.latency < self.baseline * self.FAST_FACTOR:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.INCREASE)
+
+    def penalize(self) -> None:
+        """The server asked us to slow down."""
+        self.rate = max(self.min_rate, self.rate * self.PENALTY)
@@ -10,21 +10,47 @@ The Necronomicon Compiler
 Scrapes the entire Eldritch Horror Wiki into a single JSON file.
 """
 
+import argparse
+import asyncio
+import hashlib
 import json
-import re
-import time
+import sys
 from datetime import datetime
 from pathlib import Path
 
 import httpx
 
+import instrument
+from wiki_http import AsyncWikiClient, WikiClient
+from category_rules import RULES_FILE, CategoryRules
+from corpus import SqliteDatasetWriter, corpus_path
+from dataset_io import JsonDatasetWriter, NdjsonDatasetWriter, assemble_json, file_entry, new_dataset
+from parse_cache import DEFAULT_MAX_MB, ParseCache, parse_cache_path
+from parse_stage import ParseStage
+from projection import DEFAULT_PROFILE, Projection, profile_names
+from scrape_journal import ScrapeJournal, journal_path, read_journal
+from shards import ShardedDatasetWriter, shard_dir
+from wikitext import parse_wikitext
+
 BASE_URL = "https://eldritchhorror.fandom.com"
 API_ENDPOINT = f"{BASE_URL}/api.php"
 DELAY_SECONDS = 0.5  # Be nice to the server
+MAX_RATE = 4.0  # Ceiling the adaptive throttle may speed up to (requests/sec)
 BATCH_SIZE = 50
 
+# Async engine defaults: same average rate as DELAY_SECONDS, but overlapping requests
+ASYNC_CONCURRENCY = 4
+ASYNC_RATE = 1 / DELAY_SECONDS  # Requests per second
+ASYNC_BURST = 4
+
+OUTPUT_FILE = Path("eldritch_horror_data.json")
+INFO_BATCH_SIZE = 500  # prop=info carries no content, so the API allows larger batches
+
+CATEGORY_RULES = CategoryRules.load(RULES_FILE)  # Replaced by --category-rules
+PROJECTION = Projection.load(DEFAULT_PROFILE)  # Replaced by --profile
+
 
-def fetch_all_page_titles(client: httpx.Client) -> list[dict]:
+def fetch_all_page_titles(client: WikiClient, skip_redirects: bool = False) -> list[dict]:
     """Fetch all page titles from the wiki using pagination."""
     all_pages = []
     continue_token = ""
@@ -39,6 +65,8 @@ def fetch_all_page_titles(client: httpx.Client) -> list[dict]:
             "apnamespace": 0,
             "format": "json",
         }
+        if skip_redirects:
+            params["apfilterredir"] = "nonredirects"
         if continue_token:
             params["apcontinue"] = continue_token
         
@@ -54,7 +82,6 @@ def fetch_all_page_titles(client: httpx.Client) -> list[dict]:
         continue_data = data.get("continue", {})
         if "apcontinue" in continue_data:
             continue_token = continue_data["apcontinue"]
-            time.sleep(DELAY_SECONDS)
         else:
             break
     
@@ -62,13 +89,34 @@ def fetch_all_page_titles(client: httpx.Client) -> list[dict]:
     return all_pages
 
 
-def fetch_page_content(client: httpx.Client, title: str) -> dict:
+def extract_page_record(page_data: dict) -> dict:
+    """Pull wikitext content, revision id and category names out of an API page object."""
+    # Extract content
+    content = ""
+    revid = None
+    revisions = page_data.get("revisions", [])
+    if revisions:
+        slots = revisions[0].get("slots", {})
+        content = slots.get("main", {}).get("*", "") or revisions[0].get("*", "")
+        revid = revisions[0].get("revid")
+    
+    # Extract categories
+    categories = [
+        cat["title"].replace("Category:", "")
+        for cat in page_data.get("categories", [])
+    ]
+    
+    return {"content": content, "revid": revid, "categories": categories}
+
+
+def fetch_page_content(client: WikiClient, title: str) -> dict:
     """Fetch full content and categories for a single page."""
     params = {
         "action": "query",
         "prop": "revisions|categories",
-        "rvprop": "content",
+        "rvprop": "ids|content",
         "rvslots": "main",
+        "cllimit": "max",
         "titles": title,
         "format": "json",
     }
@@ -79,311 +127,929 @@ def fetch_page_content(client: httpx.Client, title: str) -> dict:
     pages = data.get("query", {}).get("pages", {})
     page_data = list(pages.values())[0] if pages else {}
     
-    # Extract content
-    content = ""
-    revisions = page_data.get("revisions", [])
-    if revisions:
-        slots = revisions[0].get("slots", {})
-        content = slots.get("main", {}).get("*", "") or revisions[0].get("*", "")
+    return extract_page_record(page_data)
+
+
+def query_with_continue(client: WikiClient, params: dict, continue_params: dict | None = None):
+    """Run an API query, following `continue` until the result set is complete.
+
+    Yields each raw JSON response in order. Pass `continue_params` to pick up
+    a query where an earlier run stopped.
+    """
+    continue_params = continue_params or {}
     
-    # Extract categories
-    categories = [
-        cat["title"].replace("Category:", "")
-        for cat in page_data.get("categories", [])
-    ]
+    while True:
+        response = client.get(API_ENDPOINT, params={**params, **continue_params})
+        data = response.json()
+        yield data
+        
+        continue_params = data.get("continue", {})
+        if not continue_params:
+            break
+
+
+def merge_query_pages(merged: dict, data: dict) -> None:
+    """Merge the `pages` of one (possibly partial) API response into `merged`.
+
+    Continued responses repeat the same page ids with the next slice of
+    categories or revisions, so pages are keyed by page id and accumulated.
+    """
+    for page in data.get("query", {}).get("pages", {}).values():
+        if "pageid" not in page:
+            continue  # Missing or invalid title
+        
+        page_data = merged.setdefault(page["pageid"], {
+            "pageid": page["pageid"],
+            "title": page.get("title", ""),
+            "revisions": [],
+            "categories": [],
+        })
+        if page.get("revisions") and not page_data["revisions"]:
+            page_data["revisions"] = page["revisions"]
+        page_data["categories"].extend(page.get("categories", []))
+
+
+def fetch_pages_content(client: WikiClient, titles: list[str]) -> dict[int, dict]:
+    """Fetch content and categories for up to BATCH_SIZE pages in one query.
+
+    Returns records keyed by page id, in the same shape as fetch_page_content.
+    """
+    params = {
+        "action": "query",
+        "prop": "revisions|categories",
+        "rvprop": "ids|content",
+        "rvslots": "main",
+        "cllimit": "max",
+        "titles": "|".join(titles),
+        "format": "json",
+    }
+    
+    merged = {}
+    for data in query_with_continue(client, params):
+        merge_query_pages(merged, data)
     
-    return {"content": content, "categories": categories}
+    return {page_id: extract_page_record(page_data) for page_id, page_data in merged.items()}
 
 
-def parse_wikitext(content: str, title: str) -> dict:
-    """Parse wikitext content to extract structured data."""
-    parsed = {
-        "title": title,
-        "infobox": {},
-        "sections": {},  # Now a dict with section name -> content
-        "links": [],
-        "templates": [],
-        "fullText": "",  # Full cleaned text, no truncation
-        "cardData": {},  # Specific card fields
+def crawl_all_pages(client: WikiClient, skip_redirects: bool = False, continue_params: dict | None = None):
+    """List and fetch every page in one pass with generator=allpages.
+
+    Each generator batch returns titles together with their wikitext,
+    categories and revision info. Yields `(pages, continue_params)` once a
+    batch is complete, where `pages` are records in allpages order and
+    `continue_params` resumes the crawl at the next batch.
+    """
+    params = {
+        "action": "query",
+        "generator": "allpages",
+        "gapnamespace": 0,
+        "gaplimit": BATCH_SIZE,
+        "prop": "revisions|categories|info",
+        "rvprop": "ids|content",
+        "rvslots": "main",
+        "cllimit": "max",
+        "format": "json",
     }
+    if skip_redirects:
+        params["gapfilterredir"] = "nonredirects"
     
-    # Extract ALL template parameters (not just infobox)
-    # This catches card effects, tests, flavor text etc.
-    for template_match in re.finditer(r"\{\{([^}]+)\}\}", content, re.DOTALL):
-        template_content = template_match.group(1)
-        for match in re.finditer(r"\|\s*([^=\n]+)\s*=\s*([^|\n][^|]*?)(?=\||\}\}|$)", template_content, re.DOTALL):
-            key = match.group(1).strip().lower()
-            value = match.group(2).strip()
-            # Clean wiki markup from values
-            value = re.sub(r"\[\[([^|\]]+)\|([^\]]+)\]\]", r"\2", value)
-            value = re.sub(r"\[\[([^\]]+)\]\]", r"\1", value)
-            value = re.sub(r"'''([^']+)'''", r"\1", value)
-            value = re.sub(r"''([^']+)''", r"\1", value)
-            
-            if value:  # Only add non-empty values
-                # Common card fields
-                if key in ("effect", "action", "text", "description", "flavor", 
-                          "lore", "pass", "fail", "test", "initial", "reckoning",
-                          "cost", "toughness", "horror", "damage", "spawn",
-                          "trait", "type", "expansion", "set"):
-                    parsed["cardData"][key] = value
-                parsed["infobox"][key] = value
-    
-    # Extract sections WITH their content
-    section_pattern = r"(==+)\s*([^=]+)\s*\1\s*\n(.*?)(?=\n==|\Z)"
-    for match in re.finditer(section_pattern, content, re.DOTALL):
-        section_name = match.group(2).strip()
-        section_content = match.group(3).strip()
-        # Clean the section content
-        section_content = re.sub(r"\[\[([^|\]]+)\|([^\]]+)\]\]", r"\2", section_content)
-        section_content = re.sub(r"\[\[([^\]]+)\]\]", r"\1", section_content)
-        section_content = re.sub(r"\{\{[^}]+\}\}", "", section_content)
-        section_content = re.sub(r"<[^>]+>", "", section_content)
-        if section_content:
-            parsed["sections"][section_name] = section_content
-    
-    # Extract wiki links (excluding files and categories)
-    for match in re.finditer(r"\[\[([^\]|]+)(?:\|[^\]]*)?]]", content):
-        link = match.group(1).strip()
-        if not link.startswith(("File:", "Category:", "Image:")):
-            parsed["links"].append(link)
-    
-    # Extract template names
-    for match in re.finditer(r"\{\{([^}|]+)", content):
-        template = match.group(1).strip()
-        if not template.startswith("#") and len(template) < 50:
-            parsed["templates"].append(template)
-    
-    # Create FULL clean text version (no truncation!)
-    clean = content
-    clean = re.sub(r"\{\{[^}]+\}\}", "", clean)  # Remove templates
-    clean = re.sub(r"\[\[File:[^\]]+\]\]", "", clean)  # Remove files
-    clean = re.sub(r"\[\[Category:[^\]]+\]\]", "", clean)  # Remove categories
-    clean = re.sub(r"\[\[([^|\]]+)\|([^\]]+)\]\]", r"\2", clean)  # [[link|text]] -> text
-    clean = re.sub(r"\[\[([^\]]+)\]\]", r"\1", clean)  # [[link]] -> link
-    clean = re.sub(r"'''([^']+)'''", r"\1", clean)  # Bold
-    clean = re.sub(r"''([^']+)''", r"\1", clean)  # Italic
-    clean = re.sub(r"==+\s*([^=]+)\s*==+", r"\n[\1]\n", clean)  # Headers -> [Header]
-    clean = re.sub(r"<[^>]+>", "", clean)  # HTML tags
-    clean = re.sub(r"\n{3,}", "\n\n", clean)  # Multiple newlines
-    parsed["fullText"] = clean.strip()
-    
-    return parsed
+    merged = {}
+    for data in query_with_continue(client, params, continue_params):
+        merge_query_pages(merged, data)
+        
+        # Category/revision continuations repeat the same generator batch;
+        # `batchcomplete` marks the point where every page in it is whole
+        if "batchcomplete" not in data:
+            continue
+        
+        pages = sorted(merged.values(), key=lambda page: page["title"].replace(" ", "_"))
+        yield (
+            [{"pageid": page["pageid"], "title": page["title"], **extract_page_record(page)} for page in pages],
+            data.get("continue", {}),
+        )
+        merged = {}
 
 
+async def query_with_continue_async(client: AsyncWikiClient, params: dict):
+    """Async query_with_continue."""
+    continue_params = {}
+    
+    while True:
+        response = await client.get(API_ENDPOINT, params={**params, **continue_params})
+        data = response.json()
+        yield data
+        
+        continue_params = data.get("continue", {})
+        if not continue_params:
+            break
+
+
+async def fetch_all_page_titles_async(
+    client: AsyncWikiClient, skip_redirects: bool = False
+) -> list[dict]:
+    """Async fetch_all_page_titles."""
+    all_pages = []
+    params = {
+        "action": "query",
+        "list": "allpages",
+        "aplimit": BATCH_SIZE,
+        "apnamespace": 0,
+        "format": "json",
+    }
+    if skip_redirects:
+        params["apfilterredir"] = "nonredirects"
+    
+    print("📜 Fetching page list...")
+    
+    async for data in query_with_continue_async(client, params):
+        all_pages.extend(data.get("query", {}).get("allpages", []))
+        print(f"   Fetched {len(all_pages)} pages...", end="\r")
+    
+    print(f"✅ Found {len(all_pages)} total pages        ")
+    return all_pages
+
+
+async def fetch_page_content_async(client: AsyncWikiClient, title: str) -> dict:
+    """Async fetch_page_content."""
+    params = {
+        "action": "query",
+        "prop": "revisions|categories",
+        "rvprop": "ids|content",
+        "rvslots": "main",
+        "cllimit": "max",
+        "titles": title,
+        "format": "json",
+    }
+    
+    response = await client.get(API_ENDPOINT, params=params)
+    data = response.json()
+    
+    pages = data.get("query", {}).get("pages", {})
+    page_data = list(pages.values())[0] if pages else {}
+    
+    return extract_page_record(page_data)
+
+
+async def fetch_pages_content_async(
+    client: AsyncWikiClient, titles: list[str]
+) -> dict[int, dict]:
+    """Async fetch_pages_content."""
+    params = {
+        "action": "query",
+        "prop": "revisions|categories",
+        "rvprop": "ids|content",
+        "rvslots": "main",
+        "cllimit": "max",
+        "titles": "|".join(titles),
+        "format": "json",
+    }
+    
+    merged = {}
+    async for data in query_with_continue_async(client, params):
+        merge_query_pages(merged, data)
+    
+    return {page_id: extract_page_record(page_data) for page_id, page_data in merged.items()}
+
+
+@instrument.timed
 def categorize_page(categories: list[str], title: str) -> str:
     """Determine the category for a page based on its wiki categories."""
-    lower_cats = [c.lower() for c in categories]
-    
-    # Check in order of specificity
-    if any("investigator" in c for c in lower_cats):
-        return "investigators"
-    if any("ancient one" in c for c in lower_cats):
-        return "ancientOnes"
-    if any("epic monster" in c for c in lower_cats):
-        return "epicMonsters"
-    if any("monster" in c for c in lower_cats):
-        return "monsters"
-    if any("unique asset" in c for c in lower_cats):
-        return "uniqueAssets"
-    if any("artifact" in c for c in lower_cats):
-        return "artifacts"
-    if any("spell" in c for c in lower_cats):
-        return "spells"
-    if any("condition" in c for c in lower_cats):
-        return "conditions"
-    if any("asset" in c for c in lower_cats):
-        return "assets"
-    if any("myster" in c for c in lower_cats):
-        return "mysteries"
-    if any("prelude" in c for c in lower_cats):
-        return "preludes"
-    if any("adventure" in c for c in lower_cats):
-        return "adventures"
-    if any("personal stor" in c for c in lower_cats):
-        return "personalStories"
-    if any("mythos" in c for c in lower_cats):
-        return "mythos"
-    
-    # Encounter types
-    if any("general encounter" in c for c in lower_cats):
-        return "encounters.general"
-    if any("location encounter" in c for c in lower_cats):
-        return "encounters.location"
-    if any("research encounter" in c for c in lower_cats):
-        return "encounters.research"
-    if any("other world" in c for c in lower_cats):
-        return "encounters.otherWorld"
-    if any("expedition" in c for c in lower_cats):
-        return "encounters.expedition"
-    if any("mystic ruins" in c for c in lower_cats):
-        return "encounters.mysticRuins"
-    if any("dream-quest" in c or "dreamquest" in c for c in lower_cats):
-        return "encounters.dreamQuest"
-    if any("devastation" in c for c in lower_cats):
-        return "encounters.devastation"
-    if any("special encounter" in c for c in lower_cats):
-        return "encounters.special"
-    if any("combat" in c for c in lower_cats):
-        return "encounters.combat"
-    if any("encounter" in c for c in lower_cats):
-        return "encounters.other"
-    
-    # Game components
-    if any("expansion" in c or "game set" in c for c in lower_cats):
-        return "gameSets"
-    if any("board" in c or "location" in c or "space" in c for c in lower_cats):
-        return "gameBoards"
-    if any("mechanic" in c or "rule" in c or "action" in c or "phase" in c for c in lower_cats):
-        return "mechanics"
-    
-    return "other"
-
-
-def main():
-    print("=" * 50)
-    print("🐙 THE NECRONOMICON COMPILER")
-    print("   Eldritch Horror Wiki Scraper")
-    print("=" * 50)
-    print()
+    return CATEGORY_RULES.classify(categories)
+
+
+def build_entry(title: str, page_id: int, page_data: dict, parsed: dict | None = None) -> dict:
+    """Build a fetched page's dataset entry, parsing it unless `parsed` is given."""
+    if parsed is None:
+        parsed = parse_wikitext(page_data["content"], title)
     
-    # Initialize data structure
-    data = {
-        "metadata": {
+    return {
+        "title": title,
+        "pageId": page_id,
+        "categories": page_data["categories"],
+        "infobox": parsed["infobox"],
+        "cardData": parsed["cardData"],  # Specific card fields (effect, test, pass, fail, etc)
+        "sections": parsed["sections"],  # Section name -> content
+        "links": parsed["links"],
+        "templates": parsed["templates"],
+        "fullText": parsed["fullText"],  # Complete cleaned text
+        "rawWikitext": page_data["content"],
+    }
+
+
+def add_entry(writer, entry: dict) -> None:
+    """Categorize an entry and hand it to the dataset writer, projected to the active profile."""
+    category = categorize_page(entry["categories"], entry["title"])
+    writer.add(PROJECTION.project(entry, category), category)
+    instrument.count(items=1)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def manifest_path(output_path: Path) -> Path:
+    """The manifest lives next to the output: eldritch_horror_data.manifest.json."""
+    return output_path.with_suffix(".manifest.json")
+
+
+def record_page(manifest: dict, page_id: int, title: str, page_data: dict) -> None:
+    """Remember which revision of a page the dataset was built from."""
+    manifest[str(page_id)] = {
+        "title": title,
+        "lastrevid": page_data.get("revid"),
+        "sha1": content_hash(page_data["content"]),
+    }
+
+
+def load_manifest(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["pages"]
+
+
+def save_manifest(manifest: dict, path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
             "source": BASE_URL,
-            "scrapedAt": datetime.now().isoformat(),
-            "version": "1.0",
-            "totalPages": 0,
-        },
-        "categories": {
-            "investigators": [],
-            "ancientOnes": [],
-            "monsters": [],
-            "epicMonsters": [],
-            "assets": [],
-            "uniqueAssets": [],
-            "artifacts": [],
-            "spells": [],
-            "conditions": [],
-            "encounters": {
-                "general": [],
-                "location": [],
-                "research": [],
-                "otherWorld": [],
-                "expedition": [],
-                "mysticRuins": [],
-                "dreamQuest": [],
-                "devastation": [],
-                "special": [],
-                "combat": [],
-                "other": [],
-            },
-            "mythos": [],
-            "mysteries": [],
-            "preludes": [],
-            "adventures": [],
-            "personalStories": [],
-            "gameSets": [],
-            "gameBoards": [],
-            "mechanics": [],
-            "other": [],
-        },
-        "allPages": {},
+            "generatedAt": datetime.now().isoformat(),
+            "pages": manifest,
+        }, f, indent=2, ensure_ascii=False)
+
+
+def fetch_page_revisions(client: WikiClient, skip_redirects: bool = False) -> list[dict]:
+    """Sweep the wiki for every page's current revision id (no content)."""
+    params = {
+        "action": "query",
+        "generator": "allpages",
+        "gapnamespace": 0,
+        "gaplimit": INFO_BATCH_SIZE,
+        "prop": "info",
+        "format": "json",
     }
+    if skip_redirects:
+        params["gapfilterredir"] = "nonredirects"
+    
+    merged = {}
+    for data in query_with_continue(client, params):
+        for page in data.get("query", {}).get("pages", {}).values():
+            if "pageid" in page:
+                merged[page["pageid"]] = {
+                    "pageid": page["pageid"],
+                    "title": page["title"],
+                    "lastrevid": page.get("lastrevid"),
+                }
+        print(f"   Checked {len(merged)} pages...", end="\r")
+    
+    # Same order as list=allpages, so patched output matches a full crawl
+    return sorted(merged.values(), key=lambda page: page["title"].replace(" ", "_"))
+
+
+def diff_revisions(manifest: dict, pages: list[dict]) -> tuple[list[dict], list[dict], list[str]]:
+    """Split the sweep into new pages, changed pages and deleted page ids."""
+    new, changed = [], []
+    for page in pages:
+        known = manifest.get(str(page["pageid"]))
+        if known is None:
+            new.append(page)
+        elif known["lastrevid"] != page["lastrevid"] or known["title"] != page["title"]:
+            changed.append(page)
+    
+    live_ids = {str(page["pageid"]) for page in pages}
+    deleted = [page_id for page_id in manifest if page_id not in live_ids]
+    
+    return new, changed, deleted
+
+
+def rebuild_categories(data: dict, pages: list[dict]) -> None:
+    """Re-file every entry from allPages into fresh category lists, in page-list order."""
+    entries = data["allPages"]
+    rebuilt = new_dataset(BASE_URL)
+    rebuilt["metadata"] = data["metadata"]
+    
+    for page in pages:
+        entry = entries.get(page["title"])
+        if entry is not None:
+            file_entry(rebuilt, entry, categorize_page(entry["categories"], entry["title"]))
+    
+    data["categories"] = rebuilt["categories"]
+    data["allPages"] = rebuilt["allPages"]
+
+
+def scrape_incremental(
+    writer: JsonDatasetWriter, manifest: dict, cache: ParseCache | None, args: argparse.Namespace
+) -> list[str]:
+    """Refetch only pages whose revision changed since the manifest was written.
+
+    Patches the loaded dataset and `manifest` in place: changed and new
+    pages are refetched in batches, deleted pages are dropped. A page whose
+    refetch fails keeps its old entry and manifest revision, so the next
+    run retries it. Returns the titles that could not be refreshed.
+    """
+    data = writer.data
+    with WikiClient(rate=1 / DELAY_SECONDS, max_rate=args.max_rate) as client, ParseStage(args.workers) as stage:
+        print("🔎 Checking page revisions...")
+        pages = fetch_page_revisions(client, args.skip_redirects)
+        
+        new, changed, deleted = diff_revisions(manifest, pages)
+        print(f"✅ {len(pages)} pages: {len(new)} new, {len(changed)} changed, {len(deleted)} deleted")
+        
+        for page_id in deleted:
+            data["allPages"].pop(manifest.pop(page_id)["title"], None)
+        
+        # Changed pages keep their entries until the replacement is parsed
+        previous = {str(page["pageid"]): manifest[str(page["pageid"])] for page in changed}
+        
+        stale = new + changed
+        if stale:
+            print()
+            print("📖 Fetching changed pages...")
+        
+        for start in range(0, len(stale), BATCH_SIZE):
+            batch = stale[start:start + BATCH_SIZE]
+            
+            print(f"   [{start + len(batch)}/{len(stale)}] {batch[-1]['title'][:50]}...", end="\r")
+            
+            try:
+                records = fetch_pages_content(client, [page["title"] for page in batch])
+            except Exception as e:
+                print(f"\n⚠️  Error fetching batch at {batch[0]['title']}: {e}")
+                continue
+            
+            add_batch(stage, cache, writer, manifest, None, batch, records)
+    
+    # record_page replaces a page's manifest record once its new entry is in
+    failed = [page["title"] for page in new if str(page["pageid"]) not in manifest]
+    listed = []
+    for page in pages:
+        old = previous.get(str(page["pageid"]))
+        if old is None:
+            listed.append(page)
+        elif manifest[str(page["pageid"])] is old:
+            failed.append(page["title"])
+            listed.append({**page, "title": old["title"]})  # Still filed under its old title
+        else:
+            listed.append(page)
+            moved_from = data["allPages"].get(old["title"])
+            if old["title"] != page["title"] and moved_from and moved_from["pageId"] == page["pageid"]:
+                del data["allPages"][old["title"]]
+    
+    rebuild_categories(data, listed)
+    data["metadata"]["refreshedAt"] = datetime.now().isoformat()
+    return failed
+
+
+def reparse_dataset(writer: JsonDatasetWriter, cache: ParseCache | None, args: argparse.Namespace) -> None:
+    """Re-derive every entry's parsed fields from its stored rawWikitext.
+
+    Nothing is fetched. With the parse cache, only pages whose wikitext or
+    parser version changed since they were cached are actually parsed.
+    """
+    data = writer.data
+    entries = list(data["allPages"].values())
+    print("♻️  Reparsing stored wikitext...")
+    
+    with ParseStage(args.workers) as stage:
+        for i, entry in enumerate(entries):
+            title = entry["title"]
+            page_data = {"content": entry["rawWikitext"], "categories": entry["categories"]}
+            
+            def on_parsed(parsed: dict, entry=entry, page_data=page_data) -> None:
+                entry.update(build_entry(entry["title"], entry["pageId"], page_data, parsed))
+                instrument.count(items=1)
+            
+            def on_error(e: Exception, title=title) -> None:
+                report_error(None, f"Error parsing {title}", title, e)
+            
+            print(f"   [{i+1}/{len(entries)}] {title[:50]}...", end="\r")
+            queue_parse(stage, cache, title, page_data["content"], on_parsed, on_error)
+    
+    # allPages keeps page-list order; re-filing points the categories at the updated entries
+    rebuild_categories(data, entries)
+    data["metadata"]["reparsedAt"] = datetime.now().isoformat()
+
+
+def queue_parse(stage: ParseStage, cache: ParseCache | None, title: str, content: str, on_parsed, on_error) -> None:
+    """Parse `content` on the stage, or reuse its cached parse; `on_parsed` fires in order either way."""
+    parsed = cache.get(content, title) if cache else None
+    if parsed is not None:
+        stage.resolved(parsed, on_parsed, on_error)
+        return
     
-    with httpx.Client(timeout=30.0) as client:
+    def on_fresh(parsed: dict) -> None:
+        if cache:
+            cache.put(content, parsed)
+        on_parsed(parsed)
+    
+    stage.submit(parse_wikitext, (content, title), on_fresh, on_error)
+
+
+def add_page(
+    stage: ParseStage,
+    cache: ParseCache | None,
+    writer,
+    manifest: dict,
+    journal: ScrapeJournal | None,
+    page_id: int,
+    title: str,
+    page_data: dict,
+) -> None:
+    """Queue one fetched page for parsing.
+
+    Once parsed (in submission order) it is categorized, recorded and
+    journaled.
+    """
+    def on_parsed(parsed: dict) -> None:
+        entry = build_entry(title, page_id, page_data, parsed)
+        add_entry(writer, entry)
+        record_page(manifest, page_id, title, page_data)
+        if journal:
+            journal.page(entry, manifest[str(page_id)])
+    
+    def on_error(e: Exception) -> None:
+        report_error(journal, f"Error parsing {title}", title, e)
+    
+    queue_parse(stage, cache, title, page_data["content"], on_parsed, on_error)
+
+
+def report_error(journal: ScrapeJournal | None, message: str, title: str, e: Exception) -> None:
+    print(f"\n⚠️  {message}: {e}")
+    if journal:
+        journal.error(title, str(e))
+
+
+def add_batch(
+    stage: ParseStage,
+    cache: ParseCache | None,
+    writer,
+    manifest: dict,
+    journal: ScrapeJournal | None,
+    batch: list[dict],
+    records: dict[int, dict],
+) -> None:
+    """Queue a fetched batch for parsing, in page-list order."""
+    for page in batch:
+        page_data = records.get(page["pageid"], {"content": "", "revid": None, "categories": []})
+        add_page(stage, cache, writer, manifest, journal, page["pageid"], page["title"], page_data)
+
+
+def replay_journal(writer, manifest: dict, records: list[dict]) -> dict:
+    """Rebuild dataset and manifest from journal records.
+
+    Returns the last crawl checkpoint's continue params, or None if the
+    journal has no checkpoint.
+    """
+    checkpoint = None
+    for record in records:
+        if record["type"] == "start":
+            writer.metadata["scrapedAt"] = record["scrapedAt"]
+        elif record["type"] == "page":
+            entry = record["entry"]
+            if str(entry["pageId"]) in manifest:
+                continue  # Page from a batch that was refetched after a crash
+            add_entry(writer, entry)
+            manifest[str(entry["pageId"])] = record["manifest"]
+        elif record["type"] == "checkpoint":
+            checkpoint = record["continue"]
+    return checkpoint
+
+
+def scrape_sync(
+    writer, manifest: dict, journal: ScrapeJournal | None, cache: ParseCache | None, args: argparse.Namespace
+) -> None:
+    """Fetch and parse every page with one synchronous client.
+
+    Pages already in `manifest` (replayed from a journal) are skipped.
+    """
+    with WikiClient(rate=1 / DELAY_SECONDS, max_rate=args.max_rate) as client, ParseStage(args.workers) as stage:
         # Step 1: Get all page titles
-        pages = fetch_all_page_titles(client)
+        with instrument.stage("list pages"):
+            pages = fetch_all_page_titles(client, args.skip_redirects)
+        pages = [page for page in pages if str(page["pageid"]) not in manifest]
         
         # Step 2: Fetch and parse each page
         print()
         print("📖 Fetching page contents...")
         
-        for i, page in enumerate(pages):
-            title = page["title"]
-            page_id = page["pageid"]
-            
-            print(f"   [{i+1}/{len(pages)}] {title[:50]}...", end="\r")
-            
-            try:
-                # Fetch content
-                page_data = fetch_page_content(client, title)
+        if args.batch:
+            for start in range(0, len(pages), BATCH_SIZE):
+                batch = pages[start:start + BATCH_SIZE]
                 
-                # Parse content
-                parsed = parse_wikitext(page_data["content"], title)
+                print(f"   [{start + len(batch)}/{len(pages)}] {batch[-1]['title'][:50]}...", end="\r")
                 
-                # Create entry
-                entry = {
-                    "title": title,
-                    "pageId": page_id,
-                    "categories": page_data["categories"],
-                    "infobox": parsed["infobox"],
-                    "cardData": parsed["cardData"],  # Specific card fields (effect, test, pass, fail, etc)
-                    "sections": parsed["sections"],  # Section name -> content
-                    "links": parsed["links"],
-                    "templates": parsed["templates"],
-                    "fullText": parsed["fullText"],  # Complete cleaned text
-                    "rawWikitext": page_data["content"],
-                }
+                try:
+                    records = fetch_pages_content(client, [page["title"] for page in batch])
+                except Exception as e:
+                    report_error(journal, f"Error fetching batch at {batch[0]['title']}", batch[0]["title"], e)
+                    continue
                 
-                # Categorize and add to appropriate list
-                category = categorize_page(page_data["categories"], title)
+                add_batch(stage, cache, writer, manifest, journal, batch, records)
+        else:
+            for i, page in enumerate(pages):
+                title = page["title"]
+                page_id = page["pageid"]
                 
-                if "." in category:
-                    parent, child = category.split(".")
-                    data["categories"][parent][child].append(entry)
-                else:
-                    data["categories"][category].append(entry)
+                print(f"   [{i+1}/{len(pages)}] {title[:50]}...", end="\r")
                 
-                # Also add to flat index
-                data["allPages"][title] = entry
+                try:
+                    # Fetch content
+                    page_data = fetch_page_content(client, title)
+                except Exception as e:
+                    report_error(journal, f"Error fetching {title}", title, e)
+                    continue
                 
-                time.sleep(DELAY_SECONDS)
+                # Parse, categorize and add to the dataset
+                add_page(stage, cache, writer, manifest, journal, page_id, title, page_data)
+
+
+def scrape_crawl(
+    writer,
+    manifest: dict,
+    journal: ScrapeJournal | None,
+    cache: ParseCache | None,
+    args: argparse.Namespace,
+    continue_params: dict | None = None,
+) -> None:
+    """Single-pass crawl: each listed batch streams straight into parsing.
+
+    A checkpoint is journaled once every page of its batch has been parsed
+    and journaled; `continue_params` restarts the crawl from one.
+    """
+    with WikiClient(rate=1 / DELAY_SECONDS, max_rate=args.max_rate) as client, ParseStage(args.workers) as stage:
+        print("📖 Crawling pages...")
+        
+        for pages, next_params in crawl_all_pages(client, args.skip_redirects, continue_params):
+            pages = [page for page in pages if str(page["pageid"]) not in manifest]
+            
+            add_batch(stage, cache, writer, manifest, journal, pages, {page["pageid"]: page for page in pages})
+            if journal:
+                stage.after(lambda next_params=next_params: journal.checkpoint(next_params))
+            
+            if pages:
+                print(f"   [{writer.count}] {pages[-1]['title'][:50]}...", end="\r")
+
+
+async def scrape_async(
+    writer, manifest: dict, journal: ScrapeJournal | None, cache: ParseCache | None, args: argparse.Namespace
+) -> None:
+    """Fetch pages with up to `args.concurrency` requests in flight.
+
+    Pacing comes from the client's shared token bucket rather than a sleep
+    per page.
+    Results are consumed in page-list order, so the output is identical to
+    the sync engine. Parsing is queued without blocking the event loop.
+    """
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    max_rate = max(args.rate, args.max_rate)
+    
+    with ParseStage(args.workers) as stage:
+        async with AsyncWikiClient(args.rate, args.burst, max_rate, limits=limits) as client:
+            # Step 1: Get all page titles
+            with instrument.stage("list pages"):
+                pages = await fetch_all_page_titles_async(client, args.skip_redirects)
+            pages = [page for page in pages if str(page["pageid"]) not in manifest]
+            
+            # Step 2: Fetch and parse each page
+            print()
+            print("📖 Fetching page contents...")
+            
+            if args.batch:
+                units = [pages[start:start + BATCH_SIZE] for start in range(0, len(pages), BATCH_SIZE)]
                 
-            except Exception as e:
-                print(f"\n⚠️  Error fetching {title}: {e}")
-                continue
+                async def fetch_unit(batch):
+                    async with semaphore:
+                        return await fetch_pages_content_async(client, [page["title"] for page in batch])
+            else:
+                units = [[page] for page in pages]
+                
+                async def fetch_unit(batch):
+                    async with semaphore:
+                        page_data = await fetch_page_content_async(client, batch[0]["title"])
+                        return {batch[0]["pageid"]: page_data}
+            
+            tasks = [asyncio.create_task(fetch_unit(batch)) for batch in units]
+            done = 0
+            
+            try:
+                for batch, task in zip(units, tasks):
+                    done += len(batch)
+                    try:
+                        records = await task
+                    except Exception as e:
+                        report_error(journal, f"Error fetching {batch[0]['title']}", batch[0]["title"], e)
+                        continue
+                    
+                    print(f"   [{done}/{len(pages)}] {batch[-1]['title'][:50]}...", end="\r")
+                    
+                    await stage.make_room(len(batch))
+                    add_batch(stage, cache, writer, manifest, journal, batch, records)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape the Eldritch Horror Wiki into JSON.")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=f"fetch page contents {BATCH_SIZE} titles per request instead of one by one",
+    )
+    parser.add_argument(
+        "--crawl",
+        action="store_true",
+        help="list and fetch pages together with generator=allpages (one pass, sync)",
+    )
+    parser.add_argument(
+        "--skip-redirects",
+        action="store_true",
+        help="never list or fetch redirect pages (apfilterredir=nonredirects)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="refetch only pages changed since the last run (needs the existing output and its manifest)",
+    )
+    parser.add_argument(
+        "--reparse",
+        action="store_true",
+        help="re-derive the parsed fields of the existing output from its rawWikitext, without fetching",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="rebuild progress from the journal of an interrupted run and continue it",
+    )
+    parser.add_argument(
+        "--category-rules",
+        type=Path,
+        help=f"JSON rule table mapping wiki categories to dataset categories (default: {RULES_FILE.name})",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=OUTPUT_FILE,
+        help="output JSON file",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson", "sqlite", "shards"],
+        default="json",
+        help="json: one monolithic file; ndjson: stream one page per line to <output>.ndjson "
+             "with a sidecar <output>.index.json (flat memory); sqlite: indexed tables and an "
+             "FTS5 full-text index in <output>.sqlite (see corpus.py); shards: one file per category "
+             "plus a manifest in <output>.shards/ (see shards.py)",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=["nested", "normalized"],
+        help="nested (default): full entries in category lists and again in allPages; "
+             "normalized: each page once under pages[pageId], categories and allPages hold ids. "
+             "--incremental and --reparse keep the existing file's layout unless this is given",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=profile_names(),
+        help=f"field projection profile deciding which entry fields each category keeps "
+             f"(default: {DEFAULT_PROFILE}, everything; see projection_profiles.json). "
+             f"--incremental keeps the existing file's profile",
+    )
+    parser.add_argument(
+        "--assemble",
+        action="store_true",
+        help="with --format ndjson, also assemble the monolithic JSON output at the end",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["sync", "async"],
+        default="sync",
+        help="sync: one request at a time with a fixed delay; "
+             "async: concurrent requests paced by a token bucket",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=ASYNC_CONCURRENCY,
+        help="async engine: maximum requests in flight",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=ASYNC_RATE,
+        help="async engine: starting requests per second",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=MAX_RATE,
+        help="ceiling the adaptive throttle may raise the request rate to",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="parse pages in this many worker processes while fetching continues "
+             "(0 or 1: parse inline in the fetch loop)",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        type=Path,
+        help="parse cache file (default: <output>.parse_cache.sqlite)",
+    )
+    parser.add_argument(
+        "--parse-cache-mb",
+        type=int,
+        default=DEFAULT_MAX_MB,
+        help="size limit of the parse cache; least recently used entries are evicted past it",
+    )
+    parser.add_argument(
+        "--no-parse-cache",
+        action="store_true",
+        help="always parse from scratch and leave the parse cache untouched",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=ASYNC_BURST,
+        help="async engine: requests allowed back to back before the rate applies",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help=f"dump cProfile stats of the fetch/parse stage next to the run report "
+             f"(same as {instrument.CPROFILE_ENV}=1; see instrument.py)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help=f"trace allocations with tracemalloc for the run report (same as {instrument.TRACEMALLOC_ENV}=1)",
+    )
+    parser.add_argument(
+        "--time-functions",
+        action="store_true",
+        help=f"count calls and time of the @timed helpers in the run report "
+             f"(same as {instrument.TIME_FUNCTIONS_ENV}=1)",
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.crawl and args.engine == "async":
+        parser.error("--crawl walks the page list one batch at a time; it cannot use --engine async")
+    if args.resume and args.incremental:
+        parser.error("--resume applies to full scrapes, not --incremental")
+    if args.incremental and args.format != "json":
+        parser.error("--incremental patches the monolithic JSON output; use --format json")
+    if args.reparse and (args.incremental or args.resume):
+        parser.error("--reparse rebuilds an existing output; it cannot be combined with --incremental or --resume")
+    if args.reparse and args.format != "json":
+        parser.error("--reparse patches the monolithic JSON output; use --format json")
+    if args.layout and args.format in ("sqlite", "shards"):
+        parser.error(f"--layout shapes the monolithic JSON output; --format {args.format} has its own layout")
+    if args.layout and args.format == "ndjson" and not args.assemble:
+        parser.error("--layout with --format ndjson shapes the assembled JSON output; add --assemble")
+    if args.reparse and args.profile not in (None, DEFAULT_PROFILE):
+        parser.error(f"--reparse needs every entry's rawWikitext; use --profile {DEFAULT_PROFILE}")
+    return args
+
+
+@instrument.instrumented
+def main(argv: list[str] | None = None):
+    global CATEGORY_RULES, PROJECTION
+    args = parse_args(argv)
+    instrument.configure(args.cprofile, args.trace_memory, args.time_functions)
+    if args.category_rules:
+        CATEGORY_RULES = CategoryRules.load(args.category_rules)
+    
+    print("=" * 50)
+    print("🐙 THE NECRONOMICON COMPILER")
+    print("   Eldritch Horror Wiki Scraper")
+    print("=" * 50)
+    print()
+    
+    output_path = args.output
+    cache = None
+    failed = []
+    if not args.no_parse_cache:
+        cache = ParseCache(args.parse_cache or parse_cache_path(output_path), args.parse_cache_mb * 1024 * 1024)
+    
+    if args.reparse:
+        if not output_path.exists():
+            print(f"❌ Reparse mode needs {output_path} from a previous scrape")
+            sys.exit(1)
         
-        print(f"\n✅ Processed {len(data['allPages'])} pages")
-    
-    # Add stats
-    data["metadata"]["totalPages"] = len(data["allPages"])
-    data["metadata"]["stats"] = {
-        "investigators": len(data["categories"]["investigators"]),
-        "ancientOnes": len(data["categories"]["ancientOnes"]),
-        "monsters": len(data["categories"]["monsters"]),
-        "epicMonsters": len(data["categories"]["epicMonsters"]),
-        "assets": len(data["categories"]["assets"]),
-        "uniqueAssets": len(data["categories"]["uniqueAssets"]),
-        "artifacts": len(data["categories"]["artifacts"]),
-        "spells": len(data["categories"]["spells"]),
-        "conditions": len(data["categories"]["conditions"]),
-        "totalEncounters": sum(len(v) for v in data["categories"]["encounters"].values()),
-        "mythos": len(data["categories"]["mythos"]),
-        "mysteries": len(data["categories"]["mysteries"]),
-        "preludes": len(data["categories"]["preludes"]),
-        "gameSets": len(data["categories"]["gameSets"]),
-        "mechanics": len(data["categories"]["mechanics"]),
-        "other": len(data["categories"]["other"]),
-    }
+        print(f"📂 Loading {output_path}...")
+        with instrument.stage("load"):
+            writer = JsonDatasetWriter.load(output_path, args.layout)
+            instrument.count_file(output_path, output=False)
+        if writer.metadata.get("profile", DEFAULT_PROFILE) != DEFAULT_PROFILE:
+            print(f"❌ {output_path} was written with --profile {writer.metadata['profile']}; "
+                  f"reparsing needs a {DEFAULT_PROFILE} scrape")
+            sys.exit(1)
+        
+        with instrument.stage("reparse", hot=True):
+            reparse_dataset(writer, cache, args)
+    elif args.incremental:
+        if not output_path.exists() or not manifest_path(output_path).exists():
+            print(f"❌ Incremental mode needs {output_path} and {manifest_path(output_path)} from a full scrape")
+            sys.exit(1)
+        
+        print(f"📂 Loading {output_path}...")
+        with instrument.stage("load"):
+            writer = JsonDatasetWriter.load(output_path, args.layout)
+            instrument.count_file(output_path, output=False)
+        profile = writer.metadata.get("profile", DEFAULT_PROFILE)
+        if args.profile not in (None, profile):
+            print(f"❌ {output_path} was written with --profile {profile}; "
+                  f"refetched pages must match it (run a full scrape to change profiles)")
+            sys.exit(1)
+        PROJECTION = Projection.load(profile)
+        manifest = load_manifest(manifest_path(output_path))
+        
+        with instrument.stage("incremental scrape", hot=True):
+            failed = scrape_incremental(writer, manifest, cache, args)
+    else:
+        # Initialize the output
+        if args.format == "ndjson":
+            writer = NdjsonDatasetWriter(output_path.with_suffix(".ndjson"), BASE_URL)
+        elif args.format == "sqlite":
+            writer = SqliteDatasetWriter(corpus_path(output_path), BASE_URL)
+        elif args.format == "shards":
+            writer = ShardedDatasetWriter(shard_dir(output_path), BASE_URL)
+        else:
+            writer = JsonDatasetWriter(output_path, BASE_URL, args.layout or "nested")
+        PROJECTION = Projection.load(args.profile or DEFAULT_PROFILE)
+        if not PROJECTION.is_full:
+            writer.metadata["profile"] = PROJECTION.name
+        manifest = {}
+        
+        journal = ScrapeJournal(journal_path(output_path))
+        checkpoint = None
+        if args.resume and journal.path.exists():
+            print(f"📂 Resuming from {journal.path}...")
+            checkpoint = replay_journal(writer, manifest, read_journal(journal.path))
+            print(f"✅ Recovered {len(manifest)} pages")
+            journal.open(resume=True)
+        else:
+            if args.resume:
+                print(f"⚠️  No journal at {journal.path}, starting from scratch")
+            journal.open()
+            journal.start({"crawl": args.crawl, "batch": args.batch, "engine": args.engine},
+                          writer.metadata["scrapedAt"])
+        
+        with instrument.stage("scrape", hot=True):
+            if args.crawl:
+                if checkpoint == {}:
+                    print("✅ Crawl already complete")
+                else:
+                    scrape_crawl(writer, manifest, journal, cache, args, checkpoint)
+            elif args.engine == "async":
+                asyncio.run(scrape_async(writer, manifest, journal, cache, args))
+            else:
+                scrape_sync(writer, manifest, journal, cache, args)
+        
+        journal.close()
+    
+    print(f"\n✅ Processed {writer.count} pages")
     
-    # Save to file
-    output_path = Path("eldritch_horror_data.json")
+    # Save to file (stats are added on close)
     print()
-    print(f"💾 Saving to {output_path}...")
+    print(f"💾 Saving to {writer.path}...")
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with instrument.stage("write"):
+        writer.close()
+        instrument.count_file(writer.path)
+    if not args.reparse:
+        save_manifest(manifest, manifest_path(output_path))
+    if not (args.incremental or args.reparse):
+        journal.remove()
+    if cache:
+        cache.close()
+        print(f"🗃️  Parse cache: {cache.hits} hits, {cache.misses} parsed")
     
-    file_size = output_path.stat().st_size / (1024 * 1024)
+    if args.format == "ndjson" and args.assemble:
+        print(f"💾 Assembling {output_path}...")
+        with instrument.stage("assemble"):
+            assemble_json(writer.path, output_path, args.layout or "nested")
+            instrument.count_file(output_path)
+    
+    if writer.path.is_dir():
+        file_size = sum(path.stat().st_size for path in writer.path.iterdir()) / (1024 * 1024)
+    else:
+        file_size = writer.path.stat().st_size / (1024 * 1024)
     print(f"✅ Done! File size: {file_size:.2f} MB")
     print()
     print("📊 Stats:")
-    for key, value in data["metadata"]["stats"].items():
+    for key, value in writer.metadata["stats"].items():
         print(f"   {key}: {value}")
     
     print()
     print("🐙 Ph'nglui mglw'nafh Cthulhu R'lyeh wgah'nagl fhtagn!")
+    
+    if failed:
+        print()
+        print(f"❌ {len(failed)} pages could not be refreshed and keep their previous revision:")
+        for title in failed:
+            print(f"   {title}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -14,14 +14,16 @@ Scrapes specific wiki pages and saves each to its own JSON file.
 
 import json
 import re
-import time
 from pathlib import Path
 from urllib.parse import urlparse
 
-import httpx
 from bs4 import BeautifulSoup
 
+import instrument
+from wiki_http import WikiClient
+
 DELAY_SECONDS = 1.0  # Be nice to the server
+MAX_RATE = 2.0  # Ceiling the adaptive throttle may speed up to (requests/sec)
 OUTPUT_DIR = Path("scraped_encounters")
 
 # Target URLs to scrape
@@ -44,6 +46,7 @@ def get_page_name(url: str) -> str:
     return page.replace("_", "-").lower()
 
 
+@instrument.timed
 def clean_text(text: str) -> str:
     """Clean up extracted text."""
     if not text:
@@ -55,6 +58,7 @@ def clean_text(text: str) -> str:
     return text
 
 
+@instrument.timed
 def extract_table_data(table, section_name: str = "") -> list[dict]:
     """Extract data from an HTML table."""
     rows = []
@@ -145,7 +149,7 @@ def extract_lists(soup, section_name: str = "") -> list[dict]:
     return items
 
 
-def scrape_page(url: str, client: httpx.Client) -> dict:
+def scrape_page(url: str, client: WikiClient) -> dict:
     """Scrape a single wiki page and extract all structured data."""
     print(f"  [>] Fetching {url}...")
     
@@ -255,6 +259,7 @@ def scrape_page(url: str, client: httpx.Client) -> dict:
     }
 
 
+@instrument.instrumented
 def main():
     # Fix Windows console encoding
     import sys
@@ -274,16 +279,20 @@ def main():
     
     results = {}
     
-    with httpx.Client(timeout=30.0, follow_redirects=True) as client:
+    with WikiClient(rate=1 / DELAY_SECONDS, max_rate=MAX_RATE, follow_redirects=True) as client, \
+            instrument.stage("scrape", hot=True):
         for url in URLS:
             try:
                 data = scrape_page(url, client)
                 page_name = get_page_name(url)
+                instrument.count(items=1)
                 
                 # Save to individual JSON file
                 output_file = OUTPUT_DIR / f"{page_name}.json"
-                with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+                with instrument.stage("write json"):
+                    with open(output_file, "w", encoding="utf-8") as f:
+                        json.dump(data, f, indent=2, ensure_ascii=False)
+                    instrument.count_file(output_file)
                 
                 # Count encounters
                 encounter_count = len(data.get("all_encounters", []) or [])
@@ -302,8 +311,6 @@ def main():
                     "section_count": section_count,
                 }
                 
-                time.sleep(DELAY_SECONDS)
-                
             except Exception as e:
                 print(f"  [ERROR] Error scraping {url}: {e}")
                 import traceback
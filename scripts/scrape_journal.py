@@ -0,0 +1,91 @@
+"""
+Append-only NDJSON journal for long scrapes.
+Every parsed page is written as soon as it completes, so a crash loses at
+most the page in flight. `--resume` replays the journal to rebuild the
+dataset and carries on from the last crawl checkpoint.
+"""
+
+import json
+import os
+from pathlib import Path
+
+SYNC_EVERY = 50  # fsync after this many records even without a checkpoint
+
+
+def journal_path(output_path: Path) -> Path:
+    """The journal lives next to the output: eldritch_horror_data.journal.ndjson."""
+    return output_path.with_suffix(".journal.ndjson")
+
+
+def read_journal(path: Path) -> list[dict]:
+    """Read every complete record. A torn final line from a crash is ignored."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # Partially written when the process died
+            records.append(json.loads(line))
+    return records
+
+
+class ScrapeJournal:
+    """Writer for the scrape journal.
+
+    Record types:
+      start       scrape options and the original start time
+      page        a finished dataset entry and its manifest record
+      error       a page that failed (retried on resume)
+      checkpoint  crawl continuation params for the next batch
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = None
+        self.unsynced = 0
+
+    def open(self, resume: bool = False) -> None:
+        if resume and self.path.exists():
+            self.truncate_torn_tail()
+            self.file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.file = open(self.path, "w", encoding="utf-8")
+
+    def truncate_torn_tail(self) -> None:
+        """Cut off a half-written last line so appended records stay parseable."""
+        with open(self.path, "rb+") as f:
+            content = f.read()
+            end = content.rfind(b"\n") + 1
+            if end != len(content):
+                f.truncate(end)
+
+    def write(self, record: dict, sync: bool = False) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.unsynced += 1
+        if sync or self.unsynced >= SYNC_EVERY:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def start(self, options: dict, scraped_at: str) -> None:
+        self.write({"type": "start", "options": options, "scrapedAt": scraped_at}, sync=True)
+
+    def page(self, entry: dict, manifest_record: dict) -> None:
+        self.write({"type": "page", "entry": entry, "manifest": manifest_record})
+
+    def error(self, title: str, message: str) -> None:
+        self.write({"type": "error", "title": title, "error": message})
+
+    def checkpoint(self, continue_params: dict) -> None:
+        self.write({"type": "checkpoint", "continue": continue_params}, sync=True)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+    def remove(self) -> None:
+        """Delete the journal once the output has been written."""
+        self.close()
+        self.path.unlink(missing_ok=True)
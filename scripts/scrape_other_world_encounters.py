@@ -14,13 +14,15 @@ Scrapes Other World Encounters and filters to Core and Forsaken Lore only.
 
 import json
 import re
-import time
 from pathlib import Path
 
-import httpx
 from bs4 import BeautifulSoup
 
+import instrument
+from wiki_http import WikiClient
+
 DELAY_SECONDS = 1.0
+MAX_RATE = 2.0  # Ceiling the adaptive throttle may speed up to (requests/sec)
 OUTPUT_FILE = Path("scraped_encounters_filtered/other-world-encounters.json")
 
 # Other World Encounter URLs
@@ -41,6 +43,7 @@ OTHER_WORLD_URLS = [
 ALLOWED_SETS = ["01", "02", "core", "forsaken lore"]
 
 
+@instrument.timed
 def clean_text(text: str) -> str:
     """Clean up extracted text."""
     if not text:
@@ -75,6 +78,7 @@ def is_allowed_set(set_value) -> bool:
     return False
 
 
+@instrument.timed
 def extract_table_data(table, location_name: str) -> list[dict]:
     """Extract data from an HTML table."""
     rows = []
@@ -136,7 +140,7 @@ def extract_table_data(table, location_name: str) -> list[dict]:
     return rows
 
 
-def scrape_other_world_page(url: str, client: httpx.Client) -> dict:
+def scrape_other_world_page(url: str, client: WikiClient) -> dict:
     """Scrape a single Other World Encounter page."""
     # Extract location name from URL
     location_name = url.split("/wiki/")[-1].replace("_(Other_World)", "").replace("_", " ")
@@ -185,6 +189,7 @@ def scrape_other_world_page(url: str, client: httpx.Client) -> dict:
     }
 
 
+@instrument.instrumented
 def main():
     # Fix Windows console encoding
     import sys
@@ -203,10 +208,12 @@ def main():
     all_encounters = []
     location_data = {}
     
-    with httpx.Client(timeout=30.0, follow_redirects=True) as client:
+    with WikiClient(rate=1 / DELAY_SECONDS, max_rate=MAX_RATE, follow_redirects=True) as client, \
+            instrument.stage("scrape", hot=True):
         for url in OTHER_WORLD_URLS:
             try:
                 data = scrape_other_world_page(url, client)
+                instrument.count(items=1)
                 
                 # Filter encounters to only Core and Forsaken Lore
                 original_count = len(data["encounters"])
@@ -224,8 +231,6 @@ def main():
                 else:
                     print(f"      -> 0 encounters after filtering (had {original_count})")
                 
-                time.sleep(DELAY_SECONDS)
-                
             except Exception as e:
                 print(f"  [ERROR] Error scraping {url}: {e}")
                 import traceback
@@ -257,8 +262,10 @@ def main():
             del output["sections"][section_name]
     
     # Save output
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    with instrument.stage("write json"):
+        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        instrument.count_file(OUTPUT_FILE)
     
     # Print summary
     print()
@@ -15,13 +15,15 @@ Only fetches Core and Forsaken Lore encounters.
 
 import json
 import re
-import time
 from pathlib import Path
 
-import httpx
 from bs4 import BeautifulSoup
 
+import instrument
+from wiki_http import WikiClient
+
 DELAY_SECONDS = 1.0
+MAX_RATE = 2.0  # Ceiling the adaptive throttle may speed up to (requests/sec)
 OUTPUT_FILE = Path("scraped_encounters_filtered/research-encounter.json")
 
 # Research Encounter URLs for Core and Forsaken Lore Ancient Ones only
@@ -47,6 +49,7 @@ ANCIENT_ONE_SETS = {
 }
 
 
+@instrument.timed
 def clean_text(text: str) -> str:
     """Clean up extracted text."""
     if not text:
@@ -56,6 +59,7 @@ def clean_text(text: str) -> str:
     return text
 
 
+@instrument.timed
 def extract_table_data(table, section_name: str, ancient_one: str) -> list[dict]:
     """Extract data from an HTML table."""
     rows = []
@@ -122,7 +126,7 @@ def extract_table_data(table, section_name: str, ancient_one: str) -> list[dict]
     return rows
 
 
-def scrape_research_page(url: str, ancient_one: str, client: httpx.Client) -> dict:
+def scrape_research_page(url: str, ancient_one: str, client: WikiClient) -> dict:
     """Scrape a single Research Encounter page."""
     print(f"  [>] Fetching {ancient_one}...")
     
@@ -169,6 +173,7 @@ def scrape_research_page(url: str, ancient_one: str, client: httpx.Client) -> di
     }
 
 
+@instrument.instrumented
 def main():
     # Fix Windows console encoding
     import sys
@@ -192,10 +197,12 @@ def main():
     }
     ancient_one_data = {}
     
-    with httpx.Client(timeout=30.0, follow_redirects=True) as client:
+    with WikiClient(rate=1 / DELAY_SECONDS, max_rate=MAX_RATE, follow_redirects=True) as client, \
+            instrument.stage("scrape", hot=True):
         for ancient_one, url in RESEARCH_ENCOUNTER_URLS.items():
             try:
                 data = scrape_research_page(url, ancient_one, client)
+                instrument.count(items=1)
                 ancient_one_data[ancient_one] = data
                 
                 # Aggregate encounters by section
@@ -206,8 +213,6 @@ def main():
                 encounter_count = sum(len(e) for e in data["encounters"].values())
                 print(f"      -> {encounter_count} encounters")
                 
-                time.sleep(DELAY_SECONDS)
-                
             except Exception as e:
                 print(f"  [ERROR] Error scraping {ancient_one}: {e}")
                 import traceback
@@ -229,8 +234,10 @@ def main():
     }
     
     # Save output
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    with instrument.stage("write json"):
+        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        instrument.count_file(OUTPUT_FILE)
     
     # Print summary
     print()
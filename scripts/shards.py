@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Per-category sharded output.
+`scrape_eldritch.py --format shards` writes one JSON array per dataset
+category into <output>.shards/ (investigators.json, encounters.research.json,
+...), a manifest.json with each shard's page count, byte size and SHA-256,
+and titles.json mapping every page title to its shard.
+`python shards.py build eldritch_horror_data.json` splits an existing JSON
+output the same way. ShardedDataset reads a shard only when it is first
+asked for, so a consumer that needs the mythos cards never parses the rest
+of the wiki.
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+from dataset_io import category_names, compute_stats, load_dataset, new_metadata
+
+MANIFEST_FILE = "manifest.json"
+TITLES_FILE = "titles.json"
+
+
+def shard_dir(output_path: Path) -> Path:
+    """Shards live next to the output: eldritch_horror_data.shards/."""
+    return output_path.with_suffix(".shards")
+
+
+class ShardedDatasetWriter:
+    """Stream entries into per-category shard files as they finish.
+
+    Each shard is a JSON array with one compact entry per line. Sizes and
+    hashes are tallied while writing, so closing only writes the manifest.
+    """
+
+    def __init__(self, path: Path, source: str):
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        for stale in path.glob("*.json"):
+            stale.unlink()
+        self.meta = new_metadata(source)
+        self.files = {}  # category -> open shard file
+        self.shards = {name: {"file": f"{name}.json", "count": 0, "bytes": 0, "sha256": hashlib.sha256()}
+                       for name in category_names()}
+        self.titles = {}  # title -> category
+
+    @property
+    def metadata(self) -> dict:
+        return self.meta
+
+    @property
+    def count(self) -> int:
+        return len(self.titles)
+
+    def write(self, category: str, data: bytes) -> None:
+        shard = self.shards[category]
+        self.files[category].write(data)
+        shard["bytes"] += len(data)
+        shard["sha256"].update(data)
+
+    def add(self, entry: dict, category: str) -> None:
+        if category not in self.files:
+            self.files[category] = open(self.path / self.shards[category]["file"], "wb")
+            self.write(category, b"[\n")
+        else:
+            self.write(category, b",\n")
+        self.write(category, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        self.shards[category]["count"] += 1
+        self.titles[entry["title"]] = category
+
+    def close(self) -> None:
+        for category in self.shards:
+            if category in self.files:
+                self.write(category, b"\n]\n")
+                self.files[category].close()
+            else:
+                self.files[category] = open(self.path / self.shards[category]["file"], "wb")
+                self.write(category, b"[]\n")
+                self.files[category].close()
+
+        counts = {name: shard["count"] for name, shard in self.shards.items()}
+        self.meta["totalPages"] = self.count
+        self.meta["stats"] = compute_stats(counts)
+        manifest = {
+            "metadata": self.meta,
+            "shards": {name: {**shard, "sha256": shard["sha256"].hexdigest()} for name, shard in self.shards.items()},
+        }
+        with open(self.path / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        with open(self.path / TITLES_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.titles, f, ensure_ascii=False)
+
+
+class ShardedDataset:
+    """Lazy view of a shard directory: category(name) loads one shard on first access.
+
+    page(title) loads the title index and then only the shard holding that page.
+    """
+
+    def __init__(self, path: Path, verify: bool = True):
+        self.path = path
+        self.verify = verify
+        with open(path / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.loaded = {}
+        self.titles = None
+
+    def __enter__(self) -> "ShardedDataset":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.loaded.clear()
+
+    @property
+    def metadata(self) -> dict:
+        return self.manifest["metadata"]
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.manifest["shards"])
+
+    def category(self, name: str) -> list[dict]:
+        """Entries of a dataset category ("mythos", "encounters.research"), in scrape order."""
+        if name not in self.loaded:
+            shard = self.manifest["shards"][name]
+            content = (self.path / shard["file"]).read_bytes()
+            if self.verify and hashlib.sha256(content).hexdigest() != shard["sha256"]:
+                raise ValueError(f"Shard {shard['file']} does not match its manifest hash")
+            self.loaded[name] = json.loads(content)
+        return self.loaded[name]
+
+    __getitem__ = category
+
+    def iter_category(self, name: str):
+        return iter(self.category(name))
+
+    def page(self, title: str) -> dict | None:
+        if self.titles is None:
+            with open(self.path / TITLES_FILE, "r", encoding="utf-8") as f:
+                self.titles = json.load(f)
+        name = self.titles.get(title)
+        if name is None:
+            return None
+        # The last page filed under a title wins, as in allPages
+        return next((entry for entry in reversed(self.category(name)) if entry["title"] == title), None)
+
+
+def build_shards(data_path: Path, output_path: Path) -> int:
+    """Split a JSON output (either layout) into a shard directory."""
+    data = load_dataset(data_path)
+    writer = ShardedDatasetWriter(output_path, data["metadata"]["source"])
+    writer.meta.update({key: value for key, value in data["metadata"].items() if key not in ("totalPages", "stats")})
+    for name in category_names():
+        parent, _, child = name.partition(".")
+        for entry in data["categories"][parent][child] if child else data["categories"][parent]:
+            writer.add(entry, name)
+    writer.close()
+    return writer.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split the scraped dataset into per-category shards.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="shard an existing JSON output")
+    build.add_argument("input", type=Path, help="eldritch_horror_data.json (either layout)")
+    build.add_argument("--output", type=Path, help="shard directory (default: <input>.shards)")
+
+    args = parser.parse_args()
+    output_path = args.output or shard_dir(args.input)
+    count = build_shards(args.input, output_path)
+    print(f"✅ Wrote {count} pages to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
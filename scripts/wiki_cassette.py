@@ -0,0 +1,152 @@
+"""
+Record/replay harness for the wiki scrapers.
+A cassette is a JSON file of captured api.php and /wiki/ responses keyed by
+method, path and query string. CassetteTransport plugs into httpx to
+record live responses or replay them offline; wiki_standin.py serves the
+same cassettes over HTTP with injected latency and errors.
+
+    # Capture a live run
+    WIKI_CASSETTE=cassettes/wiki.json WIKI_CASSETTE_MODE=record python scrape_eldritch.py --crawl
+
+    # Replay it in-process, no network
+    WIKI_CASSETTE=cassettes/wiki.json python scrape_eldritch.py --crawl
+"""
+
+import json
+from pathlib import Path
+from urllib.parse import urlencode
+
+import httpx
+
+# Query params that do not change what the server returns
+VOLATILE_PARAMS = {"maxlag"}
+
+# Headers that describe the wire encoding rather than the content we store
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMissError(Exception):
+    """Replay found no recorded response for a request."""
+
+
+def request_key(method: str, path: str, params: list[tuple[str, str]]) -> str:
+    """Origin-independent key: `GET /api.php?action=query&...` with sorted params."""
+    params = sorted((k, v) for k, v in params if k not in VOLATILE_PARAMS)
+    query = urlencode(params)
+    return f"{method} {path}?{query}" if query else f"{method} {path}"
+
+
+def httpx_request_key(request: httpx.Request) -> str:
+    return request_key(request.method, request.url.path, request.url.params.multi_items())
+
+
+def is_recordable(status: int, content_type: str, body: str) -> bool:
+    """Skip transient failures so replays never get stuck on a recorded 503."""
+    if status == 429 or status >= 500:
+        return False
+    return not ("json" in content_type and '"code": "maxlag"' in body.replace('":"', '": "'))
+
+
+class Cassette:
+    def __init__(self, path: Path, interactions: dict | None = None):
+        self.path = path
+        self.interactions = interactions or {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        if not path.exists():
+            return cls(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(path, json.load(f)["interactions"])
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"interactions": self.interactions}, f, indent=1, ensure_ascii=False)
+        self.dirty = False
+
+    def get(self, key: str) -> dict:
+        try:
+            return self.interactions[key]
+        except KeyError:
+            raise CassetteMissError(f"No recorded response for {key}") from None
+
+    def record(self, key: str, status: int, headers: dict, body: str) -> None:
+        if is_recordable(status, headers.get("content-type", ""), body):
+            self.interactions[key] = {"status": status, "headers": headers, "body": body}
+            self.dirty = True
+
+
+def stored_headers(request: httpx.Request, response: httpx.Response) -> dict:
+    """Content headers only, with same-origin redirects made relative so they
+    stay on whichever server replays them."""
+    headers = {k.lower(): v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS}
+    origin = f"{request.url.scheme}://{request.url.netloc.decode('ascii')}"
+    if headers.get("location", "").startswith(origin):
+        headers["location"] = headers["location"][len(origin):] or "/"
+    return headers
+
+
+def replayed_response(interaction: dict, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        interaction["status"],
+        headers=interaction["headers"],
+        content=interaction["body"].encode("utf-8"),
+        request=request,
+    )
+
+
+class CassetteTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """httpx transport that records to, or replays from, a cassette.
+
+    Works for both httpx.Client and httpx.AsyncClient.
+    """
+
+    def __init__(self, cassette: Cassette, mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = httpx.HTTPTransport() if mode == "record" else None
+        self.async_inner = httpx.AsyncHTTPTransport() if mode == "record" else None
+
+    def store(self, request: httpx.Request, response: httpx.Response) -> httpx.Response:
+        headers = stored_headers(request, response)
+        body = response.content.decode(response.encoding or "utf-8", errors="replace")
+        self.cassette.record(httpx_request_key(request), response.status_code, headers, body)
+        return httpx.Response(response.status_code, headers=headers, content=response.content, request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.mode == "replay":
+            return replayed_response(self.cassette.get(httpx_request_key(request)), request)
+        
+        response = self.inner.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        return self.store(request, response)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.mode == "replay":
+            return replayed_response(self.cassette.get(httpx_request_key(request)), request)
+        
+        response = await self.async_inner.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        return self.store(request, response)
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+        self.cassette.save()
+
+    async def aclose(self) -> None:
+        if self.async_inner is not None:
+            await self.async_inner.aclose()
+        self.cassette.save()
@@ -0,0 +1,257 @@
+"""
+Shared HTTP layer for the wiki scrapers.
+Wraps httpx with retries (exponential backoff with full jitter), honours
+Retry-After and MediaWiki's maxlag, and paces requests with an adaptive
+throttle so scrapers run as fast as the server comfortably allows.
+
+For offline runs and benchmarks, set WIKI_CASSETTE (plus WIKI_CASSETTE_MODE=record
+to capture) or point WIKI_BASE_URL at wiki_standin.py; see wiki_cassette.py.
+"""
+
+import asyncio
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import httpx
+
+import instrument
+from rate_limit import AdaptiveThrottle, TokenBucket
+from wiki_cassette import Cassette, CassetteTransport
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # Seconds; doubled on every retry
+BACKOFF_CAP = 60.0
+MAXLAG_SECONDS = 5  # Ask api.php to refuse work while replication lag exceeds this
+MAXLAG_BODY_BYTES = 1024  # Without the error header, only bodies this small are parsed for a maxlag error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+PUSHBACK_STATUSES = {429, 503}
+
+WIKI_ORIGIN = "https://eldritchhorror.fandom.com"
+CASSETTE_ENV = "WIKI_CASSETTE"  # Path of a cassette to replay (or record into)
+CASSETTE_MODE_ENV = "WIKI_CASSETTE_MODE"  # "replay" (default) or "record"
+BASE_URL_ENV = "WIKI_BASE_URL"  # Send WIKI_ORIGIN requests here instead, e.g. a stand-in
+
+
+class MaxlagError(Exception):
+    """api.php kept refusing the request because of replication lag."""
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def is_maxlag(response: httpx.Response) -> bool:
+    """MediaWiki answers maxlag refusals with HTTP 200, a MediaWiki-API-Error header and an error body.
+
+    Content responses are decoded by the caller, so a body is only parsed
+    here when the header is missing and the body is small enough to be
+    just an error.
+    """
+    error = response.headers.get("MediaWiki-API-Error")
+    if error is not None:
+        return error == "maxlag"
+    if "json" not in response.headers.get("content-type", "") or len(response.content) > MAXLAG_BODY_BYTES:
+        return False
+    try:
+        return response.json().get("error", {}).get("code") == "maxlag"
+    except ValueError:
+        return False
+
+
+def with_maxlag(url: str, params: dict | None) -> dict | None:
+    if params is not None and url.endswith("api.php"):
+        return {"maxlag": MAXLAG_SECONDS, **params}
+    return params
+
+
+def rebase_url(url: str) -> str:
+    """Redirect wiki URLs to WIKI_BASE_URL when it is set."""
+    base = os.environ.get(BASE_URL_ENV)
+    if base and url.startswith(WIKI_ORIGIN):
+        return base.rstrip("/") + url[len(WIKI_ORIGIN):]
+    return url
+
+
+def cassette_transport() -> CassetteTransport | None:
+    """Cassette transport selected by the environment, if any."""
+    path = os.environ.get(CASSETTE_ENV)
+    if not path:
+        return None
+    return CassetteTransport(Cassette.load(Path(path)), os.environ.get(CASSETTE_MODE_ENV, "replay"))
+
+
+def retry_delay(response: httpx.Response | None, attempt: int) -> float:
+    delay = backoff_seconds(attempt)
+    if response is not None:
+        delay = max(delay, retry_after_seconds(response) or 0.0)
+    return delay
+
+
+def check_retry(response: httpx.Response, throttle: AdaptiveThrottle) -> bool:
+    """Decide whether a response should be retried, penalizing the throttle on pushback."""
+    if response.status_code in RETRY_STATUSES:
+        if response.status_code in PUSHBACK_STATUSES:
+            throttle.penalize()
+        return True
+    if is_maxlag(response):
+        throttle.penalize()
+        return True
+    return False
+
+
+def give_up(response: httpx.Response) -> httpx.Response:
+    if is_maxlag(response):
+        raise MaxlagError(response.json()["error"].get("info", "maxlag"))
+    response.raise_for_status()
+    return response
+
+
+class WikiClient:
+    """Synchronous client: paced, retrying GETs.
+
+    `rate` is the starting requests/second; the adaptive throttle moves it
+    between `min_rate` and `max_rate` as latency changes. Extra keyword
+    arguments go to httpx.Client.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        max_rate: float | None = None,
+        min_rate: float | None = None,
+        retries: int = MAX_RETRIES,
+        timeout: float = 30.0,
+        **client_kwargs,
+    ):
+        client_kwargs.setdefault("transport", cassette_transport())
+        self.client = httpx.Client(timeout=timeout, **client_kwargs)
+        self.throttle = AdaptiveThrottle(rate, min_rate, max_rate)
+        self.retries = retries
+        self.next_request = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.client.close()
+
+    def pace(self) -> None:
+        now = time.monotonic()
+        if now < self.next_request:
+            time.sleep(self.next_request - now)
+        self.next_request = max(now, self.next_request) + 1 / self.throttle.rate
+
+    def get(self, url: str, params: dict | None = None) -> httpx.Response:
+        """GET with pacing and retries.
+
+        Raises httpx.HTTPStatusError or MaxlagError once retries run out, and
+        re-raises the last timeout or transport error.
+        """
+        url = rebase_url(url)
+        params = with_maxlag(url, params)
+        
+        for attempt in range(self.retries + 1):
+            self.pace()
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.client.get(url, params=params)
+            except httpx.TransportError:
+                instrument.observe_request(time.monotonic() - started, None)
+                self.throttle.penalize()
+                if attempt == self.retries:
+                    raise
+            else:
+                latency = time.monotonic() - started
+                instrument.observe_request(latency, response.status_code, len(response.content))
+                if not check_retry(response, self.throttle):
+                    self.throttle.observe(latency)
+                    return response
+                if attempt == self.retries:
+                    return give_up(response)
+            
+            time.sleep(retry_delay(response, attempt))
+
+
+class AsyncWikiClient:
+    """Async counterpart of WikiClient for concurrent scraping.
+
+    Requests draw from a shared token bucket whose refill rate follows the
+    adaptive throttle, so concurrency overlaps latency while the overall
+    rate tracks what the server can take.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 1,
+        max_rate: float | None = None,
+        min_rate: float | None = None,
+        retries: int = MAX_RETRIES,
+        timeout: float = 30.0,
+        **client_kwargs,
+    ):
+        client_kwargs.setdefault("transport", cassette_transport())
+        self.client = httpx.AsyncClient(timeout=timeout, **client_kwargs)
+        self.throttle = AdaptiveThrottle(rate, min_rate, max_rate)
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def get(self, url: str, params: dict | None = None) -> httpx.Response:
+        """Async WikiClient.get."""
+        url = rebase_url(url)
+        params = with_maxlag(url, params)
+        
+        for attempt in range(self.retries + 1):
+            self.bucket.rate = self.throttle.rate
+            await self.bucket.acquire()
+            started = time.monotonic()
+            response = None
+            try:
+                response = await self.client.get(url, params=params)
+            except httpx.TransportError:
+                instrument.observe_request(time.monotonic() - started, None)
+                self.throttle.penalize()
+                if attempt == self.retries:
+                    raise
+            else:
+                latency = time.monotonic() - started
+                instrument.observe_request(latency, response.status_code, len(response.content))
+                if not check_retry(response, self.throttle):
+                    self.throttle.observe(latency)
+                    return response
+                if attempt == self.retries:
+                    return give_up(response)
+            
+            await asyncio.sleep(retry_delay(response, attempt))
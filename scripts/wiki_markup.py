@@ -0,0 +1,156 @@
+"""
+Wiki markup cleaning shared by the extract_*.py scripts.
+Each extractor used to carry its own strip_wiki_markup; they are now named
+profiles here, each reproducing its old variant exactly:
+
+    investigators   links to their text, simple templates to their name, headings
+                    and Category: lines dropped (extract_investigators.py)
+    ancient_ones    links to their text, every template and table row dropped
+                    (extract_ancient_ones.py)
+    mysteries       links to their text, set, skill, icon and health/sanity templates
+                    to words, encounter headers dropped (extract_mysteries_research.py)
+
+A profile is its variant's substitutions, in the same order, compiled once.
+Every pass declares a literal that any match must contain and is skipped
+when the text lacks it, so plain prose costs a few substring checks instead
+of a dozen regex scans. Runs of literal templates with fixed replacements
+({{Core Game}}, {{Icon|clue}}, ...) are one alternation with a lookup table:
+their replacements hold no braces, so replacing one can never complete
+another and a single scan gives what the separate passes gave.
+
+clean_wiki_markup() memoizes on (text, profile); the extractors clean the
+same section text several times per page.
+"""
+
+import functools
+import re
+
+import instrument
+
+MEMO_SIZE = 8192
+
+# Templates with a fixed replacement, in the mysteries variant's order
+SET_TEMPLATES = {
+    "Core Game": "Core",
+    "FL imagelink": "Forsaken Lore",
+    "TD imagelink": "The Dreamlands",
+    "MoM imagelink": "Mountains of Madness",
+    "SR imagelink": "Strange Remnants",
+    "UtP imagelink": "Under the Pyramids",
+    "CiR imagelink": "Cities in Ruin",
+    "SoC imagelink": "Signs of Carcosa",
+    "MoN imagelink": "Masks of Nyarlathotep",
+}
+ICON_TEMPLATES = {
+    "clue": "Clue",
+    "et": "Eldritch Token",
+    "sea": "Sea",
+    "city": "City",
+    "wilderness": "Wilderness",
+}
+SKILLS = "Observation|Lore|Influence|Will|Strength"
+
+
+def literal_templates(names: dict[str, str], prefix: str = "") -> tuple[str, dict]:
+    """A pattern matching {{<prefix><name>}} for each name, and its lookup table."""
+    alternatives = "|".join(re.escape(name) for name in names)
+    return rf"\{{\{{{re.escape(prefix)}({alternatives})\}}\}}", names
+
+
+def health_sanity(match: re.Match) -> str:
+    """{{Health|value=2}} -> 2 Health, {{Sanity}} -> Sanity"""
+    return f"{match.group(2)} {match.group(1)}" if match.group(2) else match.group(1)
+
+
+# Passes as (guard, pattern, replacement): `guard` is a substring every match
+# contains. A replacement is a re.sub template, a function, or a dict looked
+# up with the match's first group.
+LINKS = [
+    ("[[", r"\[\[([^|\]]+)\|([^\]]+)\]\]", r"\2"),
+    ("[[", r"\[\[([^\]]+)\]\]", r"\1"),
+]
+FILES = [
+    ("[[File:", r"\[\[File:[^\]]+\]\]", ""),
+    ("[[file:", r"\[\[file:[^\]]+\]\]", ""),
+]
+WHITESPACE = [
+    ("\n\n\n", r"\n{3,}", "\n\n"),
+    ("  ", r" {2,}", " "),
+]
+
+PROFILES = {
+    "investigators": [
+        ("[[", r"\[\[(?:[^|\]]*\|)?([^\]]+)\]\]", r"\1"),
+        ("imagelink", r"\{\{([A-Za-z]+)\s+imagelink[^}]*\}\}", r"\1"),
+        ("{{", r"\{\{([A-Za-z ]+)\}\}", r"\1"),
+        ("{{", r"\{\{[^}]*\}\}", ""),
+        ("[[File:", r"\[\[File:[^\]]+\]\]", ""),
+        ("==", r"={2,}([^=]+)={2,}", r"\1"),
+        ("''", r"'{2,}", ""),
+        ("Category:", r"Category:[^\n]+", ""),
+        *WHITESPACE,
+    ],
+    "ancient_ones": [
+        *FILES,
+        *LINKS,
+        ("{{", r"\{\{[^}]+\}\}", ""),
+        ("'''", r"'''+", ""),
+        ("''", r"''", ""),
+        ("{|", r"(?s)\{\|[^}]*\|\}", ""),
+        ("|-", r"\|-", ""),
+        ("|", r"\|[^\n]*\n", ""),
+        ("==", r"={2,}[^=]+=+", ""),
+        *WHITESPACE,
+    ],
+    "mysteries": [
+        *FILES,
+        *LINKS,
+        ("{{", *literal_templates(SET_TEMPLATES)),
+        ("{{", rf"\{{\{{({SKILLS})\}}\}}", r"(\1)"),
+        ("{{", rf"\{{\{{({SKILLS})\|[^}}]*\}}\}}", r"(\1)"),
+        ("{{Icon|", *literal_templates(ICON_TEMPLATES, "Icon|")),
+        ("{{Icon|", r"\{\{Icon\|[^}]*\}\}", ""),
+        ("{{", r"\{\{(Health|Sanity)(?:\|value=(\d+))?\}\}", health_sanity),
+        ("{{", r"\{\{[^}]+\}\}", ""),
+        ("[City Encounters", r"\[City Encounters\s*\]", ""),
+        ("[Wilderness Encounters", r"\[Wilderness Encounters\s*\]", ""),
+        ("[Sea Encounters", r"\[Sea Encounters\s*\]", ""),
+        ("[Special Encounters", r"\[Special Encounters\s*\]", ""),
+        *WHITESPACE,
+    ],
+}
+
+
+class CleaningProfile:
+    """One profile's passes, compiled: clean() runs them over a text."""
+
+    def __init__(self, passes: list[tuple]):
+        self.passes = []
+        for guard, pattern, replacement in passes:
+            if isinstance(replacement, dict):
+                replacement = functools.partial(lambda table, match: table[match.group(1)], replacement)
+            self.passes.append((guard, re.compile(pattern).sub, replacement))
+
+    def clean(self, text: str) -> str:
+        if not text:
+            return ""
+        for guard, sub, replacement in self.passes:
+            if guard in text:
+                text = sub(replacement, text)
+        return text.strip()
+
+
+COMPILED = {name: CleaningProfile(passes) for name, passes in PROFILES.items()}
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def clean_cached(text: str, profile: str) -> str:
+    return COMPILED[profile].clean(text)
+
+
+@instrument.timed
+def clean_wiki_markup(text: str, profile: str) -> str:
+    """`text` with its wiki markup removed the way `profile` does it (see PROFILES)."""
+    if profile not in COMPILED:
+        raise ValueError(f"Unknown wiki markup profile {profile!r}; expected one of {', '.join(COMPILED)}")
+    return clean_cached(text, profile)
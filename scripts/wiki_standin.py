@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Local MediaWiki stand-in.
+Serves recorded cassettes (see wiki_cassette.py) over HTTP so the scrapers
+can be run and timed offline. Latency and failures are injected from a
+seeded RNG keyed by request, so a given seed fails the same requests the
+same way on every run.
+
+    python wiki_standin.py cassettes/wiki.json --latency 0.15 --error-rate 0.02
+    WIKI_BASE_URL=http://127.0.0.1:8765 python scrape_eldritch.py --crawl
+"""
+
+import argparse
+import json
+import random
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from wiki_cassette import Cassette, CassetteMissError, request_key
+
+# Injected failures, picked uniformly once a request is chosen to fail
+FAILURES = ["503", "429", "maxlag"]
+
+
+class StandinState:
+    def __init__(self, cassette: Cassette, args: argparse.Namespace):
+        self.cassette = cassette
+        self.latency = args.latency
+        self.jitter = args.jitter
+        self.error_rate = args.error_rate
+        self.seed = args.seed
+        self.seen = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "misses": 0, "injected": 0}
+
+    def rng_for(self, key: str) -> random.Random:
+        """One RNG per (key, attempt) so outcomes don't depend on thread timing."""
+        with self.lock:
+            attempt = self.seen.get(key, 0)
+            self.seen[key] = attempt + 1
+            self.stats["requests"] += 1
+        return random.Random(f"{self.seed}:{key}:{attempt}")
+
+
+def make_handler(state: StandinState):
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            params = parse_qsl(parts.query, keep_blank_values=True)
+            key = request_key("GET", parts.path, params)
+            rng = state.rng_for(key)
+            
+            delay = state.latency + rng.uniform(-state.jitter, state.jitter)
+            if delay > 0:
+                time.sleep(delay)
+            
+            if rng.random() < state.error_rate:
+                with state.lock:
+                    state.stats["injected"] += 1
+                self.send_failure(rng.choice(FAILURES), parts.path)
+                return
+            
+            try:
+                interaction = state.cassette.get(key)
+            except CassetteMissError as e:
+                with state.lock:
+                    state.stats["misses"] += 1
+                self.send_body(404, {"content-type": "text/plain; charset=utf-8"}, str(e))
+                return
+            
+            self.send_body(interaction["status"], interaction["headers"], interaction["body"])
+
+        def send_failure(self, kind: str, path: str):
+            if kind == "maxlag" and path.endswith("api.php"):
+                body = json.dumps({"error": {"code": "maxlag", "info": "Waiting for a database server: 6 seconds lagged"}})
+                self.send_body(200, {"content-type": "application/json; charset=utf-8", "retry-after": "1",
+                                     "mediawiki-api-error": "maxlag"}, body)
+            elif kind == "429":
+                self.send_body(429, {"content-type": "text/plain", "retry-after": "1"}, "Too Many Requests")
+            else:
+                self.send_body(503, {"content-type": "text/plain"}, "Service Unavailable")
+
+        def send_body(self, status: int, headers: dict, body: str):
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+    return StandinHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve wiki cassettes as a local MediaWiki stand-in.")
+    parser.add_argument("cassettes", nargs="+", type=Path, help="cassette files to serve (merged)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503/429/maxlag")
+    parser.add_argument("--seed", type=int, default=0, help="seed for injected latency and errors")
+    args = parser.parse_args()
+    
+    cassette = Cassette(args.cassettes[0])
+    for path in args.cassettes:
+        cassette.interactions.update(Cassette.load(path).interactions)
+    
+    state = StandinState(cassette, args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"[*] Serving {len(cassette.interactions)} recorded responses on http://{args.host}:{args.port}")
+    print(f"    latency={args.latency}s jitter={args.jitter}s error-rate={args.error_rate} seed={args.seed}", flush=True)
+    
+    # Stop cleanly on SIGTERM too; background jobs often ignore Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n[*] {state.stats}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+"""
+Single-pass wikitext tokenizer and AST.
+One left-to-right scan turns a page into a tree of templates, links,
+headings, tables, HTML tags and bold/italic markers. parse_wikitext derives
+every parsed field of a dataset entry (infobox, cardData, sections, links,
+templates, fullText) from that tree instead of re-scanning the page once
+per field, and nested templates such as `|set={{Core Game}}` stay intact.
+"""
+
+import re
+
+import instrument
+
+# Bump whenever parse output changes so cached or stored parses can be redone
+PARSER_VERSION = 1
+
+# Template params that are copied into cardData as well as the infobox
+CARD_FIELDS = {
+    "effect", "action", "text", "description", "flavor",
+    "lore", "pass", "fail", "test", "initial", "reckoning",
+    "cost", "toughness", "horror", "damage", "spawn",
+    "trait", "type", "expansion", "set",
+}
+HIDDEN_LINK_PREFIXES = ("File:", "Category:", "Image:")
+
+# One match per step: a run of plain text (group 1) followed by whatever
+# stopped it, one group per token kind. Templates and links with no markup
+# inside them (the vast majority) match whole and skip the open/close
+# bookkeeping; one that turns out to hold bold/italic quotes or table markup
+# is reopened the slow way. `|` only matters inside `{{` or `[[`, so
+# everywhere else the scanner uses the pattern that doesn't stop at it.
+NO_MARKUP = r"[^{}\[\]<]*"
+TOKENS = (
+    rf"\{{\{{({NO_MARKUP})\}}\}}"
+    rf"|\[\[([^{{}}\[\]<|\n]*)(?:\|({NO_MARKUP}))?\]\]"
+    r"|(\{\{)|(\}\})|(\[\[)|(\]\])|('{2,})|(\n)(?=[ \t]*(?:\{\||\|\}|=))"
+    r"|(<!--)|(</?[A-Za-z][^<>]*>)|(\|)|(.)|(\Z)"
+)
+# Stop characters that can't start a token here (a lone `'`, an ordinary
+# newline) are absorbed into the text run by the regex engine; LITERAL only
+# catches what slips past this.
+INERT_STOP = (
+    r"\n(?![ \t]*(?:\{\||\|\}|=))|'(?!')|<(?![A-Za-z/!])"
+    r"|\{(?!\{)|\}(?!\})|\[(?!\[)|\](?!\])"
+)
+TOKEN_RE = re.compile(
+    rf"([^{{}}\[\]'<\n]*(?:(?:{INERT_STOP})[^{{}}\[\]'<\n]*)*)(?:{TOKENS})", re.DOTALL
+)
+PIPE_TOKEN_RE = re.compile(
+    rf"([^{{}}\[\]'<\n|]*(?:(?:{INERT_STOP})[^{{}}\[\]'<\n|]*)*)(?:{TOKENS})", re.DOTALL
+)
+(
+    TEMPLATE, LINK_TARGET, LINK_LABEL, OPEN_TEMPLATE, CLOSE_TEMPLATE, OPEN_LINK, CLOSE_LINK,
+    QUOTES, NEWLINE, COMMENT, TAG, PIPE, LITERAL, END,
+) = range(2, 16)
+HEADING_RE = re.compile(r"(={1,6})([^\n]+?)\1[ \t]*$", re.MULTILINE)
+TABLE_OPEN_RE = re.compile(r"[ \t]*\{\|")
+TABLE_CLOSE_RE = re.compile(r"[ \t]*\|\}")
+TAG_NAME_RE = re.compile(r"</?([A-Za-z][A-Za-z0-9]*)")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+class Template:
+    """`{{name|key=value|positional}}`; params are (key or None, nodes).
+
+    Text in node lists is plain str; everything else is one of these classes.
+    """
+
+    __slots__ = ("name", "params", "raw")
+
+    def __init__(self, name: str, params: list, raw: str):
+        self.name = name
+        self.params = params
+        self.raw = raw
+
+
+class Link:
+    """`[[target|label]]`; label is None for a bare `[[target]]`."""
+
+    __slots__ = ("target", "label", "raw")
+
+    def __init__(self, target: str, label: list | None, raw: str):
+        self.target = target
+        self.label = label
+        self.raw = raw
+
+
+class Heading:
+    __slots__ = ("level", "children", "raw")
+
+    def __init__(self, level: int, children: list, raw: str):
+        self.level = level
+        self.children = children
+        self.raw = raw
+
+
+class Table:
+    """`{| ... |}`; row and cell markup inside stays as text."""
+
+    __slots__ = ("children", "raw")
+
+    def __init__(self, children: list, raw: str):
+        self.children = children
+        self.raw = raw
+
+
+class Tag:
+    """A single HTML tag such as `<br />` or `</ref>`; content stays outside it."""
+
+    __slots__ = ("name", "raw")
+
+    def __init__(self, name: str, raw: str):
+        self.name = name
+        self.raw = raw
+
+
+class Comment:
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+
+class Quote:
+    """A run of two or more apostrophes: italic (2), bold (3) or both (5)."""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+
+class Frame:
+    """An open `{{`, `[[` or `{|` waiting for its closer."""
+
+    __slots__ = ("kind", "start", "parts", "children")
+
+    OPENERS = {"template": "{{", "link": "[[", "table": "{|"}
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind
+        self.start = start
+        self.parts = []
+        self.children = []
+
+    def split(self) -> None:
+        self.parts.append(self.children)
+        self.children = []
+
+    def flatten(self) -> list:
+        """Nodes for an opener that was never closed: it was just text."""
+        nodes = [self.OPENERS[self.kind]]
+        for part in self.parts:
+            nodes.extend(part)
+            nodes.append("|")
+        nodes.extend(self.children)
+        return nodes
+
+    def build(self, text: str, end: int):
+        raw = text[self.start:end]
+        parts = self.parts + [self.children]
+        if self.kind == "template":
+            return Template(render(parts[0], "raw").strip(), [split_param(p) for p in parts[1:]], raw)
+        if self.kind == "link":
+            label = None
+            if len(parts) > 1:
+                label = parts[1]
+                for part in parts[2:]:
+                    label = label + ["|"] + part
+            return Link(render(parts[0], "raw").strip(), label, raw)
+        return Table(self.children, raw)
+
+
+def split_param(nodes: list) -> tuple:
+    """Split `key = value` on the first `=` that comes before any markup."""
+    for i, node in enumerate(nodes):
+        if type(node) is not str:
+            break
+        eq = node.find("=")
+        if eq != -1:
+            key = "".join(nodes[:i]) + node[:eq]
+            value = ([node[eq + 1:]] if eq + 1 < len(node) else []) + nodes[i + 1:]
+            return key.strip(), value
+    return None, nodes
+
+
+def current(stack: list) -> tuple:
+    """The innermost open frame, its children's append and the pattern to scan it with."""
+    top = stack[-1]
+    pattern = PIPE_TOKEN_RE if top.kind in ("template", "link") else TOKEN_RE
+    return top, top.children.append, pattern.match
+
+
+def split_text_param(param: str) -> tuple:
+    """split_param for a param that is plain text."""
+    key, eq, value = param.partition("=")
+    if not eq:
+        return None, [param] if param else []
+    return key.strip(), [value] if value else []
+
+
+def parse(text: str, start: int = 0, end: int | None = None, line_start: bool = True) -> list:
+    """Tokenize text[start:end] into a list of nodes in one left-to-right scan.
+
+    Unclosed `{{`, `[[` and `{|` fall back to plain text, and a closer
+    abandons any unclosed openers nested inside its own opener, so
+    malformed markup never costs more than the one pass.
+    """
+    end = len(text) if end is None else end
+    stack = [Frame("root", start)]
+    top, append, match = current(stack)
+    pos = run = start  # text[run:pos] is plain text not yet added to `top`
+
+    def close(kind: str, closer_end: int) -> bool:
+        for i in range(len(stack) - 1, 0, -1):
+            if stack[i].kind == kind:
+                break
+        else:
+            return False
+        while len(stack) - 1 > i:
+            frame = stack.pop()
+            stack[-1].children.extend(frame.flatten())
+        frame = stack.pop()
+        stack[-1].children.append(frame.build(text, closer_end))
+        return True
+
+    while pos < end:
+        if line_start:
+            line_start = False
+            m = None
+            if len(stack) == 1 and text.startswith("=", pos):
+                m = HEADING_RE.match(text, pos, end)
+                if m:
+                    if pos > run:
+                        top.children.append(text[run:pos])
+                    inner = parse(text, m.start(2), m.end(2), line_start=False)
+                    top.children.append(Heading(len(m.group(1)), inner, m.group(0)))
+            elif text.startswith("{|", pos) or TABLE_OPEN_RE.match(text, pos, end):
+                m = TABLE_OPEN_RE.match(text, pos, end)
+                if m.end() - 2 > run:
+                    top.children.append(text[run:m.end() - 2])
+                stack.append(Frame("table", m.end() - 2))
+            else:
+                m = TABLE_CLOSE_RE.match(text, pos, end)
+                if m:
+                    if pos > run:
+                        top.children.append(text[run:pos])
+                    if not close("table", m.end()):
+                        m = None
+                        run = pos
+            if m:
+                top, append, match = current(stack)
+                pos = run = m.end()
+                continue
+
+        m = match(text, pos, end)
+        kind = m.lastindex
+        pos = m.end()
+        if kind == LITERAL:
+            continue
+        if kind == NEWLINE:
+            line_start = True
+            continue
+
+        token_start = m.end(1)
+        if token_start > run:
+            append(text[run:token_start])
+        run = pos
+        if kind == QUOTES:
+            append(Quote(m.group(QUOTES)))
+            continue
+        if kind == END:
+            break
+        if kind <= LINK_LABEL:
+            token = text[token_start:pos]
+            if "''" in token or "{|" in token or "|}" in token:
+                kind = OPEN_TEMPLATE if kind == TEMPLATE else OPEN_LINK
+                pos = run = token_start + 2
+
+        if kind == LINK_TARGET or kind == LINK_LABEL:
+            label = m.group(LINK_LABEL)
+            append(Link(m.group(LINK_TARGET).strip(), None if label is None else [label], token))
+            continue
+        if kind == TEMPLATE:
+            name, *params = m.group(TEMPLATE).split("|")
+            append(Template(name.strip(), [split_text_param(p) for p in params], token))
+            continue
+
+        if kind == PIPE:
+            top.split()
+        elif kind == OPEN_TEMPLATE:
+            stack.append(Frame("template", token_start))
+        elif kind == CLOSE_TEMPLATE:
+            if not close("template", pos):
+                append("}}")
+        elif kind == OPEN_LINK:
+            stack.append(Frame("link", token_start))
+        elif kind == CLOSE_LINK:
+            if not close("link", pos):
+                append("]]")
+        elif kind == COMMENT:
+            close_at = text.find("-->", pos, end)
+            pos = run = end if close_at == -1 else close_at + 3
+            append(Comment(text[token_start:pos]))
+        else:
+            token = m.group(TAG)
+            name = TAG_NAME_RE.match(token).group(1).lower()
+            close_at = -1
+            if name == "nowiki" and token[1] != "/" and not token.endswith("/>"):
+                close_at = text.find("</nowiki>", pos, end)
+            if close_at != -1:
+                append(text[pos:close_at])
+                pos = run = close_at + len("</nowiki>")
+            else:
+                append(Tag(name, token))
+        top, append, match = current(stack)
+
+    if end > run:
+        top.children.append(text[run:end])
+    while len(stack) > 1:
+        frame = stack.pop()
+        stack[-1].children.extend(frame.flatten())
+    return stack[0].children
+
+
+def is_hidden_link(target: str) -> bool:
+    return target.startswith(HIDDEN_LINK_PREFIXES)
+
+
+def render(nodes: list, mode: str) -> str:
+    """Render nodes back to a string.
+
+    raw:     the original source
+    value:   template param values; links become their text, bold/italic
+             markers go, nested templates and tags stay verbatim
+    section: section bodies; templates, tags, files and categories go,
+             bold/italic markers stay
+    text:    fullText; like section, minus bold/italic, headings as [Name]
+    """
+    out = []
+    for node in nodes:
+        cls = type(node)
+        if cls is str:
+            out.append(node)
+        elif cls is Quote:
+            if mode in ("raw", "section"):
+                out.append(node.raw)
+        elif cls is Link:
+            if mode == "raw":
+                out.append(node.raw)
+            elif mode == "value" or not is_hidden_link(node.target):
+                label = render(node.label, mode) if node.label else ""
+                out.append(label or node.target.lstrip(":"))
+        elif cls is Table:
+            if mode in ("raw", "value"):
+                out.append(node.raw)
+            else:
+                out.append("{|" + render(node.children, mode) + "|}")
+        elif cls is Heading:
+            if mode == "text":
+                out.append(f"\n[{render(node.children, mode).strip()}]\n")
+            else:
+                out.append(node.raw)
+        elif mode in ("raw", "value") and cls is not Comment:
+            out.append(node.raw)
+        elif mode == "raw":
+            out.append(node.raw)
+    return "".join(out)
+
+
+def collect(nodes: list, parsed: dict, depths: dict, depth: int = 0) -> None:
+    """Gather links, template names and template params from the whole tree.
+
+    Params from outer templates win over same-named params of templates
+    nested in their values; among siblings the later one wins.
+    """
+    for node in nodes:
+        cls = type(node)
+        if cls is str or cls is Quote:
+            continue
+        if cls is Link:
+            if not is_hidden_link(node.target):
+                parsed["links"].append(node.target)
+            if node.label:
+                collect(node.label, parsed, depths, depth)
+        elif cls is Template:
+            name = node.name
+            if not name.startswith("#") and len(name) < 50:
+                parsed["templates"].append(name)
+            for key, value in node.params:
+                if key is None or "\n" in key:
+                    continue
+                key = key.lower()
+                if len(value) == 1 and type(value[0]) is str:
+                    text = value[0].strip()
+                else:
+                    text = render(value, "value").strip()
+                if text and depths.get(key, depth) >= depth:
+                    depths[key] = depth
+                    parsed["infobox"][key] = text
+                    if key in CARD_FIELDS:
+                        parsed["cardData"][key] = text
+            for _, value in node.params:
+                if len(value) > 1 or value and type(value[0]) is not str:
+                    collect(value, parsed, depths, depth + 1)
+        elif cls is Table or cls is Heading:
+            collect(node.children, parsed, depths, depth)
+
+
+@instrument.timed
+def parse_wikitext(content: str, title: str) -> dict:
+    """Parse wikitext content to extract structured data."""
+    parsed = {
+        "title": title,
+        "infobox": {},
+        "sections": {},  # Section name -> content
+        "links": [],
+        "templates": [],
+        "fullText": "",  # Full cleaned text, no truncation
+        "cardData": {},  # Specific card fields
+    }
+
+    # One walk over the top level feeds every field: links and template params
+    # are collected as nodes go by, and fullText and section bodies (which
+    # differ only in bold/italic markers) are rendered side by side
+    links = parsed["links"]
+    depths = {}
+    sections = []
+    text = []
+    section = None
+    for node in parse(content):
+        cls = type(node)
+        if cls is str:
+            text.append(node)
+            if section is not None:
+                section.append(node)
+        elif cls is Quote:
+            if section is not None:
+                section.append(node.raw)
+        elif cls is Link and (node.label is None or (len(node.label) == 1 and type(node.label[0]) is str)):
+            if not is_hidden_link(node.target):
+                links.append(node.target)
+                text.append(node.label[0] if node.label and node.label[0] else node.target.lstrip(":"))
+                if section is not None:
+                    section.append(text[-1])
+        elif cls is Heading:
+            collect(node.children, parsed, depths)
+            name = render(node.children, "text").strip()
+            text.append(f"\n[{name}]\n")
+            section = []
+            sections.append((name, section))
+        else:
+            collect([node], parsed, depths)
+            text.append(render([node], "text"))
+            if section is not None:
+                section.append(render([node], "section"))
+
+    for name, section in sections:
+        body = "".join(section).strip()
+        if body:
+            parsed["sections"][name] = body
+    parsed["fullText"] = BLANK_LINES_RE.sub("\n\n", "".join(text)).strip()
+    return parsed